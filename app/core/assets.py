@@ -0,0 +1,212 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import shutil
+import sys
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = "app/static"
+DIST_DIR = "dist"  # Hashed build output, relative to the static directory
+MANIFEST_NAME = "manifest.json"
+
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".html", ".map")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def content_hash(data: bytes, length: int = 10) -> str:
+    return hashlib.sha256(data).hexdigest()[:length]
+
+
+def directory_hash(*directories: str) -> str:
+    """
+    Content hash of every file under the given directories (build output
+    excluded), e.g. to version rendered pages by their templates and assets.
+    """
+    digest = hashlib.sha256()
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = sorted(d for d in dirs if d != DIST_DIR)
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, directory).encode("utf-8"))
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()[:10]
+
+
+def build_assets(static_dir: str = STATIC_DIR, min_compress_size: int = 512) -> Dict[str, str]:
+    """
+    Copy every static file to dist/ under a content-hashed name, write .gz
+    (and .br when brotli is installed) next to compressible ones, and write
+    the manifest of source path -> hashed path.
+    Returns the manifest.
+    """
+    dist = os.path.join(static_dir, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+    manifest: Dict[str, str] = {}
+    for root, dirs, files in os.walk(static_dir):
+        if os.path.abspath(root) == os.path.abspath(static_dir):
+            dirs[:] = [d for d in dirs if d != DIST_DIR]
+        for name in sorted(files):
+            source = os.path.join(root, name)
+            relative = os.path.relpath(source, static_dir).replace(os.sep, "/")
+            with open(source, "rb") as f:
+                data = f.read()
+            stem, ext = os.path.splitext(relative)
+            hashed = f"{DIST_DIR}/{stem}.{content_hash(data)}{ext}"
+            target = os.path.join(static_dir, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(data)
+            if ext in COMPRESSIBLE and len(data) >= min_compress_size:
+                _write_compressed(target, data)
+            manifest[relative] = hashed
+
+    with open(os.path.join(dist, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def _write_compressed(target: str, data: bytes) -> None:
+    # mtime=0 keeps the output byte-identical across builds
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(data):
+            with open(target + suffix, "wb") as f:
+                f.write(compressed)
+
+
+class AssetManifest:
+    """
+    Resolves static paths to cache-busting URLs: the hashed build output when
+    the asset step has run, otherwise the source file with a ?v=<hash> query.
+    """
+
+    def __init__(self, static_dir: str = STATIC_DIR, url_prefix: str = "/static"):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix
+        self._manifest: Optional[Dict[str, str]] = None
+        self._versions: Dict[str, str] = {}
+
+    @property
+    def manifest(self) -> Dict[str, str]:
+        if self._manifest is None:
+            try:
+                with open(os.path.join(self.static_dir, DIST_DIR, MANIFEST_NAME)) as f:
+                    self._manifest = json.load(f)
+            except (OSError, ValueError):
+                self._manifest = {}
+        return self._manifest
+
+    def url(self, path: str) -> str:
+        path = path.lstrip("/")
+        hashed = self.manifest.get(path)
+        if hashed:
+            return f"{self.url_prefix}/{hashed}"
+        version = self._versions.get(path)
+        if version is None:
+            try:
+                with open(os.path.join(self.static_dir, path), "rb") as f:
+                    version = self._versions[path] = content_hash(f.read())
+            except OSError:
+                logger.warning(f"Static asset not found: {path}")
+                return f"{self.url_prefix}/{path}"
+        return f"{self.url_prefix}/{path}?v={version}"
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves precompressed .br/.gz siblings when the client
+    accepts them, and marks hashed or versioned assets immutable.
+    """
+
+    def __init__(self, *args, max_age: int = 3600, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+        # path -> (mtime, size, content hash)
+        self._versions: Dict[str, Tuple[float, int, str]] = {}
+
+    def _is_current_version(self, path: str, scope: Scope) -> bool:
+        """
+        True if the request's ?v= equals the file's current content hash, so
+        a stale or unrelated query never makes an asset immutable.
+        """
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        requested = query.get("v")
+        if not requested:
+            return False
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None:
+            return False
+        cached = self._versions.get(path)
+        if cached is None or cached[:2] != (stat_result.st_mtime, stat_result.st_size):
+            with open(full_path, "rb") as f:
+                cached = (stat_result.st_mtime, stat_result.st_size, content_hash(f.read()))
+            self._versions[path] = cached
+        return requested[-1] == cached[2]
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        hashed = path.startswith(DIST_DIR + "/")
+        accepted = _accepted_encodings(scope) if hashed else set()
+        response = None
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding in accepted and self.lookup_path(path + suffix)[1] is not None:
+                response = await super().get_response(path + suffix, scope)
+                media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                if media_type.startswith("text/"):
+                    media_type += "; charset=utf-8"
+                response.headers["content-type"] = media_type
+                response.headers["content-encoding"] = encoding
+                break
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        if response.status_code in (200, 304):
+            if hashed or self._is_current_version(path, scope):
+                response.headers["cache-control"] = IMMUTABLE
+            else:
+                response.headers["cache-control"] = f"public, max-age={self.max_age}"
+            response.headers["vary"] = "Accept-Encoding"
+        return response
+
+
+def _accepted_encodings(scope: Scope) -> set:
+    for name, value in scope.get("headers", []):
+        if name == b"accept-encoding":
+            return {token.split(";")[0].strip() for token in value.decode("latin-1").split(",")}
+    return set()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress static assets.")
+    parser.add_argument("--static-dir", default=STATIC_DIR)
+    args = parser.parse_args(argv)
+
+    manifest = build_assets(args.static_dir)
+    for source, hashed in sorted(manifest.items()):
+        print(f"{source} -> {hashed}")
+    if brotli is None:
+        print("brotli not installed; wrote gzip variants only")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,6 +27,60 @@ class Settings(BaseSettings):
     # Database Settings
     DATABASE_URL: str = "sqlite:///./analyses.db"
     
+    # Background Analysis Jobs
+    ANALYSIS_WORKERS: int = 4
+    ANALYSIS_JOB_RETENTION: int = 500
+    ANALYSIS_JOB_STALE_AFTER: int = 1800  # seconds; older unfinished jobs are reported failed
+    
+    # Analysis Result Cache
+    ANALYSIS_CACHE_MAX_AGE: int = 3600  # seconds
+    ANALYSIS_CACHE_ENTRIES: int = 256
+    ANALYSIS_CACHE_REVALIDATE_AFTER: int = 5  # seconds between shared-tier checks of a memory hit
+    FRAGMENT_CACHE_ENTRIES: int = 2048  # Rendered history rows and list pages
+    
+    # Shared Cache (SQLite file shared by all workers on the host)
+    SHARED_CACHE_ENABLED: bool = True
+    SHARED_CACHE_MAX_ENTRIES: int = 50000
+    SHARED_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SENTIMENT_CACHE_TTL: int = 86400  # VADER scores only change with the lexicon
+    USER_PROFILE_CACHE_TTL: int = 3600
+    
+    # Thread Fetching
+    THREAD_REPLY_LIMIT: int = 100  # Replies fetched for an exact analysis
+    
+    # Approximate Analysis (opt-in sampling for very large threads)
+    APPROXIMATE_REPLY_LIMIT: int = 1000  # Replies fetched across the time windows before sampling
+    APPROXIMATE_WINDOWS: int = 10  # Time windows the approximate fetch is spread over
+    APPROXIMATE_CI_HALF_WIDTH: float = 5.0  # Stop once every interval is within +/- this many points
+    APPROXIMATE_CONFIDENCE: float = 0.95
+    APPROXIMATE_MIN_SAMPLE: int = 200
+    
+    # Mention Stream Ingestion
+    STREAM_BUFFER_SIZE: int = 1000  # Oldest events are dropped beyond this
+    STREAM_DEDUPE_WINDOW: int = 10000  # Recent tweet IDs remembered across reconnects
+    STREAM_WORKERS: int = 1
+    STREAM_BACKOFF_BASE: float = 1.0  # seconds
+    STREAM_BACKOFF_MAX: float = 300.0
+    
+    # Outbound Replies
+    REPLY_RATE_PER_HOUR: float = 60  # Posting budget, well under the account's write limit
+    REPLY_BURST: int = 5
+    REPLY_MAX_ATTEMPTS: int = 5
+    
+    # Sentiment Progression
+    SENTIMENT_PROGRESSION_POINTS: int = 100  # Max time buckets per thread
+    SENTIMENT_CHART_POINTS: int = 0  # LTTB-downsample the timeline chart to this many points; 0 disables
+    
+    # Coordination Graph
+    COORDINATION_WINDOW_SECONDS: int = 300
+    COORDINATION_MIN_WEIGHT: int = 2  # Shared threads before a pair counts as a tie
+    COORDINATION_MAX_THREAD_PAIRS: int = 2000  # Author pairs one thread can add to the graph
+    COORDINATION_MAX_AGE_DAYS: int = 30  # Edges not seen for this long are dropped
+    
+    # Batch Analysis
+    BATCH_MAX_TWEETS: int = 100
+    BATCH_FETCH_CONCURRENCY: int = 4
+    
     # Security Settings
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
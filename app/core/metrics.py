@@ -0,0 +1,228 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram; observing is a bisect and two additions.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts, sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class _LogMessageCounter(logging.Handler):
+    def __init__(self, counter: Counter, substring: str, labels: Dict[str, str]):
+        super().__init__(level=logging.WARNING)
+        self.counter = counter
+        self.substring = substring
+        self.labels = labels
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.substring in record.getMessage():
+            self.counter.inc(**self.labels)
+
+
+def count_log_messages(logger_name: str, substring: str, counter: Counter, **labels) -> None:
+    """
+    Increment a counter whenever a library logs a matching warning, e.g.
+    tweepy's "Rate limit ... Sleeping for ..." messages.
+    """
+    logging.getLogger(logger_name).addHandler(_LogMessageCounter(counter, substring, labels))
+
+
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.histogram(
+    "xrat_stage_duration_seconds",
+    "Time spent in each analysis pipeline stage.",
+    ["stage"]
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "xrat_http_request_duration_seconds",
+    "HTTP request latency until response headers are sent.",
+    ["method", "route", "status"]
+)
+CACHE_REQUESTS = registry.counter(
+    "xrat_cache_requests_total",
+    "Cache lookups by cache and result.",
+    ["cache", "result"]
+)
+RATE_LIMIT_WAITS = registry.counter(
+    "xrat_rate_limit_waits_total",
+    "Times an X API call waited for or hit a rate limit.",
+    ["api"]
+)
+STREAM_EVENTS = registry.counter(
+    "xrat_stream_events_total",
+    "Events sent to or received from streams.",
+    ["stream", "event"]
+)
+
+INGEST_BUFFER_DEPTH = registry.gauge(
+    "xrat_ingest_buffer_depth",
+    "Events received from a stream and waiting to be processed.",
+    ["stream"]
+)
+INGEST_QUEUE_WAIT = registry.histogram(
+    "xrat_ingest_queue_wait_seconds",
+    "Time stream events spend buffered before processing starts.",
+    ["stream"]
+)
+
+REPLY_OUTBOX_EVENTS = registry.counter(
+    "xrat_reply_outbox_events_total",
+    "Outbound reply queue events (enqueued, coalesced, sent, retried, rate_limited, failed).",
+    ["event"]
+)
+REPLY_OUTBOX_DEPTH = registry.gauge(
+    "xrat_reply_outbox_depth",
+    "Replies waiting to be posted."
+)
+REPLY_DELIVERY_LATENCY = registry.histogram(
+    "xrat_reply_delivery_seconds",
+    "Time from queueing a reply to posting it.",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200, 10800)
+)
+
+
+def timed(stage: str):
+    """
+    Time a pipeline stage: ``with timed("x_fetch"): ...``
+    """
+    return STAGE_DURATION.time(stage=stage)
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, create_engine
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 from app.core.config import get_settings
+from app.db.search import init_search_index
 import os
 import json
 
@@ -16,6 +17,8 @@ else:
     db_path = "analyses.db"  # Local development path
 
 DATABASE_URL = f"sqlite:///{db_path}"
+REPLY_SEGMENTS_DIR = "/tmp/reply_segments" if os.environ.get('VERCEL_ENV') else "reply_segments"
+SHARED_CACHE_PATH = "/tmp/shared_cache.db" if os.environ.get('VERCEL_ENV') else "shared_cache.db"
 
 class Analysis(Base):
     __tablename__ = "analyses"
@@ -33,6 +36,11 @@ class Analysis(Base):
     grok_insights = Column(String)  # JSON string of Grok AI insights
     enhanced_response = Column(String)  # Enhanced response from Grok
     bot_percentage = Column(Float, default=0.0)
+    notable_quotes = Column(Text)  # JSON list of high-intensity replies
+    keywords = Column(Text)  # JSON object of keyword counts
+    sentiment_progression = Column(Text)  # JSON list of bucketed timeline points
+    sample_size = Column(Integer)  # Replies scored in approximate mode; None for exact analyses
+    confidence_intervals = Column(Text)  # JSON estimates with intervals, approximate mode only
 
     def to_dict(self):
         return {
@@ -52,9 +60,113 @@ class Analysis(Base):
             },
             "grok_insights": json.loads(self.grok_insights) if self.grok_insights else None,
             "enhanced_response": self.enhanced_response,
-            "bot_percentage": self.bot_percentage
+            "bot_percentage": self.bot_percentage,
+            "notable_quotes": json.loads(self.notable_quotes) if self.notable_quotes else [],
+            "keywords": json.loads(self.keywords) if self.keywords else {},
+            "sentiment_progression": json.loads(self.sentiment_progression) if self.sentiment_progression else [],
+            "sample_size": self.sample_size,
+            "confidence_intervals": json.loads(self.confidence_intervals) if self.confidence_intervals else None
         }
 
+class AuthorEdge(Base):
+    """
+    Sparse co-occurrence graph: authors who replied to the same thread within
+    a short time window. Each pair is stored once with author_a < author_b.
+    """
+    __tablename__ = "author_edges"
+
+    author_a = Column(String, primary_key=True)
+    author_b = Column(String, primary_key=True, index=True)
+    weight = Column(Integer, default=0)  # Number of threads the pair co-occurred in
+    last_seen = Column(DateTime, default=datetime.now)
+
+class CoordinationThread(Base):
+    """
+    Threads already added to the author graph, so re-analyzing one never
+    adds weight to its edges again.
+    """
+    __tablename__ = "coordination_threads"
+
+    thread_id = Column(String, primary_key=True)
+    processed_at = Column(DateTime, default=datetime.now, index=True)
+
+class ReplySegment(Base):
+    """
+    Index of per-reply segment files (see app.db.reply_store), with the tweet
+    ID and created_at ranges each one covers.
+    """
+    __tablename__ = "reply_segments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    path = Column(String, unique=True)
+    rows = Column(Integer)
+    size_bytes = Column(Integer)
+    min_tweet_id = Column(Integer, index=True)
+    max_tweet_id = Column(Integer, index=True)
+    min_created_at = Column(Integer, index=True)  # epoch seconds
+    max_created_at = Column(Integer, index=True)
+    created = Column(DateTime, default=datetime.now)
+
+class PendingReply(Base):
+    """
+    Outbound reply queue (see app.services.outbox). At most one pending reply
+    per conversation; newer replies replace its text.
+    """
+    __tablename__ = "pending_replies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    conversation_id = Column(String, index=True)
+    in_reply_to = Column(String)  # Tweet the reply is posted under
+    text = Column(Text)
+    status = Column(String, index=True, default="pending")  # pending, sending, sent, failed, superseded
+    attempts = Column(Integer, default=0)
+    coalesced = Column(Integer, default=0)  # Replies folded into this one
+    error = Column(String)
+    created_at = Column(DateTime, default=datetime.now)
+    next_attempt_at = Column(DateTime, default=datetime.now)
+    claimed_at = Column(DateTime)  # When a sender took it; stale claims are recovered
+    sent_at = Column(DateTime)
+
+class AnalysisJob(Base):
+    """
+    Background analysis jobs (see app.services.jobs), in the database so any
+    worker can answer status polls and finished jobs survive restarts.
+    """
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String, primary_key=True)
+    tweet_id = Column(String, index=True)
+    status = Column(String, index=True)  # pending, running, completed, failed
+    callback_urls = Column(Text)  # JSON list; every submitter that asked for a webhook
+    created_at = Column(DateTime, default=datetime.now, index=True)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    result = Column(Text)  # JSON of the stored analysis
+    error = Column(Text)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "tweet_id": self.tweet_id,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": json.loads(self.result) if self.result else None,
+            "error": self.error
+        }
+
+class ReplyBudget(Base):
+    """
+    Token bucket for outbound posts, kept in the database so every worker
+    sending replies draws from the same budget.
+    """
+    __tablename__ = "reply_budget"
+
+    name = Column(String, primary_key=True)
+    tokens = Column(Float)
+    updated_at = Column(Float)  # Unix time of the last refill
+
 # Database setup
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 
@@ -66,6 +178,36 @@ else:
     # In development, create tables if they don't exist
     Base.metadata.create_all(bind=engine)
 
+def ensure_columns(engine, model):
+    """
+    Add columns introduced after a table was first created.
+    create_all() does not alter existing tables.
+    """
+    existing = {column["name"] for column in inspect(engine).get_columns(model.__tablename__)}
+    with engine.begin() as conn:
+        for column in model.__table__.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {model.__tablename__} ADD COLUMN {column.name} {column_type}"))
+
+def drop_columns(engine, table: str, names):
+    """
+    Drop columns a table no longer uses (SQLite 3.35+).
+    """
+    existing = {column["name"] for column in inspect(engine).get_columns(table)}
+    with engine.begin() as conn:
+        for name in names:
+            if name in existing:
+                conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {name}"))
+
+ensure_columns(engine, Analysis)
+ensure_columns(engine, PendingReply)
+# Superseded by coordination_threads
+drop_columns(engine, "author_edges", ["last_thread"])
+with engine.begin() as conn:
+    conn.execute(text("DROP TABLE IF EXISTS author_edge_threads"))
+init_search_index(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Dependency
@@ -0,0 +1,335 @@
+import io
+import logging
+import os
+import struct
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Export is optional; the store itself only needs NumPy
+    pa = None
+    pq = None
+
+from app.db.models import ReplySegment
+
+logger = logging.getLogger(__name__)
+
+# Bot risk factors kept per reply, quantized to one byte each
+RISK_FACTORS = (
+    "account_age_risk",
+    "tweet_frequency_risk",
+    "profile_completion_risk",
+    "follower_ratio_risk",
+    "default_profile_risk",
+    "spam_pattern_risk",
+    "coordinated_spam_risk",
+    "coordination_ring_risk",
+    "cadence_risk",
+)
+
+# (name, stored dtype, delta encoded, scale); rows are sorted by
+# (tweet_id, created_at) so the delta-encoded columns are small integers
+COLUMNS = (
+    ("tweet_id", np.int64, True, None),
+    ("analysis_id", np.int64, True, None),
+    ("reply_id", np.int64, True, None),
+    ("author_id", np.int64, False, None),
+    ("created_at", np.int64, True, None),  # epoch seconds
+    ("compound", np.int16, False, 10000),
+) + tuple((factor, np.uint8, False, 255) for factor in RISK_FACTORS)
+
+_MAGIC = b"XRS1"
+_HEADER = struct.Struct("<4sI")  # magic, row count
+
+
+def _epoch(value: datetime) -> int:
+    """
+    Epoch seconds; naive datetimes are taken as UTC, like stored created_at.
+    """
+    return int(value.replace(tzinfo=value.tzinfo or timezone.utc).timestamp())
+
+
+def _as_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def thread_columns(tweet_id: str, analysis_id: int, thread_analysis: Dict) -> Dict[str, np.ndarray]:
+    """
+    Per-reply columns for one analyzed thread: ids, time, compound score and
+    bot risk factors, in reply order.
+    """
+    replies = thread_analysis.get("replies", [])
+    risk_factors = thread_analysis.get("bot_risk_factors") or [{}] * len(replies)
+    n = len(replies)
+    columns = {
+        "tweet_id": np.full(n, _as_int(tweet_id), dtype=np.int64),
+        "analysis_id": np.full(n, analysis_id or 0, dtype=np.int64),
+        "reply_id": np.fromiter((_as_int(r.get("id")) for r in replies), dtype=np.int64, count=n),
+        "author_id": np.fromiter((_as_int(r["user"].get("id")) for r in replies), dtype=np.int64, count=n),
+        "created_at": np.fromiter((_epoch(r["created_at"]) for r in replies), dtype=np.int64, count=n),
+        "compound": np.fromiter((r.get("compound_score", 0.0) for r in replies), dtype=np.float64, count=n),
+    }
+    for factor in RISK_FACTORS:
+        columns[factor] = np.fromiter((f.get(factor, 0.0) for f in risk_factors), dtype=np.float64, count=n)
+    return columns
+
+
+def encode_segment(columns: Dict[str, np.ndarray]) -> bytes:
+    """
+    Serialize columns into one compressed segment. Integers are delta encoded
+    where sorted and byte-shuffled before deflate, so high bytes that are
+    mostly zero compress away; floats are quantized to 1-2 bytes.
+    """
+    rows = len(columns["tweet_id"])
+    order = np.lexsort((columns["created_at"], columns["tweet_id"]))
+    parts = []
+    for name, dtype, delta, scale in COLUMNS:
+        values = np.asarray(columns[name])[order]
+        if scale is not None:
+            info = np.iinfo(dtype)
+            values = np.clip(np.rint(values * scale), info.min, info.max)
+        values = values.astype(dtype)
+        if delta:
+            values = np.diff(values, prepend=values.dtype.type(0))
+        # Byte shuffle: all first bytes, then all second bytes, ...
+        parts.append(values.view(np.uint8).reshape(rows, values.itemsize).T.tobytes())
+    return _HEADER.pack(_MAGIC, rows) + zlib.compress(b"".join(parts), 6)
+
+
+def decode_segment(data: bytes) -> Dict[str, np.ndarray]:
+    """
+    Inverse of encode_segment; quantized columns come back as float64.
+    """
+    magic, rows = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("Not a reply segment")
+    payload = zlib.decompress(data[_HEADER.size:])
+    columns, offset = {}, 0
+    for name, dtype, delta, scale in COLUMNS:
+        itemsize = np.dtype(dtype).itemsize
+        size = rows * itemsize
+        shuffled = np.frombuffer(payload, dtype=np.uint8, count=size, offset=offset)
+        values = np.ascontiguousarray(shuffled.reshape(itemsize, rows).T).view(dtype).ravel()
+        offset += size
+        if delta:
+            values = np.cumsum(values, dtype=dtype)
+        if scale is not None:
+            values = values.astype(np.float64) / scale
+        columns[name] = values
+    return columns
+
+
+class ReplyStore:
+    """
+    Append-only columnar store of per-reply facts. Each append writes one
+    immutable segment file; segment ranges are indexed in the reply_segments
+    table so scans by tweet ID or time only read overlapping segments.
+    Small segments (one per stored analysis) are periodically merged into
+    segments of up to target_rows, so per-file overhead stays small.
+    """
+
+    def __init__(self, directory: str, small_rows: int = 10000, target_rows: int = 200000,
+                 compact_every: int = 50):
+        self.directory = directory
+        self.small_rows = small_rows
+        self.target_rows = target_rows
+        self.compact_every = compact_every
+        self._appends = 0
+
+    def append(self, db: Session, columns: Dict[str, np.ndarray]) -> Optional[ReplySegment]:
+        """
+        Write a segment and add its index row to the session; the caller
+        commits. Returns None when there are no rows.
+        """
+        rows = len(columns["tweet_id"])
+        if not rows:
+            return None
+        data = encode_segment(columns)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.xrs")
+        with open(path, "wb") as f:
+            f.write(data)
+        segment = ReplySegment(
+            path=path,
+            rows=rows,
+            size_bytes=len(data),
+            min_tweet_id=int(columns["tweet_id"].min()),
+            max_tweet_id=int(columns["tweet_id"].max()),
+            min_created_at=int(columns["created_at"].min()),
+            max_created_at=int(columns["created_at"].max())
+        )
+        db.add(segment)
+        self._appends += 1
+        return segment
+
+    def maybe_compact(self, db: Session) -> int:
+        """
+        Compact every compact_every appends (see compact).
+        """
+        if self._appends < self.compact_every:
+            return 0
+        self._appends = 0
+        return self.compact(db)
+
+    def compact(self, db: Session) -> int:
+        """
+        Merge segments smaller than small_rows, in tweet ID order, into
+        segments of up to target_rows. Each merge commits on its own; a merge
+        whose inputs another process already compacted is dropped.
+        Returns the number of segments removed.
+        """
+        small = (
+            db.query(ReplySegment)
+            .filter(ReplySegment.rows < self.small_rows)
+            .order_by(ReplySegment.min_tweet_id, ReplySegment.id)
+            .all()
+        )
+        groups, group, rows = [], [], 0
+        for segment in small:
+            if group and rows + segment.rows > self.target_rows:
+                groups.append(group)
+                group, rows = [], 0
+            group.append(segment)
+            rows += segment.rows
+        groups.append(group)
+
+        removed = 0
+        for group in groups:
+            if len(group) < 2:
+                continue
+            ids = [segment.id for segment in group]
+            paths = [segment.path for segment in group]
+            try:
+                chunks = [self._read(path) for path in paths]
+            except FileNotFoundError:
+                db.rollback()  # Another process compacted these first
+                continue
+            merged = self.append(db, self._concat(chunks))
+            self._appends -= 1  # Not new data
+            deleted = (
+                db.query(ReplySegment)
+                .filter(ReplySegment.id.in_(ids))
+                .delete(synchronize_session=False)
+            )
+            if deleted != len(ids):
+                db.rollback()
+                self.discard(merged)
+                continue
+            try:
+                db.commit()
+            except Exception:
+                db.rollback()
+                self.discard(merged)
+                raise
+            for path in paths:
+                os.remove(path)
+            removed += len(ids) - 1
+        if removed:
+            logger.info(f"Compacted reply segments; {removed} fewer files")
+        return removed
+
+    @staticmethod
+    def _read(path: str) -> Dict[str, np.ndarray]:
+        with open(path, "rb") as f:
+            return decode_segment(f.read())
+
+    def discard(self, segment: Optional[ReplySegment]) -> None:
+        """
+        Remove the file of a segment whose index row was never committed.
+        """
+        if segment is not None and os.path.exists(segment.path):
+            os.remove(segment.path)
+
+    def scan(self, db: Session, tweet_id_min: Optional[int] = None, tweet_id_max: Optional[int] = None,
+             since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """
+        Read all replies within the given tweet ID and created_at ranges
+        (inclusive); naive since/until are UTC. Returns columns as NumPy arrays.
+        """
+        for attempt in range(3):
+            try:
+                return self._scan(db, tweet_id_min, tweet_id_max, since, until)
+            except FileNotFoundError:
+                # Compacted away after the index was read; the merged segment has the rows
+                db.rollback()
+                if attempt == 2:
+                    raise
+
+    def _scan(self, db: Session, tweet_id_min: Optional[int], tweet_id_max: Optional[int],
+              since: Optional[datetime], until: Optional[datetime]) -> Dict[str, np.ndarray]:
+        since_ts = _epoch(since) if since else None
+        until_ts = _epoch(until) if until else None
+
+        query = db.query(ReplySegment)
+        if tweet_id_min is not None:
+            query = query.filter(ReplySegment.max_tweet_id >= tweet_id_min)
+        if tweet_id_max is not None:
+            query = query.filter(ReplySegment.min_tweet_id <= tweet_id_max)
+        if since_ts is not None:
+            query = query.filter(ReplySegment.max_created_at >= since_ts)
+        if until_ts is not None:
+            query = query.filter(ReplySegment.min_created_at <= until_ts)
+
+        chunks: List[Dict[str, np.ndarray]] = []
+        for segment in query.order_by(ReplySegment.min_tweet_id, ReplySegment.id):
+            columns = self._read(segment.path)
+            mask = np.ones(segment.rows, dtype=bool)
+            if tweet_id_min is not None:
+                mask &= columns["tweet_id"] >= tweet_id_min
+            if tweet_id_max is not None:
+                mask &= columns["tweet_id"] <= tweet_id_max
+            if since_ts is not None:
+                mask &= columns["created_at"] >= since_ts
+            if until_ts is not None:
+                mask &= columns["created_at"] <= until_ts
+            chunks.append({name: values[mask] for name, values in columns.items()})
+        return self._concat(chunks)
+
+    def _concat(self, chunks: Sequence[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        if not chunks:
+            return {
+                name: np.empty(0, dtype=np.float64 if scale is not None else dtype)
+                for name, dtype, _, scale in COLUMNS
+            }
+        return {name: np.concatenate([chunk[name] for chunk in chunks]) for name, _, _, _ in COLUMNS}
+
+    def to_arrow(self, columns: Dict[str, np.ndarray]):
+        """
+        Convert scanned columns to a pyarrow Table (requires pyarrow).
+        """
+        if pa is None:
+            raise RuntimeError("pyarrow is required for Arrow/Parquet export")
+        arrays = {}
+        for name, values in columns.items():
+            if name == "created_at":
+                arrays[name] = pa.array(values, type=pa.timestamp("s", tz="UTC"))
+            elif name in RISK_FACTORS:
+                arrays[name] = pa.array(values.astype(np.float32))
+            else:
+                arrays[name] = pa.array(values)
+        return pa.table(arrays)
+
+    def export(self, columns: Dict[str, np.ndarray], format: str = "parquet") -> bytes:
+        """
+        Serialize scanned columns as Parquet or an Arrow IPC file.
+        """
+        table = self.to_arrow(columns)
+        buffer = io.BytesIO()
+        if format == "parquet":
+            pq.write_table(table, buffer, compression="zstd")
+        elif format == "arrow":
+            with pa.ipc.new_file(buffer, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            raise ValueError(f"Unsupported export format: {format}")
+        return buffer.getvalue()
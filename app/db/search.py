@@ -0,0 +1,113 @@
+import re
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+FTS_TABLE = "analyses_fts"
+
+# Notable quotes and keywords are stored as JSON on analyses; the index holds
+# their flattened text so matches are not polluted by JSON keys.
+_QUOTES_TEXT = "(SELECT group_concat(json_extract(value, '$.text'), ' ') FROM json_each({row}.notable_quotes))"
+_KEYWORDS_TEXT = "(SELECT group_concat(key, ' ') FROM json_each({row}.keywords))"
+
+_INDEX_ROW = (
+    f"INSERT INTO {FTS_TABLE}(rowid, original_text, notable_quotes, keywords) "
+    f"VALUES (new.id, new.original_text, {_QUOTES_TEXT.format(row='new')}, {_KEYWORDS_TEXT.format(row='new')});"
+)
+
+_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        original_text, notable_quotes, keywords,
+        tokenize = 'porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS analyses_fts_insert AFTER INSERT ON analyses BEGIN
+        {_INDEX_ROW}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS analyses_fts_delete AFTER DELETE ON analyses BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS analyses_fts_update AFTER UPDATE ON analyses BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        {_INDEX_ROW}
+    END
+    """,
+]
+
+_BACKFILL = (
+    f"INSERT INTO {FTS_TABLE}(rowid, original_text, notable_quotes, keywords) "
+    f"SELECT a.id, a.original_text, {_QUOTES_TEXT.format(row='a')}, {_KEYWORDS_TEXT.format(row='a')} "
+    f"FROM analyses a WHERE a.id NOT IN (SELECT rowid FROM {FTS_TABLE})"
+)
+
+
+def init_search_index(engine: Engine) -> None:
+    """
+    Create the FTS5 index over analyses and the triggers that keep it in sync,
+    indexing any rows written before the index existed.
+    """
+    with engine.begin() as conn:
+        for statement in _SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text(_BACKFILL))
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression: every word must match,
+    as a prefix, in any indexed column.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_analyses(db: Session, query: str, limit: int = 20, offset: int = 0) -> Tuple[int, List[Dict]]:
+    """
+    Search analyses by tweet text, notable quotes and keywords.
+    Returns a tuple of (total_matches, ranked page of hits).
+    """
+    match = build_match_query(query)
+    if not match:
+        return 0, []
+
+    total = db.execute(
+        text(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"),
+        {"match": match}
+    ).scalar()
+
+    rows = db.execute(
+        text(
+            f"""
+            SELECT a.id, a.tweet_id, a.date, a.original_text,
+                   bm25({FTS_TABLE}, 1.0, 0.6, 0.3) AS rank,
+                   snippet({FTS_TABLE}, -1, '**', '**', '...', 16) AS snippet
+            FROM {FTS_TABLE}
+            JOIN analyses a ON a.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH :match
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+            """
+        ),
+        {"match": match, "limit": limit, "offset": offset}
+    ).fetchall()
+
+    hits = [
+        {
+            "id": row.id,
+            "tweet_id": row.tweet_id,
+            "date": str(row.date),
+            "original_text": row.original_text,
+            "snippet": row.snippet,
+            "score": -row.rank
+        }
+        for row in rows
+    ]
+    return total, hits
@@ -1,24 +1,47 @@
 from fastapi import FastAPI, Request, Form, HTTPException, Depends
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import (
+    FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, RedirectResponse, Response, StreamingResponse
+)
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
+from markupsafe import Markup
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 import tweepy
 import asyncio
 import json
-from datetime import datetime
-from typing import Dict, List
+import time
+import numpy as np
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote
 import os
 import logging
 from tweepy import errors as tweepy_errors
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.cors import CORSMiddleware
 
+from app.core.assets import STATIC_DIR, AssetManifest, CachedStaticFiles, directory_hash
 from app.core.config import get_settings
-from app.db.models import get_db, Analysis
+from app.core.metrics import (
+    CACHE_REQUESTS, HTTP_REQUEST_DURATION, RATE_LIMIT_WAITS, STREAM_EVENTS, count_log_messages, registry, timed
+)
+from app.db.models import get_db, Analysis, SessionLocal, REPLY_SEGMENTS_DIR, SHARED_CACHE_PATH
+from app.db.reply_store import ReplyStore, thread_columns
+from app.db.search import search_analyses
 from app.services.sentiment import SentimentAnalyzer
 from app.services.bot_detection import BotDetector
 from app.services.grok_ai import GrokAI
+from app.services.jobs import AnalysisJobManager, is_local_callback_url
+from app.services.cache import AnalysisCache, ChangeMarker, SharedCache, TTLCache
+from app.services.coordination import CoordinationGraph
+from app.services.ingest import StreamIngestor
+from app.services.outbox import ReplyOutbox
+from app.services.progression import lttb
+from app.services.sampling import ApproximateAnalyzer
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -46,6 +69,27 @@ app.add_middleware(
     https_only=True if not settings.DEBUG else False  # Force HTTPS in production
 )
 
+# Record request latency per route
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template or endpoint, never by raw path, to bound cardinality
+    route = request.scope.get("route")
+    endpoint = request.scope.get("endpoint")
+    route_label = getattr(route, "path", None) or getattr(endpoint, "__name__", None) or "unmatched"
+    HTTP_REQUEST_DURATION.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=route_label,
+        status=response.status_code
+    )
+    return response
+
+# Count tweepy's internal rate-limit sleeps; tweepy.API logs "Rate limit
+# reached. Sleeping for: ..." and tweepy.Client "Rate limit exceeded. Sleeping for ..."
+count_log_messages("tweepy", "Sleeping for", RATE_LIMIT_WAITS, api="x")
+
 # Helper function to get current user
 def get_current_user(request: Request):
     """
@@ -53,19 +97,46 @@ def get_current_user(request: Request):
     """
     return request.session.get("user")
 
-# Create event loop for async operations
-loop = asyncio.new_event_loop()
-asyncio.set_event_loop(loop)
-
 # Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
+assets = AssetManifest(STATIC_DIR, url_prefix="/static")
 
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["static_url"] = assets.url
+# Changes whenever a template or asset does, so cached pages and ETags follow deploys
+page_version = directory_hash("app/templates", STATIC_DIR)
 
 # Initialize services
-sentiment_analyzer = SentimentAnalyzer()
+shared_cache = SharedCache(
+    SHARED_CACHE_PATH,
+    max_entries=get_settings().SHARED_CACHE_MAX_ENTRIES,
+    max_bytes=get_settings().SHARED_CACHE_MAX_BYTES
+) if get_settings().SHARED_CACHE_ENABLED else None
+sentiment_analyzer = SentimentAnalyzer(
+    progression_points=get_settings().SENTIMENT_PROGRESSION_POINTS,
+    score_cache=shared_cache,
+    score_cache_ttl=get_settings().SENTIMENT_CACHE_TTL
+)
 bot_detector = BotDetector()
 grok_ai = GrokAI()
+reply_store = ReplyStore(REPLY_SEGMENTS_DIR)
+approximate_analyzer = ApproximateAnalyzer(
+    sentiment_analyzer,
+    bot_detector,
+    ci_half_width=get_settings().APPROXIMATE_CI_HALF_WIDTH,
+    confidence=get_settings().APPROXIMATE_CONFIDENCE,
+    min_sample=get_settings().APPROXIMATE_MIN_SAMPLE
+)
+coordination_graph = CoordinationGraph(
+    window_seconds=get_settings().COORDINATION_WINDOW_SECONDS,
+    min_weight=get_settings().COORDINATION_MIN_WEIGHT,
+    max_thread_pairs=get_settings().COORDINATION_MAX_THREAD_PAIRS,
+    max_age_days=get_settings().COORDINATION_MAX_AGE_DAYS
+)
+
+# Streaming analysis tuning
+STREAM_CHUNK_SIZE = 25
+STREAM_KEEPALIVE_SECONDS = 10
 
 # X API setup - Move inside a function to avoid startup errors
 def get_api_client():
@@ -134,20 +205,84 @@ def get_stream():
         get_stream.stream = stream
     return get_stream.stream
 
+def get_username(user_id) -> Optional[str]:
+    """
+    Username for a user ID, shared across workers through the shared cache.
+    """
+    key = f"user:{user_id}"
+    if shared_cache is not None:
+        username = shared_cache.get(key)
+        if username is not None:
+            CACHE_REQUESTS.inc(cache="user_profile", result="shared_hit")
+            return username
+    user = get_client().get_user(id=user_id)
+    if not user or not user.data:
+        return None
+    CACHE_REQUESTS.inc(cache="user_profile", result="miss")
+    if shared_cache is not None:
+        shared_cache.set(key, user.data.username, ttl=get_settings().USER_PROFILE_CACHE_TTL)
+    return user.data.username
+
+def handle_mention(tweet):
+    """
+    Process one buffered stream tweet on an ingestion worker thread.
+    """
+    # Use v2 API to check mentions
+    username = get_username(tweet.author_id)
+    if username and f"@{username}" in tweet.text:
+        # Workers have no running event loop of their own
+        asyncio.run(analyze_and_reply(tweet.id, getattr(tweet, "conversation_id", None)))
+
+def deliver_reply(reply):
+    """
+    Post a queued reply; errors propagate so the outbox can retry or give up.
+    """
+    api = get_api_client()
+    if not api:
+        raise RuntimeError("API client not available")
+    api.update_status(
+        status=reply.text,
+        in_reply_to_status_id=reply.in_reply_to,
+        auto_populate_reply_metadata=True
+    )
+
+def get_reply_outbox() -> ReplyOutbox:
+    if not hasattr(get_reply_outbox, 'outbox'):
+        settings = get_settings()
+        get_reply_outbox.outbox = ReplyOutbox(
+            SessionLocal,
+            deliver_reply,
+            rate_per_hour=settings.REPLY_RATE_PER_HOUR,
+            burst=settings.REPLY_BURST,
+            max_attempts=settings.REPLY_MAX_ATTEMPTS
+        )
+    return get_reply_outbox.outbox
+
+def get_mention_ingestor() -> StreamIngestor:
+    if not hasattr(get_mention_ingestor, 'ingestor'):
+        settings = get_settings()
+        get_mention_ingestor.ingestor = StreamIngestor(
+            handle_mention,
+            name="mentions",
+            capacity=settings.STREAM_BUFFER_SIZE,
+            dedupe_window=settings.STREAM_DEDUPE_WINDOW,
+            workers=settings.STREAM_WORKERS,
+            backoff_base=settings.STREAM_BACKOFF_BASE,
+            backoff_cap=settings.STREAM_BACKOFF_MAX
+        )
+    return get_mention_ingestor.ingestor
+
 # Only start stream in development
 if not os.environ.get('VERCEL_ENV'):
     def start_stream():
-        while True:
-            try:
-                stream = get_stream()
-                stream.filter(tweet_fields=["referenced_tweets", "author_id", "text"])
-            except Exception as e:
-                logger.error(f"Stream error: {e}")
-                continue
+        ingestor = get_mention_ingestor()
+        ingestor.start()
+        ingestor.run(lambda: get_stream().filter(tweet_fields=["referenced_tweets", "author_id", "text", "conversation_id"]))
     
-    # Start stream in background
+    # Start stream and reply sender in background
     import threading
     threading.Thread(target=start_stream, daemon=True).start()
+    threading.Thread(target=lambda: get_reply_outbox().run(), daemon=True).start()
     logger.info("Stream listener started successfully")
 
 # OAuth routes
@@ -308,114 +443,767 @@ async def callback(request: Request, oauth_token: str = None, oauth_verifier: st
 class TweetStream(tweepy.StreamingClient):
     def __init__(self, bearer_token, **kwargs):
         super().__init__(bearer_token, **kwargs)
-        self.client = get_client()  # Store v2 client reference
+        self.ingestor = get_mention_ingestor()
 
     def on_tweet(self, tweet):
-        # Use v2 API to check mentions
-        try:
-            author = tweet.author_id
-            user = self.client.get_user(id=author)
-            if user and f"@{user.data.username}" in tweet.text:
-                asyncio.run_coroutine_threadsafe(analyze_and_reply(tweet.id), loop)
-        except Exception as e:
-            print(f"Error in on_tweet: {e}")
+        # Only enqueue; processing happens on ingestion workers so a burst of
+        # mentions never stalls reading the connection
+        self.ingestor.offer(tweet.id, tweet)
 
     def on_error(self, status_code):
+        STREAM_EVENTS.inc(stream="mentions", event="error")
         print(f"Stream Error: {status_code}")
         if status_code == 420:  # Rate limit
             return False
         return True
 
-async def analyze_thread(api, tweet_id: str) -> Dict:
+def reply_data(tweet) -> Dict:
     """
-    Analyze a thread including the original tweet and its replies.
+    The fields of a fetched reply the analysis uses.
     """
-    try:
+    return {
+        "id": tweet.id_str,
+        "in_reply_to": str(getattr(tweet, "in_reply_to_status_id", None) or ""),
+        "text": tweet.full_text,
+        "author": tweet.user.screen_name,
+        "created_at": tweet.created_at,
+        "likes": getattr(tweet, "favorite_count", 0) or 0,
+        "retweets": getattr(tweet, "retweet_count", 0) or 0,
+        "user": {
+            "id": tweet.user.id_str,
+            "created_at": tweet.user.created_at,
+            "statuses_count": tweet.user.statuses_count,
+            "followers_count": tweet.user.followers_count,
+            "friends_count": tweet.user.friends_count,
+            "default_profile": tweet.user.default_profile,
+            "description": tweet.user.description
+        }
+    }
+
+def link_parents(original_tweet, replies: List[Dict]) -> None:
+    """
+    Timestamps of the posts being replied to, for reply latency.
+    """
+    posted_at = {original_tweet.id_str: original_tweet.created_at}
+    posted_at.update((reply["id"], reply["created_at"]) for reply in replies)
+    for reply in replies:
+        reply["parent_created_at"] = posted_at.get(reply["in_reply_to"])
+
+def fetch_thread(api, tweet_id: str, limit: Optional[int] = None) -> Tuple[str, List[Dict]]:
+    """
+    Fetch the original tweet text and up to limit replies (THREAD_REPLY_LIMIT
+    by default).
+    """
+    if limit is None:
+        limit = get_settings().THREAD_REPLY_LIMIT
+    with timed("x_fetch"):
         # Get original tweet
         original_tweet = api.get_status(tweet_id, tweet_mode="extended")
         original_text = original_tweet.full_text
-        
+    
         # Get replies
-        replies = []
-        for tweet in tweepy.Cursor(api.search_tweets,
-                                 q=f"to:{original_tweet.user.screen_name}",
-                                 since_id=tweet_id,
-                                 tweet_mode="extended").items(100):
-            reply_data = {
-                "text": tweet.full_text,
-                "author": tweet.user.screen_name,
-                "created_at": tweet.created_at,
-                "user": {
-                    "created_at": tweet.user.created_at,
-                    "statuses_count": tweet.user.statuses_count,
-                    "followers_count": tweet.user.followers_count,
-                    "friends_count": tweet.user.friends_count,
-                    "default_profile": tweet.user.default_profile,
-                    "description": tweet.user.description
-                }
-            }
-            replies.append(reply_data)
-        
-        # Analyze sentiment
+        replies = [
+            reply_data(tweet)
+            for tweet in tweepy.Cursor(api.search_tweets,
+                                       q=f"to:{original_tweet.user.screen_name}",
+                                       since_id=tweet_id,
+                                       tweet_mode="extended").items(limit)
+        ]
+        link_parents(original_tweet, replies)
+    
+    return original_text, replies
+
+def fetch_thread_sample(api, tweet_id: str, limit: int, windows: int) -> Tuple[str, List[Dict], List[float]]:
+    """
+    Fetch up to limit replies spread evenly over time: the ID range from the
+    tweet to its newest reply is split into windows (IDs grow with posting
+    time), and each window is fetched with since_id/max_id up to its share.
+    Replies are tagged with their window. Returns the original text, the
+    replies and the estimated reply count of each window; a window that hit
+    its share is extrapolated from the ID span the fetched replies cover.
+    """
+    with timed("x_fetch"):
+        original_tweet = api.get_status(tweet_id, tweet_mode="extended")
+        query = f"to:{original_tweet.user.screen_name}"
+        newest = api.search_tweets(q=query, since_id=tweet_id, count=1, tweet_mode="extended")
+        if not newest:
+            return original_tweet.full_text, [], []
+
+        low, high = int(tweet_id), newest[0].id
+        bounds = [low + (high - low) * index // windows for index in range(windows)] + [high]
+        per_window = max(1, -(-limit // windows))
+        replies, window_sizes = [], []
+        for window, (since_id, max_id) in enumerate(zip(bounds, bounds[1:])):
+            if max_id <= since_id:
+                window_sizes.append(0.0)
+                continue
+            fetched = [
+                {**reply_data(tweet), "window": window}
+                for tweet in tweepy.Cursor(api.search_tweets, q=query, since_id=since_id,
+                                           max_id=max_id, tweet_mode="extended").items(per_window)
+            ]
+            size = float(len(fetched))
+            if len(fetched) == per_window:
+                # Newest first: the fetched replies cover (oldest fetched, max_id]
+                covered = max_id - int(fetched[-1]["id"]) + 1
+                size *= (max_id - since_id) / covered
+            replies.extend(fetched)
+            window_sizes.append(size)
+        link_parents(original_tweet, replies)
+
+    return original_tweet.full_text, replies, window_sizes
+
+def thread_signals(threads: Dict[str, List[Dict]]) -> Tuple[Dict[str, Dict[str, float]], List[Dict]]:
+    """
+    Thread-level bot signals for one or more threads (tweet_id -> replies):
+    near-duplicate reply clusters, reply cadence, and rings in the
+    cross-thread coordination graph, which is updated with these threads first.
+    Returns (signals per author, rings found).
+    """
+    replies = [reply for thread in threads.values() for reply in thread]
+    signals = bot_detector.coordination_signals(replies)
+    for author, author_signals in bot_detector.cadence_signals(replies).items():
+        signals.setdefault(author, {}).update(author_signals)
+
+    db = SessionLocal()
+    try:
+        for tweet_id, thread in threads.items():
+            coordination_graph.update(db, tweet_id, thread)
+        ring_signals, rings = coordination_graph.ring_signals(db, (reply["author"] for reply in replies))
+    except Exception as e:
+        # The graph is an extra signal; never fail an analysis over it
+        logger.error(f"Coordination graph unavailable: {e}")
+        db.rollback()
+        ring_signals, rings = {}, []
+    finally:
+        db.close()
+
+    for author, author_signals in ring_signals.items():
+        signals.setdefault(author, {}).update(author_signals)
+    return signals, rings
+
+def score_bots(replies: List[Dict], author_scores: Optional[Dict] = None,
+               signals: Optional[Dict[str, Dict[str, float]]] = None) -> Tuple[int, List[Dict[str, float]]]:
+    """
+    Score every reply author for bot-like behavior.
+    Pass an author_scores dict to share per-author results across threads, and
+    precomputed coordination signals when scoring a subset of a thread.
+    Returns a tuple of (bot_count, risk_factors per reply).
+    """
+    if author_scores is None:
+        author_scores = {}
+    if signals is None:
+        signals = bot_detector.coordination_signals(replies)
+    bot_count = 0
+    bot_risk_factors = []
+    for reply in replies:
+        author = reply["author"]
+        if author not in author_scores:
+            author_scores[author] = bot_detector.analyze_account(reply["user"], signals.get(author))
+        is_bot, risk_factors = author_scores[author]
+        if is_bot:
+            bot_count += 1
+        bot_risk_factors.append(risk_factors)
+    return bot_count, bot_risk_factors
+
+async def analyze_thread(api, tweet_id: str, approximate: bool = False) -> Dict:
+    """
+    Analyze a thread including the original tweet and its replies.
+    In approximate mode replies are fetched from time windows spread over
+    the thread and only a stratified sample of them is scored; percentages
+    then come with confidence intervals (see approximate_thread).
+    """
+    try:
+        # tweepy blocks (and sleeps through rate limits), so keep it off the event loop
+        return await run_in_threadpool(analyze_thread_sync, api, tweet_id, approximate)
+    except (tweepy_errors.NotFound, tweepy_errors.Forbidden) as e:
+        raise HTTPException(status_code=404, detail="Tweet not found or not accessible")
+    except tweepy_errors.TooManyRequests as e:
+        RATE_LIMIT_WAITS.inc(api="x")
+        raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later")
+    except tweepy_errors.TweepyException as e:
+        raise HTTPException(status_code=400, detail=f"Error analyzing thread: {str(e)}")
+
+def analyze_thread_sync(api, tweet_id: str, approximate: bool = False) -> Dict:
+    """
+    Blocking part of analyze_thread: fetch the thread, then score it.
+    """
+    if approximate:
+        settings = get_settings()
+        original_text, replies, window_sizes = fetch_thread_sample(
+            api, tweet_id, settings.APPROXIMATE_REPLY_LIMIT, settings.APPROXIMATE_WINDOWS
+        )
+        return approximate_thread(tweet_id, original_text, replies, window_sizes)
+
+    original_text, replies = fetch_thread(api, tweet_id)
+    
+    # Analyze sentiment
+    with timed("sentiment"):
         sentiment_stats = sentiment_analyzer.analyze_thread(replies)
-        
-        # Analyze bots
+    
+    # Analyze bots
+    with timed("bot_scoring"):
+        signals, rings = thread_signals({tweet_id: replies})
+        bot_count, bot_risk_factors = score_bots(replies, signals=signals)
+    
+    # Calculate bot percentage
+    bot_percentage = (bot_count / len(replies) * 100) if replies else 0
+    
+    # Combine all stats
+    analysis_results = {
+        "tweet_id": tweet_id,
+        "original_text": original_text,
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "total_replies": len(replies),
+        "replies": replies,
+        "sentiment_stats": sentiment_stats,
+        "bot_percentage": bot_percentage,
+        "bot_risk_factors": bot_risk_factors,
+        "coordination_rings": rings
+    }
+    
+    return analysis_results
+
+def approximate_thread(tweet_id: str, original_text: str, replies: List[Dict],
+                       window_sizes: Optional[List[float]] = None) -> Dict:
+    """
+    Approximate analysis of windowed replies (see fetch_thread_sample):
+    thread-level signals use the fetched replies, sentiment and bot scoring
+    only a stratified sample of them, weighted by the estimated window sizes.
+    """
+    with timed("bot_scoring"):
+        signals, rings = thread_signals({tweet_id: replies})
+    with timed("sampling"):
+        sample = approximate_analyzer.analyze(replies, signals, window_sizes)
+    estimates = sample["estimates"]
+
+    # Quotes, keywords and progression come from the sample; the headline
+    # percentages are the stratified estimates
+    sentiment_stats = sentiment_analyzer.analyze_thread(sample["replies"], sample["scores"])
+    sentiment_stats["percentages"] = {
+        name: estimates[name]["estimate"] for name in ("with", "against", "neutral")
+    }
+
+    return {
+        "tweet_id": tweet_id,
+        "original_text": original_text,
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "total_replies": sample["population"],
+        "replies": sample["replies"],
+        "sentiment_stats": sentiment_stats,
+        "bot_percentage": estimates["bot"]["estimate"],
+        "bot_risk_factors": sample["bot_risk_factors"],
+        "coordination_rings": rings,
+        "sample": {key: value for key, value in sample.items() if key not in ("replies", "bot_risk_factors", "scores")}
+    }
+
+def build_analysis(tweet_id: str, thread_analysis: Dict, grok_insights: Dict, enhanced_response: str) -> Analysis:
+    """
+    Build an Analysis row from a completed thread analysis.
+    """
+    sentiment_stats = thread_analysis["sentiment_stats"]
+    return Analysis(
+        tweet_id=tweet_id,
+        original_text=thread_analysis["original_text"],
+        date=datetime.now(),
+        sentiment_positive=sentiment_stats["percentages"]["with"],
+        sentiment_negative=sentiment_stats["percentages"]["against"],
+        sentiment_neutral=sentiment_stats["percentages"]["neutral"],
+        engagement_likes=sentiment_stats.get("engagement", {}).get("likes", 0),
+        engagement_replies=thread_analysis["total_replies"],
+        engagement_retweets=sentiment_stats.get("engagement", {}).get("retweets", 0),
+        grok_insights=json.dumps(grok_insights),
+        enhanced_response=enhanced_response,
+        bot_percentage=thread_analysis.get("bot_percentage", 0.0),
+        notable_quotes=json.dumps(sentiment_stats.get("notable_quotes", [])),
+        keywords=json.dumps(sentiment_stats.get("keywords", {})),
+        sentiment_progression=json.dumps(
+            sentiment_stats.get("sentiment_progression", []),
+            default=lambda value: value.isoformat()
+        ),
+        sample_size=thread_analysis["sample"]["sample_size"] if "sample" in thread_analysis else None,
+        confidence_intervals=json.dumps(thread_analysis["sample"]) if "sample" in thread_analysis else None
+    )
+
+def store_analysis(tweet_id: str, thread_analysis: Dict, grok_insights: Dict, enhanced_response: str) -> Analysis:
+    """
+    Persist a completed thread analysis.
+    """
+    return store_analyses(
+        [build_analysis(tweet_id, thread_analysis, grok_insights, enhanced_response)],
+        [thread_analysis]
+    )[0]
+
+def archive_replies(db: Session, analyses: List[Analysis], thread_analyses: List[Dict]):
+    """
+    Append the per-reply facts of flushed analyses to the reply store as one
+    segment. Returns the pending segment, or None if nothing was archived.
+    """
+    try:
+        chunks = [
+            thread_columns(analysis.tweet_id, analysis.id, thread_analysis)
+            for analysis, thread_analysis in zip(analyses, thread_analyses)
+        ]
+        columns = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+        return reply_store.append(db, columns)
+    except Exception as e:
+        # Per-reply history is a by-product; never fail an analysis over it
+        logger.error(f"Error archiving replies: {e}")
+        return None
+
+def store_analyses(analyses: List[Analysis], thread_analyses: Optional[List[Dict]] = None) -> List[Analysis]:
+    """
+    Persist several analyses in a single transaction, archiving their replies
+    when the thread analyses are given (in the same order).
+    """
+    db = next(get_db())
+    segment = None
+    try:
+        db.add_all(analyses)
+        if thread_analyses:
+            db.flush()  # Assigns analysis ids
+            with timed("reply_archive"):
+                segment = archive_replies(db, analyses, thread_analyses)
+        with timed("db_commit"):
+            db.commit()
+        for analysis in analyses:
+            db.refresh(analysis)
+            analysis_cache.invalidate(analysis.tweet_id)
+        if analyses:
+            analyses_marker.touch(max(analysis.date for analysis in analyses))
+    except Exception:
+        db.rollback()
+        reply_store.discard(segment)
+        raise
+    if segment is not None:
+        # Own session: its commits must not expire the analyses returned
+        compact_db = SessionLocal()
+        try:
+            with timed("reply_compaction"):
+                reply_store.maybe_compact(compact_db)
+        except Exception as e:
+            # Compaction only saves space; never fail an analysis over it
+            logger.error(f"Error compacting reply segments: {e}")
+        finally:
+            compact_db.close()
+    return analyses
+
+def chart_points(progression: List[Dict]) -> List[Dict]:
+    """
+    Optionally thin the bucketed progression further for the timeline chart.
+    """
+    max_points = get_settings().SENTIMENT_CHART_POINTS
+    return lttb(progression, max_points) if max_points else progression
+
+def analysis_view(analysis: Analysis, thread_analysis: Dict = None) -> Dict:
+    """
+    Build the template context for results.html from a stored analysis and,
+    when available, the full in-memory thread analysis.
+    """
+    sentiment_stats = (thread_analysis or {}).get("sentiment_stats", {})
+    stored = analysis.to_dict()
+    progression = sentiment_stats.get("sentiment_progression")
+    if progression is None:
+        progression = [
+            {**point, "timestamp": datetime.fromisoformat(point["timestamp"])}
+            for point in stored["sentiment_progression"]
+        ]
+    return {
+        "id": analysis.id,
+        "tweet_id": analysis.tweet_id,
+        "date": analysis.date,
+        "original_text": analysis.original_text,
+        "total_replies": (thread_analysis or {}).get("total_replies", analysis.engagement_replies or 0),
+        "bot_percentage": analysis.bot_percentage or 0.0,
+        "sample": stored["confidence_intervals"],
+        "sentiment_stats": {
+            "percentages": {
+                "with": analysis.sentiment_positive or 0.0,
+                "against": analysis.sentiment_negative or 0.0,
+                "neutral": analysis.sentiment_neutral or 0.0
+            },
+            "notable_quotes": sentiment_stats.get("notable_quotes", stored["notable_quotes"]),
+            "keywords": sentiment_stats.get("keywords", stored["keywords"]),
+            "sentiment_progression": [
+                {
+                    **point,
+                    "timestamp": point["timestamp"].isoformat() if isinstance(point["timestamp"], datetime) else point["timestamp"]
+                }
+                for point in chart_points(progression)
+            ]
+        }
+    }
+
+def _sse_event(event: str, data: Dict) -> str:
+    """
+    Format a Server-Sent Events message.
+    """
+    STREAM_EVENTS.inc(stream="sse", event=event)
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def stream_analysis(tweet_id: str) -> AsyncIterator[str]:
+    """
+    Run the analysis pipeline for a tweet, yielding SSE messages with partial
+    aggregates as each stage completes.
+    """
+    api_client = get_api_client()
+    if not api_client:
+        yield _sse_event("error", {"status_code": 401, "detail": "API client not available"})
+        return
+
+    try:
+        yield _sse_event("status", {"stage": "fetching"})
+        # tweepy is blocking, keep it off the event loop
+        original_text, replies = await run_in_threadpool(fetch_thread, api_client, tweet_id)
+        yield _sse_event("replies", {"original_text": original_text, "total_replies": len(replies)})
+
+        # Running sentiment percentages; each chunk is scored in a worker thread
+        sentiment_stats = None
+        chunks = iterate_in_threadpool(sentiment_analyzer.iter_thread(replies, chunk_size=STREAM_CHUNK_SIZE))
+        async for processed, stats in chunks:
+            percentages = stats.get("percentages", stats)
+            yield _sse_event("sentiment", {
+                "processed": processed,
+                "total_replies": len(replies),
+                "percentages": percentages
+            })
+            sentiment_stats = stats
+
+        # Running bot percentage
         bot_count = 0
         bot_risk_factors = []
-        for reply in replies:
-            is_bot, risk_factors = bot_detector.analyze_account(reply["user"])
-            if is_bot:
-                bot_count += 1
-            bot_risk_factors.append(risk_factors)
-        
-        # Calculate bot percentage
+        author_scores = {}
+        signals, rings = await run_in_threadpool(thread_signals, {tweet_id: replies})
+        for start in range(0, len(replies), STREAM_CHUNK_SIZE):
+            chunk_bots, chunk_factors = await run_in_threadpool(
+                score_bots, replies[start:start + STREAM_CHUNK_SIZE], author_scores, signals
+            )
+            bot_count += chunk_bots
+            bot_risk_factors.extend(chunk_factors)
+            yield _sse_event("bots", {
+                "processed": len(bot_risk_factors),
+                "bot_percentage": bot_count / len(bot_risk_factors) * 100
+            })
         bot_percentage = (bot_count / len(replies) * 100) if replies else 0
-        
-        # Combine all stats
-        analysis_results = {
+
+        thread_analysis = {
             "tweet_id": tweet_id,
             "original_text": original_text,
             "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "total_replies": len(replies),
+            "replies": replies,
             "sentiment_stats": sentiment_stats,
             "bot_percentage": bot_percentage,
-            "bot_risk_factors": bot_risk_factors
+            "bot_risk_factors": bot_risk_factors,
+            "coordination_rings": rings
         }
-        
-        return analysis_results
-        
-    except (tweepy_errors.NotFound, tweepy_errors.Forbidden) as e:
-        raise HTTPException(status_code=404, detail="Tweet not found or not accessible")
-    except tweepy_errors.TooManyRequests as e:
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later")
-    except tweepy_errors.TweepyException as e:
-        raise HTTPException(status_code=400, detail=f"Error analyzing thread: {str(e)}")
 
-async def post_reply(api, tweet_id: str, response_text: str):
+        # Grok calls can take a while; keep the connection alive meanwhile
+        yield _sse_event("status", {"stage": "insights"})
+        grok_client = GrokAI()
+        insights_task = asyncio.ensure_future(asyncio.gather(
+            grok_client.analyze_thread(original_text, replies),
+            grok_client.enhance_response(sentiment_stats, thread_analysis.get("tone", "neutral"))
+        ))
+        while True:
+            done, _ = await asyncio.wait({insights_task}, timeout=STREAM_KEEPALIVE_SECONDS)
+            if done:
+                break
+            yield ": keep-alive\n\n"
+        grok_insights, enhanced_response = insights_task.result()
+        yield _sse_event("insights", {
+            "grok_insights": grok_insights,
+            "enhanced_response": enhanced_response
+        })
+
+        analysis = await run_in_threadpool(
+            store_analysis, tweet_id, thread_analysis, grok_insights, enhanced_response
+        )
+        view = analysis_view(analysis, thread_analysis)
+        yield _sse_event("complete", {
+            "analysis_id": analysis.id,
+            "date": analysis.date.isoformat(),
+            "notable_quotes": view["sentiment_stats"]["notable_quotes"],
+            "keywords": view["sentiment_stats"]["keywords"],
+            "sentiment_progression": view["sentiment_stats"]["sentiment_progression"]
+        })
+        logger.info(f"Streamed analysis for tweet {tweet_id} completed")
+
+    except (tweepy_errors.NotFound, tweepy_errors.Forbidden):
+        yield _sse_event("error", {"status_code": 404, "detail": "Tweet not found or not accessible"})
+    except tweepy_errors.TooManyRequests:
+        yield _sse_event("error", {"status_code": 429, "detail": "Rate limit exceeded. Please try again later"})
+    except Exception as e:
+        logger.error(f"Error in stream_analysis: {e}")
+        yield _sse_event("error", {"status_code": 500, "detail": f"An unexpected error occurred: {str(e)}"})
+
+async def perform_analysis(api, tweet_id: str, approximate: bool = False) -> Dict:
+    """
+    Run the full analysis pipeline for a tweet and store the result.
+    """
+    # Get thread analysis
+    thread_analysis = await analyze_thread(api, tweet_id, approximate)
+    logger.info("Thread analysis completed")
+    
+    # Get Grok insights
+    grok_client = GrokAI()
+    grok_insights = await grok_client.analyze_thread(
+        thread_analysis["original_text"],
+        thread_analysis.get("replies", [])
+    )
+    logger.info("Grok analysis completed")
+    
+    # Generate enhanced response
+    enhanced_response = await grok_client.enhance_response(
+        thread_analysis["sentiment_stats"],
+        thread_analysis.get("tone", "neutral")
+    )
+    logger.info("Response enhancement completed")
+    
+    # Store in database
+    analysis = await run_in_threadpool(store_analysis, tweet_id, thread_analysis, grok_insights, enhanced_response)
+    logger.info("Analysis stored in database")
+    
+    return {
+        "analysis": analysis,
+        "thread_analysis": thread_analysis,
+        "grok_insights": grok_insights,
+        "enhanced_response": enhanced_response,
+        "cache_entry": analysis_cache.put(analysis, thread_analysis)
+    }
+
+async def run_analysis_job(tweet_id: str) -> Dict:
     """
-    Post a reply with analysis results.
+    Background job runner: analyze a tweet and return the stored analysis.
     """
+    api = get_api_client()
+    if not api:
+        raise HTTPException(status_code=503, detail="API client not available")
+    result = await perform_analysis(api, tweet_id)
+    return result["analysis"].to_dict()
+
+analysis_cache = AnalysisCache(
+    analysis_view,
+    max_age=get_settings().ANALYSIS_CACHE_MAX_AGE,
+    max_entries=get_settings().ANALYSIS_CACHE_ENTRIES,
+    shared=shared_cache,
+    revalidate_after=get_settings().ANALYSIS_CACHE_REVALIDATE_AFTER
+)
+
+def latest_analysis_date() -> Optional[datetime]:
+    db = SessionLocal()
     try:
-        # Post reply
-        api.update_status(
-            status=response_text,
-            in_reply_to_status_id=tweet_id,
-            auto_populate_reply_metadata=True
+        return db.query(func.max(Analysis.date)).scalar()
+    finally:
+        db.close()
+
+# Bumped on every insert so list pages can answer conditional requests without a query
+analyses_marker = ChangeMarker("analyses", latest_analysis_date, shared=shared_cache)
+
+# Rendered HTML: history rows by analysis ID (rows never change once
+# inserted) and whole list pages by analyses_marker
+fragment_cache = TTLCache(max_entries=get_settings().FRAGMENT_CACHE_ENTRIES, ttl=86400)
+
+def render_fragment(template_name: str, key, **context) -> Markup:
+    """
+    Render a template once per key and page_version.
+    """
+    cache_key = (template_name, page_version, key)
+    html = fragment_cache.get(cache_key)
+    if html is not None:
+        CACHE_REQUESTS.inc(cache="fragment", result="memory_hit")
+        return html
+    CACHE_REQUESTS.inc(cache="fragment", result="miss")
+    with timed("template_render"):
+        html = Markup(templates.get_template(template_name).render(**context))
+    fragment_cache.set(cache_key, html)
+    return html
+
+def history_row(analysis: Analysis) -> Dict:
+    """
+    Row data for the analysis history table (and its CSV export).
+    """
+    return {
+        "id": analysis.id,
+        "date": analysis.date.strftime('%Y-%m-%d %H:%M:%S') if analysis.date else "",
+        "original_text": analysis.original_text or "",
+        "with_pct": analysis.sentiment_positive or 0.0,
+        "against_pct": analysis.sentiment_negative or 0.0,
+        "neutral_pct": analysis.sentiment_neutral or 0.0,
+        "total_replies": analysis.engagement_replies or 0,
+        "bot_pct": analysis.bot_percentage or 0.0
+    }
+
+def viewer_key(request: Request) -> str:
+    """
+    Short stable token for the signed-in user, for per-user ETags.
+    """
+    user = get_current_user(request)
+    if not user:
+        return "anon"
+    return hashlib.sha1(json.dumps(user, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when no ETag was sent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return http_time(last_modified) <= since
+    return False
+
+def http_time(value: datetime) -> datetime:
+    # Stored dates are naive local time; HTTP dates are whole seconds in UTC
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(http_time(last_modified), usegmt=True)
+    return headers
+
+analysis_jobs = AnalysisJobManager(
+    run_analysis_job,
+    SessionLocal,
+    max_workers=get_settings().ANALYSIS_WORKERS,
+    max_jobs=get_settings().ANALYSIS_JOB_RETENTION,
+    stale_after=get_settings().ANALYSIS_JOB_STALE_AFTER
+)
+
+def score_batch(threads: Dict[str, Tuple[str, List[Dict]]]) -> Tuple[Dict[str, Dict], Dict, Dict, List[Dict]]:
+    """
+    Blocking part of analyze_batch: score fetched threads (tweet_id ->
+    (original_text, replies)), sharing sentiment and bot scores between them.
+    Returns (thread analyses, scores by text, scores by author, rings found).
+    """
+    # One sentiment pass over every distinct reply text in the batch
+    with timed("sentiment"):
+        scores = sentiment_analyzer.score_texts(
+            reply["text"] for _, replies in threads.values() for reply in replies
         )
-        
+
+    # Shared per-author bot scores; coordination is detected across the batch
+    author_scores = {}
+    with timed("bot_scoring"):
+        signals, rings = thread_signals({tweet_id: replies for tweet_id, (_, replies) in threads.items()})
+    thread_analyses = {}
+    for tweet_id, (original_text, replies) in threads.items():
+        with timed("bot_scoring"):
+            bot_count, bot_risk_factors = score_bots(replies, author_scores, signals)
+        thread_analyses[tweet_id] = {
+            "tweet_id": tweet_id,
+            "original_text": original_text,
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "total_replies": len(replies),
+            "replies": replies,
+            "sentiment_stats": sentiment_analyzer.analyze_thread(replies, scores),
+            "bot_percentage": (bot_count / len(replies) * 100) if replies else 0,
+            "bot_risk_factors": bot_risk_factors
+        }
+    return thread_analyses, scores, author_scores, rings
+
+async def analyze_batch(api, tweet_ids: List[str], include_insights: bool = True) -> Dict:
+    """
+    Analyze several threads at once, sharing work between them: conversations
+    are fetched concurrently, each distinct reply text is scored once, each
+    distinct author is bot-scored once, and all rows are inserted in a single
+    transaction.
+    """
+    settings = get_settings()
+    fetch_slots = asyncio.Semaphore(settings.BATCH_FETCH_CONCURRENCY)
+
+    async def fetch(tweet_id: str):
+        async with fetch_slots:
+            try:
+                return await run_in_threadpool(fetch_thread, api, tweet_id)
+            except (tweepy_errors.NotFound, tweepy_errors.Forbidden):
+                return HTTPException(status_code=404, detail="Tweet not found or not accessible")
+            except tweepy_errors.TooManyRequests:
+                return HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later")
+            except tweepy_errors.TweepyException as e:
+                return HTTPException(status_code=400, detail=f"Error analyzing thread: {str(e)}")
+
+    fetched = await asyncio.gather(*(fetch(tweet_id) for tweet_id in tweet_ids))
+
+    threads = {}
+    errors = {}
+    for tweet_id, outcome in zip(tweet_ids, fetched):
+        if isinstance(outcome, HTTPException):
+            errors[tweet_id] = {"status_code": outcome.status_code, "detail": outcome.detail}
+        else:
+            threads[tweet_id] = outcome
+
+    # Scoring is CPU-bound and the graph update writes to SQLite; keep both off the event loop
+    thread_analyses, scores, author_scores, rings = await run_in_threadpool(score_batch, threads)
+
+    async def insights(thread_analysis: Dict):
+        if not include_insights:
+            return None, None
+        grok_client = GrokAI()
+        return await asyncio.gather(
+            grok_client.analyze_thread(thread_analysis["original_text"], thread_analysis["replies"]),
+            grok_client.enhance_response(thread_analysis["sentiment_stats"], thread_analysis.get("tone", "neutral"))
+        )
+
+    grok_results = await asyncio.gather(*(insights(ta) for ta in thread_analyses.values()))
+
+    rows = [
+        build_analysis(tweet_id, thread_analysis, grok_insights, enhanced_response)
+        for (tweet_id, thread_analysis), (grok_insights, enhanced_response)
+        in zip(thread_analyses.items(), grok_results)
+    ]
+    stored = await run_in_threadpool(store_analyses, rows, list(thread_analyses.values())) if rows else []
+    stored_by_tweet = {analysis.tweet_id: analysis for analysis in stored}
+
+    results = []
+    for tweet_id in tweet_ids:
+        if tweet_id in errors:
+            results.append({"tweet_id": tweet_id, "status": "failed", "error": errors[tweet_id]})
+        else:
+            results.append({
+                "tweet_id": tweet_id,
+                "status": "completed",
+                "analysis": stored_by_tweet[tweet_id].to_dict()
+            })
+
+    return {
+        "results": results,
+        "stats": {
+            "threads": len(thread_analyses),
+            "failed": len(errors),
+            "replies": sum(ta["total_replies"] for ta in thread_analyses.values()),
+            "unique_texts": len(scores),
+            "unique_authors": len(author_scores),
+            "coordination_rings": len(rings)
+        }
+    }
+
+async def post_reply(tweet_id: str, response_text: str, conversation_id: Optional[str] = None):
+    """
+    Queue a reply with analysis results. The outbox posts it within the write
+    budget, replacing any reply still queued for the same conversation.
+    """
+    try:
+        outbox = get_reply_outbox()
+        await run_in_threadpool(outbox.enqueue, str(conversation_id or tweet_id), str(tweet_id), response_text)
+        if os.environ.get('VERCEL_ENV'):
+            # No background sender on serverless; send what the budget allows now
+            await run_in_threadpool(outbox.deliver_due)
         return response_text
-        
-    except tweepy_errors.Forbidden as e:
-        logger.error(f"Permission error posting reply: {e}")
-        return None
-    except tweepy_errors.TooManyRequests as e:
-        logger.error("Rate limit exceeded when posting reply")
-        return None
-    except tweepy_errors.TweepyException as e:
-        logger.error(f"Error posting reply: {e}")
+    except Exception as e:
+        logger.error(f"Error queueing reply: {e}")
         return None
 
-async def analyze_and_reply(tweet_id: str):
+async def analyze_and_reply(tweet_id: str, conversation_id: Optional[str] = None):
     """
     Analyze a tweet and post a reply.
     """
@@ -424,50 +1212,26 @@ async def analyze_and_reply(tweet_id: str):
         if not api:
             raise HTTPException(status_code=503, detail="API client not available")
 
-        # Get thread analysis
-        thread_analysis = await analyze_thread(api, tweet_id)
-        
-        # Get Grok insights
-        grok_client = GrokAI()
-        grok_insights = await grok_client.analyze_thread(
-            thread_analysis["original_text"],
-            thread_analysis.get("replies", [])
-        )
-        
-        # Generate enhanced response
-        enhanced_response = await grok_client.enhance_response(
-            thread_analysis["sentiment_stats"],
-            thread_analysis.get("tone", "neutral")
-        )
-        
-        # Store in database
-        analysis = Analysis(
-            tweet_id=tweet_id,
-            original_text=thread_analysis["original_text"],
-            date=datetime.now(),
-            sentiment_positive=thread_analysis["sentiment_stats"]["percentages"]["with"],
-            sentiment_negative=thread_analysis["sentiment_stats"]["percentages"]["against"],
-            sentiment_neutral=thread_analysis["sentiment_stats"]["percentages"]["neutral"],
-            engagement_likes=thread_analysis["sentiment_stats"].get("engagement", {}).get("likes", 0),
-            engagement_replies=thread_analysis["sentiment_stats"].get("engagement", {}).get("replies", 0),
-            engagement_retweets=thread_analysis["sentiment_stats"].get("engagement", {}).get("retweets", 0),
-            grok_insights=json.dumps(grok_insights),
-            enhanced_response=enhanced_response,
-            bot_percentage=thread_analysis.get("bot_percentage", 0.0)
-        )
-        
-        db = next(get_db())
-        db.add(analysis)
-        db.commit()
-        db.refresh(analysis)
+        result = await perform_analysis(api, tweet_id)
+        enhanced_response = result["enhanced_response"]
         
-        # Post the enhanced response
-        await post_reply(api, tweet_id, enhanced_response)
-        logger.info(f"Successfully analyzed and replied to tweet {tweet_id}")
+        # Queue the enhanced response
+        await post_reply(tweet_id, enhanced_response, conversation_id)
+        logger.info(f"Successfully analyzed and queued reply to tweet {tweet_id}")
         
     except Exception as e:
         logger.error(f"Error in analyze_and_reply: {e}")
 
+# Browsers request these from the site root regardless of the <link> tags
+@app.get("/favicon.ico", include_in_schema=False)
+@app.get("/favicon.png", include_in_schema=False)
+async def favicon():
+    return FileResponse(
+        os.path.join(STATIC_DIR, "img", "favicon.png"),
+        media_type="image/png",
+        headers={"Cache-Control": "public, max-age=86400"}
+    )
+
 # Webapp routes
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -491,6 +1255,12 @@ async def dashboard(request: Request):
     """
     Render dashboard page.
     """
+    last_modified = analyses_marker.get()
+    etag = f'"dashboard-{page_version}-{viewer_key(request)}-{last_modified.timestamp() if last_modified else 0}"'
+    headers = validator_headers(etag, last_modified)
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
     # Mock data for initial implementation
     stats = {
         "total_analyses": 0,
@@ -517,7 +1287,7 @@ async def dashboard(request: Request):
         "sentiment_negative": sentiment_negative,
         "engagement_dates": engagement_dates,
         "engagement_rates": engagement_rates
-    })
+    }, headers=headers)
 
 @app.get("/settings", response_class=HTMLResponse)
 async def settings(request: Request):
@@ -536,73 +1306,54 @@ async def settings(request: Request):
     })
 
 @app.post("/analyze")
-async def analyze(request: Request, tweet_id: str = Form(...)):
+async def analyze(request: Request, tweet_id: str = Form(...), force_refresh: bool = Form(False),
+                  approximate: bool = Form(False), db: Session = Depends(get_db)):
     try:
-        logging.info(f"Starting analysis for tweet {tweet_id}")
-        
-        # Initialize clients
-        api_client = get_api_client()
-        grok_client = GrokAI()
+        # Serve a recent stored analysis unless a refresh is requested; an
+        # exact request is never answered with a sampled result
+        entry = None
+        if not force_refresh:
+            entry = await run_in_threadpool(analysis_cache.get, db, tweet_id, exact_only=not approximate)
+        cache_status = "HIT" if entry else "MISS"
         
-        if not api_client:
-            raise HTTPException(status_code=401, detail="API client not available")
+        if entry:
+            logging.info(f"Serving cached analysis {entry['id']} for tweet {tweet_id}")
+        else:
+            logging.info(f"Starting analysis for tweet {tweet_id}")
             
-        # Analyze thread
-        thread_analysis = await analyze_thread(api_client, tweet_id)
-        logging.info("Thread analysis completed")
-        
-        # Get Grok insights
-        grok_insights = await grok_client.analyze_thread(
-            thread_analysis["original_text"],
-            thread_analysis.get("replies", [])  # Use get() with default empty list
-        )
-        logging.info("Grok analysis completed")
-        
-        # Generate enhanced response
-        enhanced_response = await grok_client.enhance_response(
-            thread_analysis["sentiment_stats"],
-            thread_analysis.get("tone", "neutral")
-        )
-        logging.info("Response enhancement completed")
-        
-        # Store analysis in database
-        analysis = Analysis(
-            tweet_id=tweet_id,
-            original_text=thread_analysis["original_text"],
-            date=datetime.now(),
-            sentiment_positive=thread_analysis["sentiment_stats"]["percentages"]["with"],
-            sentiment_negative=thread_analysis["sentiment_stats"]["percentages"]["against"],
-            sentiment_neutral=thread_analysis["sentiment_stats"]["percentages"]["neutral"],
-            engagement_likes=thread_analysis["sentiment_stats"].get("engagement", {}).get("likes", 0),
-            engagement_replies=thread_analysis["sentiment_stats"].get("engagement", {}).get("replies", 0),
-            engagement_retweets=thread_analysis["sentiment_stats"].get("engagement", {}).get("retweets", 0),
-            grok_insights=json.dumps(grok_insights),
-            enhanced_response=enhanced_response,
-            bot_percentage=thread_analysis.get("bot_percentage", 0.0)
-        )
-        
-        db = next(get_db())  # Get database session
-        db.add(analysis)
-        db.commit()
-        db.refresh(analysis)
-        logging.info("Analysis stored in database")
+            # Initialize clients
+            api_client = get_api_client()
+            
+            if not api_client:
+                raise HTTPException(status_code=401, detail="API client not available")
+                
+            result = await perform_analysis(api_client, tweet_id, approximate)
+            entry = result["cache_entry"]
         
-        # Post reply if requested
+        # Post reply if requested, whether or not the analysis was cached
         if request.query_params.get("post_reply", "false").lower() == "true":
-            await post_reply(api_client, tweet_id, enhanced_response)
-            logging.info("Reply posted successfully")
+            await post_reply(tweet_id, entry["enhanced_response"])
+            logging.info("Reply queued successfully")
         
-        return templates.TemplateResponse(
-            "results.html",
-            {
-                "request": request,
-                "current_user": get_current_user(request),
-                "analysis": analysis,
-                "grok_insights": grok_insights,
-                "enhanced_response": enhanced_response
-            }
-        )
+        with timed("template_render"):
+            response = templates.TemplateResponse(
+                "results.html",
+                {
+                    "request": request,
+                    "current_user": get_current_user(request),
+                    "analysis": entry["view"],
+                    "grok_insights": entry["grok_insights"],
+                    "enhanced_response": entry["enhanced_response"]
+                }
+            )
+        response.headers["ETag"] = AnalysisCache.etag(entry)
+        response.headers["Last-Modified"] = format_datetime(http_time(entry["date"]), usegmt=True)
+        response.headers["Cache-Control"] = f"private, max-age={analysis_cache.remaining(entry)}"
+        response.headers["X-Cache"] = cache_status
+        return response
         
+    except HTTPException:
+        raise
     except tweepy_errors.NotFound:
         logging.error(f"Tweet {tweet_id} not found")
         raise HTTPException(status_code=404, detail="Tweet not found")
@@ -616,17 +1367,246 @@ async def analyze(request: Request, tweet_id: str = Form(...)):
         logging.error(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
+@app.get("/analyze/live", response_class=HTMLResponse)
+async def analyze_live(request: Request, tweet_id: str):
+    """
+    Render the results page in streaming mode; it fills in progressively from
+    /analyze/stream.
+    """
+    return templates.TemplateResponse(
+        "results.html",
+        {
+            "request": request,
+            "current_user": get_current_user(request),
+            "analysis": {
+                "tweet_id": tweet_id,
+                "date": None,
+                "original_text": "",
+                "total_replies": 0,
+                "bot_percentage": 0.0,
+                "sentiment_stats": {
+                    "percentages": {"with": 0.0, "against": 0.0, "neutral": 0.0},
+                    "notable_quotes": [],
+                    "keywords": {},
+                    "sentiment_progression": []
+                }
+            },
+            "stream_url": f"/analyze/stream?tweet_id={quote(tweet_id)}"
+        }
+    )
+
+@app.get("/analyze/stream")
+async def analyze_stream(tweet_id: str):
+    """
+    Stream analysis progress for a tweet as Server-Sent Events.
+    """
+    return StreamingResponse(
+        stream_analysis(tweet_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 @app.get("/past_analyses", response_class=HTMLResponse)
 async def past_analyses(request: Request, db: Session = Depends(get_db)):
     """
-    View past analyses.
+    View past analyses. Answered from the change marker alone when the
+    client's copy is current, and from the page cache until the next insert.
     """
-    analyses = db.query(Analysis).order_by(Analysis.date.desc()).all()
-    return templates.TemplateResponse(
-        "past_analyses.html",
-        {"request": request, "analyses": analyses}
+    last_modified = analyses_marker.get()
+    marker = last_modified.timestamp() if last_modified else 0
+    etag = f'"analyses-{page_version}-{marker}"'
+    headers = validator_headers(etag, last_modified)
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    page_key = ("past_analyses", page_version, marker)
+    html = fragment_cache.get(page_key)
+    if html is None:
+        CACHE_REQUESTS.inc(cache="fragment", result="miss")
+        analyses = (
+            db.query(Analysis)
+            .options(load_only(
+                Analysis.id, Analysis.date, Analysis.original_text, Analysis.sentiment_positive,
+                Analysis.sentiment_negative, Analysis.sentiment_neutral, Analysis.engagement_replies,
+                Analysis.bot_percentage
+            ))
+            .order_by(Analysis.date.desc())
+            .all()
+        )
+        rows = [history_row(analysis) for analysis in analyses]
+        row_html = [render_fragment("_analysis_row.html", row["id"], row=row) for row in rows]
+        with timed("template_render"):
+            html = templates.get_template("past_analyses.html").render(
+                request=request, rows=rows, row_html=row_html
+            )
+        fragment_cache.set(page_key, html)
+    else:
+        CACHE_REQUESTS.inc(cache="fragment", result="memory_hit")
+    return HTMLResponse(html, headers=headers)
+
+@app.get("/analysis/{analysis_id}", response_class=HTMLResponse)
+async def view_analysis(request: Request, analysis_id: int, db: Session = Depends(get_db)):
+    """
+    Results page for a stored analysis. Rows never change once inserted, so
+    a matching ETag is answered without touching the database.
+    """
+    etag = f'"analysis-{analysis_id}-{page_version}-{viewer_key(request)}"'
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=validator_headers(etag))
+
+    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    headers = validator_headers(etag, analysis.date)
+    if not_modified(request, etag, analysis.date):
+        return Response(status_code=304, headers=headers)
+
+    with timed("template_render"):
+        return templates.TemplateResponse(
+            "results.html",
+            {
+                "request": request,
+                "current_user": get_current_user(request),
+                "analysis": analysis_view(analysis),
+                "grok_insights": analysis.to_dict()["grok_insights"],
+                "enhanced_response": analysis.enhanced_response
+            },
+            headers=headers
+        )
+
+class AnalysisJobRequest(BaseModel):
+    tweet_id: str
+    callback_url: Optional[str] = None
+
+@app.post("/api/v1/analyses", status_code=202)
+async def create_analysis_job(payload: AnalysisJobRequest):
+    """
+    Queue a thread analysis and return its job ID immediately.
+    """
+    if os.environ.get('VERCEL'):
+        # Serverless instances freeze after responding and keep the database
+        # in their own /tmp, so a job would neither run nor be found by a poll.
+        # (Vercel sets VERCEL=1; the benchmarks only set VERCEL_ENV.)
+        raise HTTPException(
+            status_code=501,
+            detail="Background jobs need a persistent server; use POST /analyze or /api/v1/analyses/batch"
+        )
+    if not payload.tweet_id.isdigit():
+        raise HTTPException(status_code=422, detail="tweet_id must be numeric")
+    if payload.callback_url and not is_local_callback_url(payload.callback_url):
+        raise HTTPException(status_code=422, detail="callback_url must point to a local address")
+    
+    job, created = await analysis_jobs.submit(payload.tweet_id, payload.callback_url)
+    status_url = f"/api/v1/analyses/{job['id']}"
+    return JSONResponse(
+        {**job, "status_url": status_url, "reused": not created},
+        status_code=202,
+        headers={"Location": status_url}
+    )
+
+class BatchAnalysisRequest(BaseModel):
+    tweet_ids: List[str]
+    include_insights: bool = True
+
+@app.post("/api/v1/analyses/batch")
+async def create_batch_analysis(payload: BatchAnalysisRequest):
+    """
+    Analyze a list of tweets in one request.
+    """
+    # Preserve order, drop repeats
+    tweet_ids = list(dict.fromkeys(payload.tweet_ids))
+    if not tweet_ids:
+        raise HTTPException(status_code=422, detail="tweet_ids must not be empty")
+    if len(tweet_ids) > get_settings().BATCH_MAX_TWEETS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {get_settings().BATCH_MAX_TWEETS} tweets can be analyzed per batch"
+        )
+    if not all(tweet_id.isdigit() for tweet_id in tweet_ids):
+        raise HTTPException(status_code=422, detail="tweet_ids must be numeric")
+
+    api_client = get_api_client()
+    if not api_client:
+        raise HTTPException(status_code=401, detail="API client not available")
+
+    try:
+        return JSONResponse(await analyze_batch(api_client, tweet_ids, payload.include_insights))
+    except Exception as e:
+        logger.error(f"Error in batch analysis: {e}")
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+@app.get("/api/v1/analyses/{job_id}")
+async def get_analysis_job(job_id: str):
+    """
+    Poll the status of a queued analysis.
+    """
+    job = await analysis_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    return JSONResponse(job)
+
+@app.get("/api/v1/search")
+async def search(q: str, page: int = 1, per_page: int = 20, db: Session = Depends(get_db)):
+    """
+    Ranked full-text search over analyzed tweets, notable quotes and keywords.
+    """
+    if page < 1 or not 1 <= per_page <= 100:
+        raise HTTPException(status_code=422, detail="page must be >= 1 and per_page between 1 and 100")
+    try:
+        total, hits = search_analyses(db, q, limit=per_page, offset=(page - 1) * per_page)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching analyses: {str(e)}")
+    return JSONResponse({
+        "query": q,
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "results": hits
+    })
+
+@app.get("/api/v1/coordination/{author}")
+async def get_author_coordination(author: str, db: Session = Depends(get_db)):
+    """
+    Rings in the coordination graph that an author belongs to.
+    """
+    signals, rings = coordination_graph.ring_signals(db, [author])
+    return JSONResponse({
+        "author": author,
+        "coordination_ring_risk": signals.get(author, {}).get("coordination_ring_risk", 0.0),
+        "rings": [ring for ring in rings if author in ring["members"]]
+    })
+
+@app.get("/api/v1/replies/export")
+async def export_replies(tweet_id_min: Optional[int] = None, tweet_id_max: Optional[int] = None,
+                         since: Optional[datetime] = None, until: Optional[datetime] = None,
+                         format: str = "parquet", db: Session = Depends(get_db)):
+    """
+    Bulk export of archived per-reply facts as Parquet or Arrow.
+    """
+    if format not in ("parquet", "arrow"):
+        raise HTTPException(status_code=400, detail="format must be 'parquet' or 'arrow'")
+    try:
+        columns = await run_in_threadpool(reply_store.scan, db, tweet_id_min, tweet_id_max, since, until)
+        data = await run_in_threadpool(reply_store.export, columns, format)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    media_type = "application/vnd.apache.parquet" if format == "parquet" else "application/vnd.apache.arrow.file"
+    return Response(
+        content=data,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="replies.{format}"'}
     )
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus-style metrics for this process.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/v1/stats")
 async def get_stats(db: Session = Depends(get_db)):
     """
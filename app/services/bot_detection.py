@@ -1,7 +1,10 @@
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import re
 
+from app.services.cadence import cadence_features, reply_cadence_features, to_epoch_seconds
+from app.services.near_duplicates import NearDuplicateDetector
+
 
 class BotDetector:
     def __init__(self):
@@ -13,16 +16,37 @@ class BotDetector:
             r'binary\s+options',
             r'crypto\s+investment',
         ]
-        
-    def analyze_account(self, user_data: Dict) -> Tuple[bool, Dict[str, float]]:
+        self.near_duplicates = NearDuplicateDetector()
+        # Thread-level signals raise the profile-based risk (noisy-OR); an
+        # absent or zero signal leaves it unchanged
+        self.signal_weights = {
+            "coordinated_spam_risk": 0.5,
+            "coordination_ring_risk": 0.4,
+            "cadence_risk": 0.3
+        }
+        # Near-duplicate clusters smaller than this are treated as coincidence
+        self.min_spam_cluster = 3
+        # Cluster size at which coordinated_spam_risk saturates at 1.0
+        self.spam_cluster_saturation = 6
+        # Very short replies ("thanks!") collide too easily to be evidence
+        self.min_spam_text_length = 20
+        # Timing regularity only counts once an author has this many intervals
+        self.min_cadence_intervals = 3
+        # Replies faster than this after their parent look automated
+        self.fast_reply_seconds = 15
+        
+    def analyze_account(self, user_data: Dict, signals: Optional[Dict[str, float]] = None) -> Tuple[bool, Dict[str, float]]:
         """
         Analyze a user account for bot-like behavior.
+        Optional thread-level signals (see coordination_signals) are folded in.
         Returns a tuple of (is_likely_bot, risk_factors).
         """
         risk_factors = {}
         
-        # Account age check
-        account_age_days = (datetime.now() - user_data["created_at"]).days
+        # Account age check (tweepy returns timezone-aware datetimes)
+        created_at = user_data["created_at"]
+        now = datetime.now(created_at.tzinfo) if created_at.tzinfo else datetime.now()
+        account_age_days = (now - created_at).days
         risk_factors["account_age_risk"] = self._calculate_age_risk(account_age_days)
         
         # Tweet frequency check
@@ -54,6 +78,11 @@ class BotDetector:
         }
         
         overall_risk = sum(risk * weights[factor] for factor, risk in risk_factors.items())
+        
+        for signal, risk in (signals or {}).items():
+            risk_factors[signal] = risk
+            overall_risk = 1 - (1 - overall_risk) * (1 - self.signal_weights.get(signal, 0.0) * risk)
+        
         is_likely_bot = overall_risk > 0.6
         
         return is_likely_bot, risk_factors
@@ -128,7 +157,49 @@ class BotDetector:
         matches = sum(1 for pattern in self.suspicious_patterns if re.search(pattern, text))
         return min(matches / len(self.suspicious_patterns), 1.0)
     
-    def analyze_tweet_pattern(self, tweets: List[Dict]) -> Dict[str, float]:
+    def coordination_signals(self, replies: List[Dict]) -> Dict[str, Dict[str, float]]:
+        """
+        Flag authors whose replies belong to clusters of near-identical texts.
+        Returns signals per author, for analyze_account.
+        """
+        candidates = [
+            index for index, reply in enumerate(replies)
+            if len(reply["text"]) >= self.min_spam_text_length
+        ]
+        clusters = self.near_duplicates.cluster([replies[index]["text"] for index in candidates])
+        
+        signals = {}
+        for cluster in clusters:
+            if len(cluster) < self.min_spam_cluster:
+                continue
+            risk = min((len(cluster) - 1) / (self.spam_cluster_saturation - 1), 1.0)
+            for member in cluster:
+                author = replies[candidates[member]]["author"]
+                current = signals.get(author, {}).get("coordinated_spam_risk", 0.0)
+                signals[author] = {"coordinated_spam_risk": max(current, risk)}
+        return signals
+    
+    def cadence_signals(self, replies: List[Dict]) -> Dict[str, Dict[str, float]]:
+        """
+        Flag authors whose replies arrive on a machine-regular schedule or
+        implausibly soon after the post they answer.
+        Returns signals per author, for analyze_account.
+        """
+        signals = {}
+        for author, features in reply_cadence_features(replies).items():
+            regularity_risk = (
+                features["timing_regularity"]
+                if features["interval_count"] >= self.min_cadence_intervals else 0.0
+            )
+            latency_risk = 0.0
+            if features["reply_latency_count"]:
+                latency_risk = max(1 - features["min_reply_latency"] / self.fast_reply_seconds, 0.0)
+            risk = max(regularity_risk, latency_risk)
+            if risk > 0:
+                signals[author] = {"cadence_risk": risk}
+        return signals
+    
+    def analyze_tweet_pattern(self, tweets: List[Dict]) -> Dict[str, Any]:
         """
         Analyze tweet patterns for bot-like behavior.
         """
@@ -137,7 +208,12 @@ class BotDetector:
             "api_source_ratio": 0.0,
             "mention_ratio": 0.0,
             "url_ratio": 0.0,
-            "timing_regularity": 0.0
+            "timing_regularity": 0.0,
+            "burstiness": 0.0,
+            "hour_entropy": 0.0,
+            "near_duplicate_ratio": 0.0,
+            "largest_near_duplicate_cluster": 0,
+            "near_duplicate_cluster_sizes": []
         }
         
         if not tweets:
@@ -147,6 +223,12 @@ class BotDetector:
         unique_texts = set(tweet["text"] for tweet in tweets)
         pattern_metrics["duplicate_content_ratio"] = 1 - (len(unique_texts) / len(tweets))
         
+        # Check for near-duplicate content (small variations of one template)
+        clusters = self.near_duplicates.cluster([tweet["text"] for tweet in tweets])
+        pattern_metrics["near_duplicate_ratio"] = sum(len(cluster) for cluster in clusters) / len(tweets)
+        pattern_metrics["largest_near_duplicate_cluster"] = len(clusters[0]) if clusters else 0
+        pattern_metrics["near_duplicate_cluster_sizes"] = [len(cluster) for cluster in clusters]
+        
         # Check source of tweets (api vs. web)
         api_sources = sum(1 for tweet in tweets if "api" in tweet.get("source", "").lower())
         pattern_metrics["api_source_ratio"] = api_sources / len(tweets)
@@ -157,13 +239,13 @@ class BotDetector:
         pattern_metrics["mention_ratio"] = total_mentions / len(tweets)
         pattern_metrics["url_ratio"] = total_urls / len(tweets)
         
-        # Check timing regularity
-        if len(tweets) > 1:
-            timestamps = sorted(tweet["created_at"] for tweet in tweets)
-            intervals = [(timestamps[i] - timestamps[i-1]).total_seconds() 
-                        for i in range(1, len(timestamps))]
-            avg_interval = sum(intervals) / len(intervals)
-            variance = sum((i - avg_interval) ** 2 for i in intervals) / len(intervals)
-            pattern_metrics["timing_regularity"] = 1 / (1 + variance/3600)  # Normalize to 0-1
+        # Check timing regularity and posting cadence
+        cadence = cadence_features(
+            [0] * len(tweets),
+            to_epoch_seconds(tweet["created_at"] for tweet in tweets)
+        )[0]
+        pattern_metrics["timing_regularity"] = cadence["timing_regularity"]  # 1 / (1 + variance/3600)
+        pattern_metrics["burstiness"] = cadence["burstiness"]
+        pattern_metrics["hour_entropy"] = cadence["hour_entropy"]
         
         return pattern_metrics 
\ No newline at end of file
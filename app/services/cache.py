@@ -0,0 +1,362 @@
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.metrics import CACHE_REQUESTS
+from app.db.models import Analysis
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU cache with per-entry expiry.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SharedCache:
+    """
+    Host-wide cache in a SQLite file (WAL mode), so every worker process on
+    the host shares hits. Values are pickled; entries expire after their TTL
+    and the least recently used are evicted beyond max_entries or max_bytes.
+    Errors are logged and treated as misses, so a broken cache file never
+    fails a request.
+    """
+
+    # Reads only refresh an entry's LRU timestamp this often, to keep hits cheap
+    TOUCH_INTERVAL = 60.0
+
+    def __init__(self, path: str, max_entries: int = 50000, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: float = 300.0, evict_every: int = 200):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.evict_every = evict_every
+        self._writes = 0
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process; workers must not share a fork's handle
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shared_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL, size INTEGER NOT NULL) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_shared_cache_accessed ON shared_cache (accessed_at)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Look up several keys in one query.
+        Returns the live entries found, by key.
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        if not keys:
+            return found
+        now = time.time()
+        try:
+            conn = self._connection()
+            stale = []
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, value, accessed_at FROM shared_cache "
+                    f"WHERE key IN ({','.join('?' * len(batch))}) AND expires_at > ?",
+                    (*batch, now)
+                ).fetchall()
+                for key, value, accessed_at in rows:
+                    found[key] = pickle.loads(value)
+                    if accessed_at < now - self.TOUCH_INTERVAL:
+                        stale.append((now, key))
+            if stale:
+                conn.executemany("UPDATE shared_cache SET accessed_at = ? WHERE key = ?", stale)
+        except (sqlite3.Error, pickle.UnpicklingError) as e:
+            logger.warning(f"Shared cache read failed: {e}")
+        return found
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """
+        Store several entries atomically, replacing existing ones.
+        """
+        if not items:
+            return
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        rows = []
+        for key, value in items.items():
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            rows.append((key, blob, expires_at, now, len(blob)))
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany("INSERT OR REPLACE INTO shared_cache VALUES (?, ?, ?, ?, ?)", rows)
+            self._writes += len(rows)
+            if self._writes >= self.evict_every:
+                self._writes = 0
+                self.evict()
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache write failed: {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            self._connection().execute("DELETE FROM shared_cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache delete failed: {e}")
+
+    def clear(self) -> None:
+        try:
+            self._connection().execute("DELETE FROM shared_cache")
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache clear failed: {e}")
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then the least recently used ones beyond the
+        entry and size limits.
+        Returns the number of entries removed.
+        """
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                removed = conn.execute("DELETE FROM shared_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+                removed += conn.execute(
+                    "DELETE FROM shared_cache WHERE key IN ("
+                    " SELECT key FROM ("
+                    "  SELECT key,"
+                    "   ROW_NUMBER() OVER (ORDER BY accessed_at DESC) AS position,"
+                    "   SUM(size) OVER (ORDER BY accessed_at DESC ROWS UNBOUNDED PRECEDING) AS total"
+                    "  FROM shared_cache"
+                    " ) WHERE position > ? OR total > ?"
+                    ")",
+                    (self.max_entries, self.max_bytes)
+                ).rowcount
+            return removed
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache eviction failed: {e}")
+            return 0
+
+    def __len__(self) -> int:
+        try:
+            return self._connection().execute("SELECT COUNT(*) FROM shared_cache").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+
+class ChangeMarker:
+    """
+    Timestamp of the latest change to a table, so list pages can answer
+    conditional requests without querying it. The marker lives in the
+    SharedCache, so a write in one worker is seen by all; the loader (e.g.
+    MAX(date)) runs when the marker is unknown, and on every read when there
+    is no shared cache, since other workers' writes would go unseen.
+    """
+
+    # Effectively permanent; eviction just means the loader runs again
+    TTL = 10 * 365 * 86400
+
+    def __init__(self, name: str, loader: Callable[[], Optional[datetime]],
+                 shared: Optional[SharedCache] = None):
+        self.key = f"marker:{name}"
+        self.loader = loader
+        self.shared = shared
+
+    def get(self) -> Optional[datetime]:
+        if self.shared is None:
+            return self.loader()
+        value = self.shared.get(self.key)
+        if value is None:
+            value = self.loader()
+            if value is not None:
+                self.shared.set(self.key, value, ttl=self.TTL)
+        return value
+
+    def touch(self, when: datetime) -> None:
+        """
+        Record a change at the given time; the marker never moves backwards.
+        """
+        if self.shared is None:
+            return
+        current = self.shared.get(self.key)
+        if current is None or when > current:
+            self.shared.set(self.key, when, ttl=self.TTL)
+
+
+class AnalysisCache:
+    """
+    Tiered cache of the latest analysis per tweet: an in-memory front tier,
+    an optional host-wide SharedCache, then the analyses table. Entries older
+    than max_age are never served. With a SharedCache, front-tier hits are
+    checked against the analysis id recorded there at most once every
+    revalidate_after seconds, so an invalidation in one worker is seen by
+    all within that window.
+    """
+
+    def __init__(self, view_builder: Callable[..., Dict], max_age: int = 3600, max_entries: int = 256,
+                 shared: Optional[SharedCache] = None, revalidate_after: float = 5.0):
+        self.view_builder = view_builder
+        self.max_age = max_age
+        self.front = TTLCache(max_entries=max_entries, ttl=max_age)
+        self.shared = shared
+        # Analysis id per tweet whose front entry was confirmed current within
+        # the last revalidate_after seconds
+        self.checked = TTLCache(max_entries=max_entries, ttl=revalidate_after)
+
+    def get(self, db: Session, tweet_id: str, exact_only: bool = False) -> Optional[Dict]:
+        """
+        Return the freshest cached entry for a tweet, or None if there is no
+        analysis younger than max_age. With exact_only, sampled (approximate)
+        analyses do not count.
+        """
+        entry = self.front.get(tweet_id)
+        if entry is not None and self.checked.get(tweet_id) != entry["id"]:
+            if self._is_current(entry):
+                self.checked.set(tweet_id, entry["id"])
+            else:
+                self.front.delete(tweet_id)
+                entry = None
+        if entry is not None and not (exact_only and entry["approximate"]):
+            CACHE_REQUESTS.inc(cache="analysis", result="memory_hit")
+            return entry
+
+        if self.shared is not None:
+            entry = self.shared.get(self._shared_key(tweet_id))
+            if entry is not None and not (exact_only and entry["approximate"]):
+                ttl = self.remaining(entry)
+                if ttl > 0:
+                    CACHE_REQUESTS.inc(cache="analysis", result="shared_hit")
+                    self.front.set(tweet_id, entry, ttl=ttl)
+                    self.checked.set(tweet_id, entry["id"])
+                    return entry
+
+        cutoff = datetime.now() - timedelta(seconds=self.max_age)
+        query = db.query(Analysis).filter(Analysis.tweet_id == tweet_id, Analysis.date >= cutoff)
+        if exact_only:
+            query = query.filter(Analysis.sample_size.is_(None))
+        analysis = query.order_by(Analysis.date.desc()).first()
+        if analysis is None:
+            CACHE_REQUESTS.inc(cache="analysis", result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache="analysis", result="db_hit")
+        return self.put(analysis)
+
+    def put(self, analysis: Analysis, thread_analysis: Optional[Dict] = None) -> Dict:
+        """
+        Cache a stored analysis until it goes stale.
+        """
+        entry = {
+            "id": analysis.id,
+            "tweet_id": analysis.tweet_id,
+            "date": analysis.date,
+            "view": self.view_builder(analysis, thread_analysis),
+            "grok_insights": analysis.to_dict()["grok_insights"],
+            "enhanced_response": analysis.enhanced_response,
+            "approximate": analysis.sample_size is not None
+        }
+        ttl = self.remaining(entry)
+        if ttl > 0:
+            self.front.set(analysis.tweet_id, entry, ttl=ttl)
+            self.checked.set(analysis.tweet_id, analysis.id)
+            if self.shared is not None:
+                self.shared.set_many({
+                    self._shared_key(analysis.tweet_id): entry,
+                    self._version_key(analysis.tweet_id): analysis.id
+                }, ttl=ttl)
+        return entry
+
+    def invalidate(self, tweet_id: str) -> None:
+        self.front.delete(tweet_id)
+        self.checked.delete(tweet_id)
+        if self.shared is not None:
+            self.shared.delete(self._shared_key(tweet_id))
+            self.shared.delete(self._version_key(tweet_id))
+
+    def _is_current(self, entry: Dict) -> bool:
+        """
+        Whether a front-tier entry is still the analysis the shared tier
+        points at; without a shared tier there is nothing to check against.
+        """
+        if self.shared is None:
+            return True
+        return self.shared.get(self._version_key(entry["tweet_id"])) == entry["id"]
+
+    @staticmethod
+    def _shared_key(tweet_id: str) -> str:
+        return f"analysis:{tweet_id}"
+
+    @staticmethod
+    def _version_key(tweet_id: str) -> str:
+        return f"analysis-version:{tweet_id}"
+
+    def remaining(self, entry: Dict) -> int:
+        """
+        Seconds until an entry is no longer fresh.
+        """
+        age = (datetime.now() - entry["date"]).total_seconds()
+        return max(int(self.max_age - age), 0)
+
+    @staticmethod
+    def etag(entry: Dict) -> str:
+        return f'"analysis-{entry["id"]}-{int(entry["date"].timestamp())}"'
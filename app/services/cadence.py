@@ -0,0 +1,111 @@
+from datetime import datetime, timezone
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Sentinel for "no parent timestamp" in int64 arrays
+NO_PARENT = np.iinfo(np.int64).min
+
+
+def to_epoch_seconds(datetimes: Iterable[Optional[datetime]]) -> np.ndarray:
+    """
+    Convert datetimes to an int64 array of UTC epoch seconds; None maps to
+    NO_PARENT. Naive datetimes are taken as UTC, as tweepy's are.
+    """
+    return np.fromiter(
+        (
+            NO_PARENT if dt is None
+            else int((dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp())
+            for dt in datetimes
+        ),
+        dtype=np.int64
+    )
+
+
+def cadence_features(accounts: Sequence[Hashable], timestamps: np.ndarray,
+                     parent_timestamps: Optional[np.ndarray] = None) -> Dict[Hashable, Dict[str, float]]:
+    """
+    Posting-cadence features for many accounts in one vectorized pass.
+    accounts[i] posted at timestamps[i] (epoch seconds), optionally replying to
+    a post made at parent_timestamps[i] (NO_PARENT when unknown).
+    Returns features per account: post_count, interval_count, interval_variance,
+    timing_regularity, burstiness, hour_entropy and reply latency stats.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if not len(timestamps):
+        return {}
+    labels, groups = np.unique(np.asarray(accounts, dtype=object), return_inverse=True)
+    groups = groups.ravel()
+    n_groups = len(labels)
+
+    # Sort by account, then time, so every account's posts are contiguous
+    order = np.lexsort((timestamps, groups))
+    groups, timestamps = groups[order], timestamps[order]
+    post_count = np.bincount(groups, minlength=n_groups)
+
+    # Intervals between consecutive posts of the same account
+    same = groups[1:] == groups[:-1]
+    intervals = np.diff(timestamps).astype(np.float64)[same]
+    interval_groups = groups[1:][same]
+    interval_count = np.bincount(interval_groups, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(interval_groups, weights=intervals, minlength=n_groups) / interval_count
+        mean_sq = np.bincount(interval_groups, weights=intervals ** 2, minlength=n_groups) / interval_count
+        variance = np.maximum(mean_sq - mean ** 2, 0.0)
+        std = np.sqrt(variance)
+        # Goh-Barabasi burstiness: -1 perfectly regular, 0 Poisson, 1 bursty
+        burstiness = (std - mean) / (std + mean)
+    has_intervals = interval_count > 0
+    variance = np.where(has_intervals, variance, 0.0)
+    burstiness = np.where(has_intervals & np.isfinite(burstiness), burstiness, 0.0)
+    timing_regularity = np.where(has_intervals, 1 / (1 + variance / 3600), 0.0)
+
+    # Normalized Shannon entropy of the hour-of-day histogram (0 = one hour)
+    hours = (timestamps // 3600) % 24
+    hour_counts = np.bincount(groups * 24 + hours, minlength=n_groups * 24).reshape(n_groups, 24)
+    p = hour_counts / post_count[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hour_entropy = np.where(p > 0, p * np.log(1 / p), 0.0).sum(axis=1) / np.log(24)
+
+    # Reply latency relative to the parent post, where the parent is known
+    latency_count = np.zeros(n_groups, dtype=np.int64)
+    latency_mean = np.full(n_groups, np.nan)
+    latency_min = np.full(n_groups, np.nan)
+    if parent_timestamps is not None:
+        parents = np.asarray(parent_timestamps, dtype=np.int64)[order]
+        known = parents != NO_PARENT
+        latency = np.maximum(timestamps[known] - parents[known], 0).astype(np.float64)
+        latency_groups = groups[known]
+        latency_count = np.bincount(latency_groups, minlength=n_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            latency_mean = np.bincount(latency_groups, weights=latency, minlength=n_groups) / latency_count
+        np.fmin.at(latency_min, latency_groups, latency)
+
+    columns = {
+        "post_count": post_count,
+        "interval_count": interval_count,
+        "interval_variance": variance,
+        "timing_regularity": timing_regularity,
+        "burstiness": burstiness,
+        "hour_entropy": hour_entropy,
+        "reply_latency_count": latency_count,
+        "mean_reply_latency": latency_mean,
+        "min_reply_latency": latency_min
+    }
+    rows = {name: column.tolist() for name, column in columns.items()}
+    return {
+        label: {name: rows[name][index] for name in columns}
+        for index, label in enumerate(labels.tolist())
+    }
+
+
+def reply_cadence_features(replies: List[Dict]) -> Dict[str, Dict[str, float]]:
+    """
+    Cadence features per reply author, using each reply's created_at and, when
+    fetched, the created_at of the post it replies to.
+    """
+    return cadence_features(
+        [reply["author"] for reply in replies],
+        to_epoch_seconds(reply["created_at"] for reply in replies),
+        to_epoch_seconds(reply.get("parent_created_at") for reply in replies)
+    )
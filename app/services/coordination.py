@@ -0,0 +1,222 @@
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# SQLite's default limit on bound parameters is 999
+_IN_CHUNK = 500
+
+# Matches no row for a thread already in the graph, whose pairs must not add weight again
+_ADD_THREAD = text(
+    """
+    INSERT INTO coordination_threads (thread_id, processed_at)
+    VALUES (:thread, :seen)
+    ON CONFLICT DO NOTHING
+    """
+)
+
+_UPSERT = text(
+    """
+    INSERT INTO author_edges (author_a, author_b, weight, last_seen)
+    VALUES (:a, :b, 1, :seen)
+    ON CONFLICT (author_a, author_b)
+    DO UPDATE SET weight = weight + 1, last_seen = excluded.last_seen
+    """
+)
+
+
+class CoordinationGraph:
+    """
+    Incrementally maintained graph of authors who reply to the same threads
+    within a short window of each other. Updating costs O(pairs in the new
+    thread); ring detection only reads the neighborhood of the authors being
+    scored, so neither grows with total history.
+    """
+
+    def __init__(self, window_seconds: int = 300, max_window_authors: int = 50,
+                 min_weight: int = 2, min_ring_size: int = 3, ring_saturation: int = 8,
+                 max_thread_pairs: int = 2000, max_age_days: int = 30, prune_every: int = 100):
+        self.window_seconds = window_seconds
+        # Caps pairs per reply in very busy windows
+        self.max_window_authors = max_window_authors
+        # Caps pairs per thread; the ones replying closest together are kept
+        self.max_thread_pairs = max_thread_pairs
+        # Edges and processed threads not seen for this long are dropped
+        self.max_age = timedelta(days=max_age_days)
+        self.prune_every = prune_every
+        self._updates = 0
+        # Pairs must co-occur in at least this many threads to count as an edge
+        self.min_weight = min_weight
+        self.min_ring_size = min_ring_size
+        # Ring size at which coordination_ring_risk saturates at 1.0
+        self.ring_saturation = ring_saturation
+
+    def co_occurrences(self, replies: List[Dict]) -> Dict[Tuple[str, str], float]:
+        """
+        Author pairs replying within window_seconds of each other in one
+        thread, with the smallest gap in seconds between their replies.
+        """
+        timeline = sorted(
+            (reply["created_at"].timestamp(), reply["author"]) for reply in replies
+        )
+        pairs: Dict[Tuple[str, str], float] = {}
+        window = deque()  # (timestamp, author), oldest first
+        for timestamp, author in timeline:
+            while window and timestamp - window[0][0] > self.window_seconds:
+                window.popleft()
+            recent = {}  # author -> latest timestamp
+            for other_timestamp, other in reversed(window):
+                if len(recent) >= self.max_window_authors:
+                    break
+                recent.setdefault(other, other_timestamp)
+            for other, other_timestamp in recent.items():
+                if other != author:
+                    pair = (author, other) if author < other else (other, author)
+                    gap = timestamp - other_timestamp
+                    if gap < pairs.get(pair, float("inf")):
+                        pairs[pair] = gap
+            window.append((timestamp, author))
+        return pairs
+
+    def update(self, db: Session, tweet_id: str, replies: List[Dict]) -> int:
+        """
+        Add one thread's co-occurrences to the graph. A thread already in the
+        graph (e.g. re-analyzed) is skipped, so each thread adds at most one
+        to an edge's weight.
+        Returns the number of pairs touched.
+        """
+        pairs = self.co_occurrences(replies)
+        if len(pairs) > self.max_thread_pairs:
+            pairs = dict(sorted(pairs.items(), key=lambda item: item[1])[:self.max_thread_pairs])
+        if not pairs:
+            return 0
+        seen = datetime.now()
+        if db.execute(_ADD_THREAD, {"thread": tweet_id, "seen": seen}).rowcount == 0:
+            db.rollback()
+            return 0
+        db.execute(_UPSERT, [{"a": a, "b": b, "seen": seen} for a, b in pairs])
+        db.commit()
+
+        self._updates += 1
+        if self._updates >= self.prune_every:
+            self._updates = 0
+            self.prune(db)
+        return len(pairs)
+
+    def prune(self, db: Session) -> int:
+        """
+        Drop edges and processed threads older than max_age, so the graph
+        only covers recent activity.
+        Returns the number of edges removed.
+        """
+        cutoff = datetime.now() - self.max_age
+        removed = db.execute(text("DELETE FROM author_edges WHERE last_seen < :cutoff"), {"cutoff": cutoff}).rowcount
+        db.execute(text("DELETE FROM coordination_threads WHERE processed_at < :cutoff"), {"cutoff": cutoff})
+        db.commit()
+        return removed
+
+    def _incident_edges(self, db: Session, authors: Iterable[str]) -> List[Tuple[str, str, int]]:
+        authors = list(authors)
+        edges = []
+        for start in range(0, len(authors), _IN_CHUNK):
+            chunk = authors[start:start + _IN_CHUNK]
+            params = {f"p{i}": author for i, author in enumerate(chunk)}
+            placeholders = ", ".join(f":p{i}" for i in range(len(chunk)))
+            edges.extend(db.execute(
+                text(
+                    f"""
+                    SELECT author_a, author_b, weight FROM author_edges
+                    WHERE weight >= :min_weight
+                      AND (author_a IN ({placeholders}) OR author_b IN ({placeholders}))
+                    """
+                ),
+                {"min_weight": self.min_weight, **params}
+            ).fetchall())
+        return edges
+
+    def neighborhood(self, db: Session, authors: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Strong edges among the given authors and their direct neighbors, as an
+        adjacency map.
+        """
+        authors = set(authors)
+        edges = self._incident_edges(db, authors)
+        neighbors = {node for a, b, _ in edges for node in (a, b)} - authors
+        nodes = authors | neighbors
+        # Ties between neighbors complete rings that only partly replied here
+        edges.extend(
+            (a, b, weight) for a, b, weight in self._incident_edges(db, neighbors)
+            if a in nodes and b in nodes and (a not in authors and b not in authors)
+        )
+
+        adjacency: Dict[str, Dict[str, int]] = {}
+        for a, b, weight in edges:
+            adjacency.setdefault(a, {})[b] = weight
+            adjacency.setdefault(b, {})[a] = weight
+        return adjacency
+
+    def rings(self, adjacency: Dict[str, Dict[str, int]]) -> List[Dict]:
+        """
+        Dense groups in an adjacency map: the 2-core (members with at least two
+        strong ties inside the group) split into connected components.
+        """
+        degree = {node: len(neighbors) for node, neighbors in adjacency.items()}
+        removed = set()
+        queue = deque(node for node, d in degree.items() if d < 2)
+        while queue:
+            node = queue.popleft()
+            if node in removed:
+                continue
+            removed.add(node)
+            for neighbor in adjacency[node]:
+                if neighbor not in removed:
+                    degree[neighbor] -= 1
+                    if degree[neighbor] < 2:
+                        queue.append(neighbor)
+
+        core = {node for node in adjacency if node not in removed}
+        rings = []
+        seen = set()
+        for start in core:
+            if start in seen:
+                continue
+            members, stack = [], [start]
+            seen.add(start)
+            while stack:
+                node = stack.pop()
+                members.append(node)
+                for neighbor in adjacency[node]:
+                    if neighbor in core and neighbor not in seen:
+                        seen.add(neighbor)
+                        stack.append(neighbor)
+            if len(members) < self.min_ring_size:
+                continue
+            member_set = set(members)
+            edges = sum(1 for m in members for n in adjacency[m] if n in member_set) // 2
+            weight = sum(w for m in members for n, w in adjacency[m].items() if n in member_set) // 2
+            possible = len(members) * (len(members) - 1) / 2
+            rings.append({
+                "members": sorted(members),
+                "size": len(members),
+                "density": edges / possible,
+                "total_weight": weight
+            })
+        return sorted(rings, key=lambda ring: (ring["size"], ring["density"]), reverse=True)
+
+    def ring_signals(self, db: Session, authors: Iterable[str]) -> Tuple[Dict[str, Dict[str, float]], List[Dict]]:
+        """
+        Flag the given authors that belong to a ring in the graph.
+        Returns (signals per author for analyze_account, rings found).
+        """
+        authors = set(authors)
+        rings = self.rings(self.neighborhood(db, authors))
+        signals = {}
+        for ring in rings:
+            risk = min(ring["density"] * (ring["size"] - 1) / (self.ring_saturation - 1), 1.0)
+            for member in ring["members"]:
+                if member in authors:
+                    current = signals.get(member, {}).get("coordination_ring_risk", 0.0)
+                    signals[member] = {"coordination_ring_risk": max(current, risk)}
+        return signals, rings
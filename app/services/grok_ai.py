@@ -1,62 +1,85 @@
 import os
+import json
+import asyncio
 import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from app.core.metrics import timed
+from app.services.grok_payload import ReplyPayloadBuilder, merge_insights
 
 class GrokAI:
-    def __init__(self):
+    def __init__(self, payload_builder: Optional[ReplyPayloadBuilder] = None):
+        self.payload_builder = payload_builder or ReplyPayloadBuilder(
+            max_chunk_bytes=int(os.getenv("GROK_CHUNK_BYTES", "32000")),
+            max_chunks=int(os.getenv("GROK_MAX_CHUNKS", "4"))
+        )
         self.api_key = os.getenv("XAI_API_KEY")
-        self.base_url = "https://api.grok.x.ai/v1"
+        self.base_url = os.getenv("XAI_API_BASE_URL", "https://api.grok.x.ai/v1")
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
 
+    async def _post(self, client: httpx.AsyncClient, endpoint: str, payload: Dict[str, Any]) -> httpx.Response:
+        """
+        POST a JSON payload; datetimes (e.g. in sentiment_progression) are sent as strings.
+        """
+        return await client.post(
+            f"{self.base_url}/{endpoint}",
+            headers=self.headers,
+            content=json.dumps(payload, default=str)
+        )
+
     async def analyze_thread(self, original_tweet: str, replies: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyze a thread using Grok AI for deeper insights.
+        Replies are deduplicated, ranked and capped to the payload budget; a
+        large thread is sent as concurrent chunks whose insights are merged,
+        so latency does not grow with the thread.
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/analyze",
-                headers=self.headers,
-                json={
-                    "original_tweet": original_tweet,
-                    "replies": [reply["text"] for reply in replies]
-                }
-            )
-            return response.json()
+        payload = self.payload_builder.build(replies)
+        chunks = payload["chunks"]
+        with timed("grok_analyze"):
+            async with httpx.AsyncClient() as client:
+                responses = await asyncio.gather(*[
+                    self._post(client, "analyze", {
+                        "original_tweet": original_tweet,
+                        "replies": chunk
+                    })
+                    for chunk in chunks
+                ])
+        results = [response.json() for response in responses]
+        if len(results) == 1:
+            return results[0]
+        merged = merge_insights(results, [len(chunk) for chunk in chunks])
+        merged["payload"] = payload["stats"]
+        return merged
 
     async def generate_insights(self, analysis_results: Dict[str, Any]) -> List[Dict[str, str]]:
         """
         Generate human-readable insights from analysis results.
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/insights",
-                headers=self.headers,
-                json=analysis_results
-            )
-            insights = response.json()["insights"]
-            return [
-                {
-                    "title": insight["title"],
-                    "description": insight["description"]
-                }
-                for insight in insights
-            ]
+        with timed("grok_insights"):
+            async with httpx.AsyncClient() as client:
+                response = await self._post(client, "insights", analysis_results)
+                insights = response.json()["insights"]
+                return [
+                    {
+                        "title": insight["title"],
+                        "description": insight["description"]
+                    }
+                    for insight in insights
+                ]
 
     async def enhance_response(self, stats: Dict[str, Any], tone: str) -> str:
         """
         Use Grok to enhance response with more engaging language.
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/enhance",
-                headers=self.headers,
-                json={
+        with timed("grok_enhance"):
+            async with httpx.AsyncClient() as client:
+                response = await self._post(client, "enhance", {
                     "stats": stats,
                     "tone": tone,
                     "style": "witty"
-                }
-            )
-            return response.json()["response"] 
\ No newline at end of file
+                })
+                return response.json()["response"] 
\ No newline at end of file
@@ -0,0 +1,169 @@
+import json
+import math
+import re
+from typing import Any, Dict, List, Sequence
+
+_WORDS = re.compile(r"[a-z0-9']+")
+_SPACES = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _SPACES.sub(" ", text.lower()).strip()
+
+
+def _encoded_size(text: str) -> int:
+    # Bytes the text adds to a JSON list: quotes, escapes and separator
+    return len(json.dumps(text)) + 2
+
+
+class ReplyPayloadBuilder:
+    """
+    Turns a thread's replies into bounded Grok request payloads: identical
+    texts are sent once, replies are ranked by informativeness, the best ones
+    are kept up to a byte budget, and what is kept is split into chunks that
+    can be sent concurrently.
+    """
+
+    def __init__(self, max_chunk_bytes: int = 32_000, max_chunks: int = 4,
+                 intensity_weight: float = 0.4, engagement_weight: float = 0.3,
+                 uniqueness_weight: float = 0.3):
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_chunks = max_chunks
+        self.intensity_weight = intensity_weight
+        self.engagement_weight = engagement_weight
+        self.uniqueness_weight = uniqueness_weight
+
+    def dedupe(self, replies: Sequence[Dict]) -> List[Dict]:
+        """
+        One entry per distinct (normalized) text, in first-seen order, with
+        the number of replies that repeated it and their combined engagement.
+        """
+        unique: Dict[str, Dict] = {}
+        for index, reply in enumerate(replies):
+            key = _normalize(reply["text"])
+            entry = unique.get(key)
+            if entry is None:
+                unique[key] = {
+                    "index": index,
+                    "text": reply["text"],
+                    "copies": 1,
+                    "intensity": abs(reply.get("compound_score", 0.0)),
+                    "engagement": reply.get("likes", 0) + reply.get("retweets", 0)
+                }
+            else:
+                entry["copies"] += 1
+                entry["engagement"] += reply.get("likes", 0) + reply.get("retweets", 0)
+        return list(unique.values())
+
+    def rank(self, entries: List[Dict]) -> List[Dict]:
+        """
+        Order entries by informativeness: sentiment intensity, engagement
+        (log-scaled) and uniqueness (mean inverse document frequency of the
+        reply's words within the thread).
+        """
+        words = [set(_WORDS.findall(entry["text"].lower())) for entry in entries]
+        document_frequency: Dict[str, int] = {}
+        for entry_words in words:
+            for word in entry_words:
+                document_frequency[word] = document_frequency.get(word, 0) + 1
+
+        n = len(entries)
+        max_idf = math.log(n) if n > 1 else 1.0
+        max_engagement = max((math.log1p(entry["engagement"]) for entry in entries), default=0.0) or 1.0
+        for entry, entry_words in zip(entries, words):
+            uniqueness = (
+                sum(math.log(n / document_frequency[word]) for word in entry_words) / len(entry_words) / max_idf
+                if entry_words and n > 1 else 0.0
+            )
+            entry["score"] = (
+                self.intensity_weight * entry["intensity"]
+                + self.engagement_weight * math.log1p(entry["engagement"]) / max_engagement
+                + self.uniqueness_weight * uniqueness
+            )
+        return sorted(entries, key=lambda entry: entry["score"], reverse=True)
+
+    def build(self, replies: Sequence[Dict]) -> Dict[str, Any]:
+        """
+        Returns {"chunks": [[reply texts], ...], "stats": {...}}. Texts within a
+        chunk keep thread order; chunks are balanced by round-robin over the
+        ranking so each sees the whole range of the thread.
+        """
+        entries = self.rank(self.dedupe(replies))
+
+        budget = self.max_chunk_bytes * self.max_chunks
+        selected, used = [], 0
+        for entry in entries:
+            size = _encoded_size(entry["text"])
+            if size > self.max_chunk_bytes or used + size > budget:
+                continue
+            selected.append((entry, size))
+            used += size
+
+        chunk_count = max(1, min(self.max_chunks, math.ceil(used / self.max_chunk_bytes)))
+        chunks: List[List[Dict]] = [[] for _ in range(chunk_count)]
+        sizes = [0] * chunk_count
+        position = 0
+        for entry, size in selected:
+            # Next chunk in turn that still has room
+            for offset in range(chunk_count):
+                target = (position + offset) % chunk_count
+                if sizes[target] + size <= self.max_chunk_bytes:
+                    chunks[target].append(entry)
+                    sizes[target] += size
+                    position = target + 1
+                    break
+
+        return {
+            "chunks": [
+                [entry["text"] for entry in sorted(chunk, key=lambda entry: entry["index"])]
+                for chunk in chunks if chunk
+            ] or [[]],
+            "stats": {
+                "replies_total": len(replies),
+                "unique_texts": len(entries),
+                "replies_sent": sum(len(chunk) for chunk in chunks),
+                "payload_bytes": sum(sizes),
+                "chunks": sum(1 for chunk in chunks if chunk) or 1
+            }
+        }
+
+
+def merge_insights(results: List[Dict[str, Any]], weights: List[float]) -> Dict[str, Any]:
+    """
+    Merge per-chunk insight objects into one: dicts merge key by key, lists
+    are unioned in order, counts add up, other numbers are averaged weighted
+    by chunk size, booleans are OR-ed and distinct strings are joined.
+    """
+    return _merge_values(results, weights, key="")
+
+
+def _merge_values(values: List[Any], weights: List[float], key: str) -> Any:
+    present = [(value, weight) for value, weight in zip(values, weights) if value is not None]
+    if not present:
+        return None
+    values = [value for value, _ in present]
+    weights = [weight for _, weight in present]
+    first = values[0]
+
+    if all(isinstance(value, dict) for value in values):
+        keys = list(dict.fromkeys(k for value in values for k in value))
+        return {k: _merge_values([value.get(k) for value in values], weights, k) for k in keys}
+    if all(isinstance(value, list) for value in values):
+        merged, seen = [], set()
+        for value in values:
+            for item in value:
+                marker = json.dumps(item, sort_keys=True, default=str)
+                if marker not in seen:
+                    seen.add(marker)
+                    merged.append(item)
+        return merged
+    if all(isinstance(value, bool) for value in values):
+        return any(values)
+    if all(isinstance(value, (int, float)) for value in values):
+        if key.endswith("count") or key.startswith("num_") or key.startswith("total"):
+            return sum(values)
+        total_weight = sum(weights) or 1
+        return sum(value * weight for value, weight in zip(values, weights)) / total_weight
+    if all(isinstance(value, str) for value in values):
+        return "\n".join(dict.fromkeys(values))
+    return first
@@ -0,0 +1,168 @@
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.metrics import INGEST_BUFFER_DEPTH, INGEST_QUEUE_WAIT, STREAM_EVENTS
+
+logger = logging.getLogger(__name__)
+
+
+class Backoff:
+    """
+    Exponential backoff with full jitter: the n-th consecutive failure waits a
+    random time between 0 and min(cap, base * 2**n) seconds.
+    """
+
+    def __init__(self, base: float = 1.0, cap: float = 300.0):
+        self.base = base
+        self.cap = cap
+        self.failures = 0
+
+    def next_delay(self) -> float:
+        delay = random.uniform(0, min(self.cap, self.base * 2 ** self.failures))
+        self.failures += 1
+        return delay
+
+    def reset(self) -> None:
+        self.failures = 0
+
+
+class RecentIds:
+    """
+    Bounded set of the most recently seen IDs, for dropping events the
+    stream redelivers after a reconnect.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._ids: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def add(self, item: Hashable) -> bool:
+        """
+        Record an ID. Returns False if it was already seen.
+        """
+        if item in self._ids:
+            self._ids.move_to_end(item)
+            return False
+        self._ids[item] = None
+        if len(self._ids) > self.capacity:
+            self._ids.popitem(last=False)
+        return True
+
+
+class RingBuffer:
+    """
+    Thread-safe bounded FIFO. When full, putting a new item evicts the oldest
+    one instead of blocking the producer.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._items: deque = deque()
+        self._ready = threading.Condition()
+
+    def put(self, item: Any) -> Optional[Any]:
+        """
+        Append an item. Returns the evicted item, if any.
+        """
+        with self._ready:
+            evicted = self._items.popleft() if len(self._items) >= self.capacity else None
+            self._items.append(item)
+            self._ready.notify()
+            return evicted
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Take the oldest item, waiting up to timeout seconds. Returns None on
+        timeout.
+        """
+        with self._ready:
+            if not self._items and not self._ready.wait_for(lambda: self._items, timeout):
+                return None
+            return self._items.popleft()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class StreamIngestor:
+    """
+    Decouples receiving stream events from processing them. The stream thread
+    only dedupes and enqueues (offer); worker threads drain the buffer and run
+    the handler, so slow processing never stalls reading the connection.
+    """
+
+    def __init__(self, handler: Callable[[Any], None], name: str = "mentions",
+                 capacity: int = 1000, dedupe_window: int = 10000, workers: int = 1,
+                 backoff_base: float = 1.0, backoff_cap: float = 300.0):
+        self.handler = handler
+        self.name = name
+        self.buffer = RingBuffer(capacity)
+        self.seen = RecentIds(dedupe_window)
+        self.workers = workers
+        self.backoff = Backoff(backoff_base, backoff_cap)
+        self._seen_lock = threading.Lock()
+        self._threads = []
+
+    def offer(self, event_id: Hashable, event: Any) -> bool:
+        """
+        Called on the stream thread for every received event.
+        Returns False if the event was a duplicate.
+        """
+        STREAM_EVENTS.inc(stream=self.name, event="received")
+        with self._seen_lock:
+            is_new = self.seen.add(event_id)
+        if not is_new:
+            STREAM_EVENTS.inc(stream=self.name, event="duplicate")
+            return False
+        if self.buffer.put((time.monotonic(), event)) is not None:
+            STREAM_EVENTS.inc(stream=self.name, event="dropped")
+        INGEST_BUFFER_DEPTH.set(len(self.buffer), stream=self.name)
+        return True
+
+    def start(self) -> None:
+        """
+        Start the worker threads that process buffered events.
+        """
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"{self.name}-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            item = self.buffer.get(timeout=1.0)
+            INGEST_BUFFER_DEPTH.set(len(self.buffer), stream=self.name)
+            if item is None:
+                continue
+            received_at, event = item
+            INGEST_QUEUE_WAIT.observe(time.monotonic() - received_at, stream=self.name)
+            try:
+                self.handler(event)
+                STREAM_EVENTS.inc(stream=self.name, event="processed")
+            except Exception as e:
+                STREAM_EVENTS.inc(stream=self.name, event="failed")
+                logger.error(f"Error processing {self.name} event: {e}")
+
+    def run(self, connect: Callable[[], None], healthy_after: float = 60.0) -> None:
+        """
+        Keep a blocking stream connection open forever, reconnecting with
+        backoff. A connection that stayed up for healthy_after seconds resets
+        the backoff.
+        """
+        while True:
+            started = time.monotonic()
+            try:
+                connect()
+                reason = "disconnected"
+            except Exception as e:
+                reason = f"error: {e}"
+            if time.monotonic() - started >= healthy_after:
+                self.backoff.reset()
+            delay = self.backoff.next_delay()
+            STREAM_EVENTS.inc(stream=self.name, event="reconnect")
+            logger.warning(f"Stream {self.name} {reason}; reconnecting in {delay:.1f}s")
+            time.sleep(delay)
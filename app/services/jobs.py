@@ -0,0 +1,202 @@
+import asyncio
+import ipaddress
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db.models import AnalysisJob
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def is_local_callback_url(url: str) -> bool:
+    """
+    Check that a webhook URL points at this host or a private network.
+    Jobs never call out to arbitrary public URLs.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return False
+    if parsed.hostname == "localhost":
+        return True
+    try:
+        address = ipaddress.ip_address(parsed.hostname)
+    except ValueError:
+        return False
+    return address.is_loopback or address.is_private
+
+
+class AnalysisJobManager:
+    """
+    Runs thread analyses in the background on a bounded number of workers.
+    Job state lives in the analysis_jobs table, so any worker sharing the
+    database can answer polls and finished jobs survive restarts.
+    Submitting a tweet that is already queued or running returns that job,
+    with the new callback URL (if any) added to its webhooks. A job still
+    unfinished after stale_after seconds belonged to a process that stopped,
+    and is reported as failed.
+    """
+
+    def __init__(self, runner: Callable[[str], Awaitable[Dict[str, Any]]],
+                 session_factory: Callable[[], Session], max_workers: int = 4,
+                 max_jobs: int = 500, stale_after: float = 1800):
+        self.runner = runner
+        self.session_factory = session_factory
+        self.max_jobs = max_jobs
+        self.stale_after = stale_after
+        self._max_workers = max_workers
+        self._semaphore = None
+        self._tasks = set()
+
+    async def submit(self, tweet_id: str, callback_url: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue an analysis for a tweet.
+        Returns a tuple of (job, created).
+        """
+        job, created = await run_in_threadpool(self._submit, tweet_id, callback_url)
+        if created:
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self._max_workers)
+            task = asyncio.ensure_future(self._run(job["id"], tweet_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return job, created
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await run_in_threadpool(self._get, job_id)
+
+    def _submit(self, tweet_id: str, callback_url: Optional[str]) -> Tuple[Dict[str, Any], bool]:
+        db = self.session_factory()
+        try:
+            active = [
+                job for job in db.query(AnalysisJob)
+                .filter(AnalysisJob.tweet_id == tweet_id, AnalysisJob.status.in_((PENDING, RUNNING)))
+                .order_by(AnalysisJob.created_at.desc())
+                if not self._expire(job)
+            ]
+            if active:
+                job = active[0]
+                callback_urls = json.loads(job.callback_urls or "[]")
+                if callback_url and callback_url not in callback_urls:
+                    job.callback_urls = json.dumps(callback_urls + [callback_url])
+                db.commit()
+                return job.to_dict(), False
+
+            job = AnalysisJob(
+                id=uuid.uuid4().hex,
+                tweet_id=tweet_id,
+                status=PENDING,
+                callback_urls=json.dumps([callback_url] if callback_url else []),
+                created_at=datetime.now()
+            )
+            db.add(job)
+            db.commit()
+            self._evict_finished(db)
+            return job.to_dict(), True
+        finally:
+            db.close()
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            job = db.get(AnalysisJob, job_id)
+            if job is None:
+                return None
+            if self._expire(job):
+                db.commit()
+            return job.to_dict()
+        finally:
+            db.close()
+
+    def _expire(self, job: AnalysisJob) -> bool:
+        """
+        Mark an unfinished job failed if it is older than stale_after; the
+        caller commits. Returns True if it was marked.
+        """
+        if job.status not in (PENDING, RUNNING):
+            return False
+        if job.created_at > datetime.now() - timedelta(seconds=self.stale_after):
+            return False
+        job.status = FAILED
+        job.error = "Interrupted: the worker running this job stopped"
+        job.finished_at = datetime.now()
+        return True
+
+    def _update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            job = db.get(AnalysisJob, job_id)
+            if job is None:
+                return None
+            for name, value in fields.items():
+                setattr(job, name, value)
+            db.commit()
+            return job.to_dict()
+        finally:
+            db.close()
+
+    async def _run(self, job_id: str, tweet_id: str) -> None:
+        async with self._semaphore:
+            await run_in_threadpool(self._update, job_id, status=RUNNING, started_at=datetime.now())
+            try:
+                result = await self.runner(tweet_id)
+                fields = {"status": COMPLETED, "result": json.dumps(result, default=str)}
+            except Exception as e:
+                logger.error(f"Analysis job {job_id} for tweet {tweet_id} failed: {e}")
+                fields = {"status": FAILED, "error": getattr(e, "detail", None) or str(e)}
+            job = await run_in_threadpool(self._update, job_id, finished_at=datetime.now(), **fields)
+
+        callback_urls = await run_in_threadpool(self._callback_urls, job_id)
+        for callback_url in callback_urls:
+            await self._notify(job, callback_url)
+
+    def _callback_urls(self, job_id: str):
+        # Read last: other workers may have added webhooks while the job ran
+        db = self.session_factory()
+        try:
+            job = db.get(AnalysisJob, job_id)
+            return json.loads(job.callback_urls or "[]") if job else []
+        finally:
+            db.close()
+
+    async def _notify(self, job: Dict[str, Any], callback_url: str) -> None:
+        """
+        Deliver the finished job to a webhook URL.
+        """
+        try:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                await client.post(callback_url, json=job)
+        except httpx.HTTPError as e:
+            logger.error(f"Webhook delivery for job {job['id']} to {callback_url} failed: {e}")
+
+    def _evict_finished(self, db: Session) -> None:
+        """
+        Drop finished jobs older than the newest max_jobs.
+        """
+        cutoff = (
+            db.query(AnalysisJob.created_at)
+            .order_by(AnalysisJob.created_at.desc())
+            .offset(self.max_jobs)
+            .limit(1)
+            .scalar()
+        )
+        if cutoff is None:
+            return
+        (
+            db.query(AnalysisJob)
+            .filter(AnalysisJob.status.in_((COMPLETED, FAILED)), AnalysisJob.created_at <= cutoff)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
@@ -0,0 +1,121 @@
+import re
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+_NOISE = re.compile(r'@\w+|#|http\S+|https\S+')
+_SPACES = re.compile(r'\s+')
+
+# Rows of shingle hashes processed per vectorized block; bounds the
+# (num_perm x block) intermediate to a few tens of MB
+_BLOCK_SHINGLES = 50_000
+
+
+class NearDuplicateDetector:
+    """
+    Clusters near-identical texts with MinHash signatures over byte
+    shingles and a banded LSH index, in time roughly linear in the number of
+    texts. Only candidate pairs sharing an LSH band are ever compared.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 5,
+                 threshold: float = 0.7, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash family; uint64 arithmetic wraps, which is intended
+        self._a = (rng.integers(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64)
+
+    def normalize(self, text: str) -> str:
+        return _SPACES.sub(" ", _NOISE.sub("", text.lower())).strip()
+
+    def _shingle_hashes(self, texts: Sequence[str]):
+        """
+        Hash every k-byte shingle of a block of normalized texts at once.
+        Returns (hashes, offsets) where offsets[i] is where text i starts.
+        """
+        k = self.shingle_size
+        # Pad short texts so every text has at least one shingle
+        encoded = [text.encode().ljust(k) for text in texts]
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+
+        counts = lengths - k + 1
+        offsets = np.cumsum(counts) - counts
+        text_starts = np.cumsum(lengths) - lengths
+        starts = np.repeat(text_starts - offsets, counts) + np.arange(counts.sum())
+
+        # Polynomial hash with base 257 is exact (collision free) for k <= 7
+        hashes = np.zeros(len(starts), dtype=np.uint64)
+        for j in range(k):
+            hashes = hashes * np.uint64(257) + data[starts + j]
+        return hashes, offsets
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        MinHash signatures for already-normalized texts, shape (len(texts), num_perm).
+        """
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        start = 0
+        while start < len(texts):
+            # Take a block of texts whose shingles fit the block budget
+            end, total = start, 0
+            while end < len(texts) and (total < _BLOCK_SHINGLES or end == start):
+                total += max(len(texts[end]) - self.shingle_size + 1, 1)
+                end += 1
+            hashes, offsets = self._shingle_hashes(texts[start:end])
+            with np.errstate(over="ignore"):
+                h = (self._a * hashes[None, :] + self._b) >> np.uint64(32)
+            signatures[start:end] = np.minimum.reduceat(h, offsets, axis=1).T
+            start = end
+        return signatures
+
+    def cluster(self, texts: Sequence[str]) -> List[List[int]]:
+        """
+        Group texts whose estimated Jaccard similarity reaches the threshold.
+        Returns clusters of two or more indices, largest first.
+        """
+        # Exact duplicates (after normalization) share one signature
+        unique: Dict[str, int] = {}
+        text_ids = np.empty(len(texts), dtype=np.int64)
+        for i, text in enumerate(texts):
+            text_ids[i] = unique.setdefault(self.normalize(text), len(unique))
+        if not unique:
+            return []
+
+        signatures = self.signatures(list(unique))
+        parent = list(range(len(unique)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for band in range(self.bands):
+            block = np.ascontiguousarray(signatures[:, band * self.rows:(band + 1) * self.rows])
+            keys = block.view(np.dtype((np.void, block.dtype.itemsize * self.rows))).ravel()
+            _, first_index, bucket_ids = np.unique(keys, return_index=True, return_inverse=True)
+            # Verify each candidate against its bucket's first member only
+            heads = first_index[bucket_ids.ravel()]
+            candidates = np.flatnonzero(heads != np.arange(len(heads)))
+            if not len(candidates):
+                continue
+            similarity = (signatures[candidates] == signatures[heads[candidates]]).mean(axis=1)
+            matched = similarity >= self.threshold
+            for member, head in zip(candidates[matched].tolist(), heads[candidates[matched]].tolist()):
+                root, other = find(head), find(member)
+                if root != other:
+                    parent[other] = root
+
+        roots = np.array([find(i) for i in range(len(unique))])[text_ids]
+        clusters: Dict[int, List[int]] = {}
+        for index, root in enumerate(roots.tolist()):
+            clusters.setdefault(root, []).append(index)
+        return sorted((c for c in clusters.values() if len(c) > 1), key=len, reverse=True)
@@ -0,0 +1,292 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import or_, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from tweepy import errors as tweepy_errors
+
+from app.core.metrics import REPLY_DELIVERY_LATENCY, REPLY_OUTBOX_DEPTH, REPLY_OUTBOX_EVENTS
+from app.db.models import PendingReply, ReplyBudget
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+SUPERSEDED = "superseded"
+
+
+class TokenBucket:
+    """
+    Write budget: rate tokens per second, up to burst saved up. The state is a
+    row in the reply_budget table, so every worker posting replies draws from
+    the same budget.
+    """
+
+    # Refill and spend in one statement; matches no row when no token is available
+    _TAKE = text(
+        "UPDATE reply_budget "
+        "SET tokens = MIN(:burst, tokens + (:now - updated_at) * :rate) - 1, updated_at = :now "
+        "WHERE name = :name AND MIN(:burst, tokens + (:now - updated_at) * :rate) >= 1"
+    )
+
+    def __init__(self, session_factory: Callable[[], Session], rate: float, burst: int, name: str = "replies"):
+        self.session_factory = session_factory
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+
+    def _budget(self, db: Session) -> ReplyBudget:
+        budget = db.get(ReplyBudget, self.name)
+        if budget is None:
+            db.add(ReplyBudget(name=self.name, tokens=float(self.burst), updated_at=time.time()))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()  # Another worker created it first
+            budget = db.get(ReplyBudget, self.name)
+        return budget
+
+    def wait_time(self) -> float:
+        """
+        Seconds until a token is available (0 if one is available now).
+        """
+        db = self.session_factory()
+        try:
+            budget = self._budget(db)
+            tokens = min(self.burst, budget.tokens + (time.time() - budget.updated_at) * self.rate)
+            return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+        finally:
+            db.close()
+
+    def try_take(self) -> bool:
+        """
+        Spend a token if one is available.
+        """
+        db = self.session_factory()
+        try:
+            self._budget(db)
+            result = db.execute(self._TAKE, {"burst": self.burst, "rate": self.rate,
+                                             "now": time.time(), "name": self.name})
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+    def drain(self, seconds: float) -> None:
+        """
+        Spend the budget so that nothing is sent for the given time, e.g. after
+        the API reports the limit was hit anyway.
+        """
+        db = self.session_factory()
+        try:
+            budget = self._budget(db)
+            budget.tokens = -seconds * self.rate
+            budget.updated_at = time.time()
+            db.commit()
+        finally:
+            db.close()
+
+
+class ReplyOutbox:
+    """
+    Durable outbound reply queue. Replies are written to the pending_replies
+    table, coalesced so each conversation has at most one unsent reply, and
+    delivered by sender loops paced by a token bucket. Every worker may run a
+    sender: replies are claimed with a conditional update and the budget is
+    kept in the database. Unsent replies survive restarts.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], sender: Callable[[PendingReply], None],
+                 rate_per_hour: float = 100, burst: int = 5, max_attempts: int = 5,
+                 rate_limit_pause: float = 900, poll_interval: float = 1.0, claim_timeout: float = 300):
+        self.session_factory = session_factory
+        self.sender = sender
+        self.bucket = TokenBucket(session_factory, rate_per_hour / 3600, burst)
+        self.max_attempts = max_attempts
+        # How long to stop posting after a 429 from the API
+        self.rate_limit_pause = rate_limit_pause
+        self.poll_interval = poll_interval
+        # A claim older than this belongs to a sender that died mid-delivery
+        self.claim_timeout = claim_timeout
+
+    def enqueue(self, conversation_id: str, in_reply_to: str, text: str) -> PendingReply:
+        """
+        Queue a reply. If the conversation already has an unsent reply, that
+        reply is replaced with this one instead of adding another.
+        """
+        db = self.session_factory()
+        try:
+            reply = (
+                db.query(PendingReply)
+                .filter(PendingReply.conversation_id == conversation_id, PendingReply.status == PENDING)
+                .first()
+            )
+            if reply is None:
+                reply = PendingReply(conversation_id=conversation_id, status=PENDING, created_at=datetime.now())
+                db.add(reply)
+                REPLY_OUTBOX_EVENTS.inc(event="enqueued")
+            else:
+                # Keep created_at so delivery latency counts from the first request
+                reply.coalesced = (reply.coalesced or 0) + 1
+                REPLY_OUTBOX_EVENTS.inc(event="coalesced")
+            reply.in_reply_to = in_reply_to
+            reply.text = text
+            db.commit()
+            db.refresh(reply)
+            self._update_depth(db)
+            return reply
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def recover(self) -> int:
+        """
+        Return replies claimed by a sender that died mid-delivery to the queue.
+        Claims younger than claim_timeout may belong to a live sender in
+        another worker and are left alone.
+        Returns the number of replies recovered.
+        """
+        db = self.session_factory()
+        try:
+            stale = datetime.now() - timedelta(seconds=self.claim_timeout)
+            count = (
+                db.query(PendingReply)
+                .filter(PendingReply.status == SENDING,
+                        or_(PendingReply.claimed_at.is_(None), PendingReply.claimed_at < stale))
+                .update({PendingReply.status: PENDING, PendingReply.claimed_at: None},
+                        synchronize_session=False)
+            )
+            db.commit()
+            self._update_depth(db)
+            return count
+        finally:
+            db.close()
+
+    def run(self) -> None:
+        """
+        Deliver queued replies forever; meant for a background thread.
+        """
+        last_recovery = 0.0
+        while True:
+            if time.monotonic() - last_recovery >= self.claim_timeout:
+                last_recovery = time.monotonic()
+                try:
+                    recovered = self.recover()
+                except Exception as e:
+                    logger.error(f"Reply outbox recovery error: {e}")
+                    recovered = 0
+                if recovered:
+                    logger.info(f"Recovered {recovered} replies interrupted mid-delivery")
+            wait = self.bucket.wait_time()
+            if wait > 0:
+                time.sleep(min(wait, 60))
+                continue
+            try:
+                delivered = self.deliver_next()
+            except Exception as e:
+                logger.error(f"Reply outbox error: {e}")
+                delivered = False
+            if not delivered:
+                time.sleep(self.poll_interval)
+
+    def deliver_due(self) -> int:
+        """
+        Send due replies for as long as the budget allows, without waiting.
+        Returns the number of replies processed.
+        """
+        processed = 0
+        while self.bucket.wait_time() == 0 and self.deliver_next():
+            processed += 1
+        return processed
+
+    def deliver_next(self) -> bool:
+        """
+        Claim and send the oldest due reply.
+        Returns False if nothing was due, another sender claimed it first or
+        the budget is spent.
+        """
+        db = self.session_factory()
+        try:
+            reply = (
+                db.query(PendingReply)
+                .filter(PendingReply.status == PENDING, PendingReply.next_attempt_at <= datetime.now())
+                .order_by(PendingReply.created_at)
+                .first()
+            )
+            if reply is None:
+                return False
+            # Claim it so a concurrent enqueue for the conversation starts a new
+            # reply; only one sender's conditional update can match
+            claimed = (
+                db.query(PendingReply)
+                .filter(PendingReply.id == reply.id, PendingReply.status == PENDING)
+                .update({PendingReply.status: SENDING, PendingReply.claimed_at: datetime.now()},
+                        synchronize_session=False)
+            )
+            db.commit()
+            if claimed != 1:
+                return False
+
+            if not self.bucket.try_take():
+                self._requeue(db, reply)
+                db.commit()
+                return False
+            try:
+                self.sender(reply)
+            except tweepy_errors.TooManyRequests:
+                self.bucket.drain(self.rate_limit_pause)
+                self._requeue(db, reply)
+                REPLY_OUTBOX_EVENTS.inc(event="rate_limited")
+                logger.warning(f"Posting rate limited; pausing replies for {self.rate_limit_pause}s")
+            except tweepy_errors.Forbidden as e:
+                # Duplicate status or no permission; retrying will not help
+                self._fail(reply, str(e))
+            except Exception as e:
+                reply.attempts = (reply.attempts or 0) + 1
+                reply.error = str(e)
+                if reply.attempts >= self.max_attempts:
+                    self._fail(reply, str(e))
+                else:
+                    self._requeue(db, reply)
+                    reply.next_attempt_at = datetime.now() + timedelta(seconds=30 * 2 ** reply.attempts)
+                    REPLY_OUTBOX_EVENTS.inc(event="retried")
+            else:
+                reply.status = SENT
+                reply.sent_at = datetime.now()
+                REPLY_OUTBOX_EVENTS.inc(event="sent")
+                REPLY_DELIVERY_LATENCY.observe((reply.sent_at - reply.created_at).total_seconds())
+            db.commit()
+            self._update_depth(db)
+            return True
+        finally:
+            db.close()
+
+    def _requeue(self, db: Session, reply: PendingReply) -> None:
+        """
+        Put a claimed reply back, unless a newer reply for the conversation was
+        queued while it was being sent.
+        """
+        newer = (
+            db.query(PendingReply)
+            .filter(PendingReply.conversation_id == reply.conversation_id,
+                    PendingReply.status == PENDING, PendingReply.id != reply.id)
+            .first()
+        )
+        reply.status = SUPERSEDED if newer else PENDING
+        reply.claimed_at = None
+
+    def _fail(self, reply: PendingReply, error: str) -> None:
+        reply.status = FAILED
+        reply.error = error
+        REPLY_OUTBOX_EVENTS.inc(event="failed")
+        logger.error(f"Giving up on reply to {reply.in_reply_to}: {error}")
+
+    def _update_depth(self, db: Session) -> None:
+        REPLY_OUTBOX_DEPTH.set(db.query(PendingReply).filter(PendingReply.status == PENDING).count())
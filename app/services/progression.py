@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+
+class ProgressionAggregator:
+    """
+    Streaming time-bucketed summary of a score series. Buckets start one
+    second wide and double in width whenever the series would need more than
+    max_points of them, so memory and output size stay bounded no matter how
+    many values are added, in any order.
+    """
+
+    def __init__(self, max_points: int = 100, initial_width: float = 1.0):
+        if max_points < 2:
+            raise ValueError("max_points must be at least 2")
+        self.max_points = max_points
+        self.width = initial_width
+        self.origin: Optional[datetime] = None
+        self._buckets: Dict[int, List[float]] = {}  # index -> [count, sum, min, max]
+        self._low = self._high = 0
+
+    def add(self, timestamp: datetime, value: float) -> None:
+        if self.origin is None:
+            self.origin = timestamp
+        index = int((timestamp - self.origin).total_seconds() // self.width)
+        bucket = self._buckets.get(index)
+        if bucket is None:
+            self._buckets[index] = [1, value, value, value]
+            self._low, self._high = min(self._low, index), max(self._high, index)
+            while self._high - self._low + 1 > self.max_points:
+                self._widen()
+        else:
+            bucket[0] += 1
+            bucket[1] += value
+            bucket[2] = min(bucket[2], value)
+            bucket[3] = max(bucket[3], value)
+
+    def _widen(self) -> None:
+        """
+        Double the bucket width, merging pairs of adjacent buckets.
+        """
+        self.width *= 2
+        merged: Dict[int, List[float]] = {}
+        for index, (count, total, low, high) in self._buckets.items():
+            target = merged.get(index // 2)
+            if target is None:
+                merged[index // 2] = [count, total, low, high]
+            else:
+                target[0] += count
+                target[1] += total
+                target[2] = min(target[2], low)
+                target[3] = max(target[3], high)
+        self._buckets = merged
+        self._low //= 2
+        self._high //= 2
+
+    def points(self) -> List[Dict]:
+        """
+        Non-empty buckets in time order, each with the bucket start as
+        timestamp, the mean as compound_score, and count/min/max.
+        """
+        return [
+            {
+                "timestamp": self.origin + timedelta(seconds=index * self.width),
+                "compound_score": total / count,
+                "count": count,
+                "min": low,
+                "max": high
+            }
+            for index, (count, total, low, high) in sorted(self._buckets.items())
+        ]
+
+
+def lttb(points: List[Dict], threshold: int, y_key: str = "compound_score") -> List[Dict]:
+    """
+    Largest-Triangle-Three-Buckets downsampling of time-ordered points to at
+    most threshold points, keeping the first and last and the visually most
+    significant point of each bucket in between.
+    """
+    if threshold >= len(points) or threshold < 3:
+        return points
+
+    def x(point: Dict) -> float:
+        timestamp = point["timestamp"]
+        return timestamp.timestamp() if isinstance(timestamp, datetime) else float(timestamp)
+
+    sampled = [points[0]]
+    every = (len(points) - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, len(points))
+        next_points = points[next_start:next_end]
+        avg_x = sum(x(p) for p in next_points) / len(next_points)
+        avg_y = sum(p[y_key] for p in next_points) / len(next_points)
+
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        ax, ay = x(points[a]), points[a][y_key]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (points[j][y_key] - ay) - (ax - x(points[j])) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
@@ -0,0 +1,192 @@
+import math
+import random
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.services.bot_detection import BotDetector
+from app.services.sentiment import SentimentAnalyzer
+
+# Follower-count tier boundaries for stratification
+FOLLOWER_TIERS = (100, 1000, 10000)
+
+# Proportions estimated from the sample, as keys of the result
+ESTIMATES = ("with", "against", "neutral", "bot")
+
+
+def stratify(replies: List[Dict], time_bins: int = 4,
+             follower_tiers: Sequence[int] = FOLLOWER_TIERS) -> Dict[Tuple[int, int], List[int]]:
+    """
+    Group reply indices by (time bin, follower tier). Time bins split the
+    thread's time span evenly, unless replies carry the fetch window they
+    came from, which is used instead.
+    """
+    if not replies:
+        return {}
+    times = [reply["created_at"].timestamp() for reply in replies]
+    start, span = min(times), (max(times) - min(times)) or 1.0
+    strata: Dict[Tuple[int, int], List[int]] = {}
+    for index, (reply, t) in enumerate(zip(replies, times)):
+        time_bin = reply.get("window")
+        if time_bin is None:
+            time_bin = min(int((t - start) / span * time_bins), time_bins - 1)
+        followers = reply["user"].get("followers_count", 0)
+        tier = sum(followers >= bound for bound in follower_tiers)
+        strata.setdefault((time_bin, tier), []).append(index)
+    return strata
+
+
+class _Stratum:
+    def __init__(self, indices: List[int], rng: random.Random, population: Optional[float] = None):
+        self.order = list(indices)
+        rng.shuffle(self.order)
+        self.size = len(indices)
+        # Replies the stratum stands for; more than size when only part was fetched
+        self.population = max(population or 0.0, self.size)
+        self.sampled = 0
+        self.counts = {name: 0 for name in ESTIMATES}
+
+
+class ApproximateAnalyzer:
+    """
+    Estimates sentiment and bot percentages from a stratified random sample
+    of replies. Replies are drawn in batches with proportional allocation
+    across strata until every confidence interval is narrower than the target,
+    so the scoring cost is bounded by the precision asked for rather than by
+    the thread size.
+    """
+
+    def __init__(self, sentiment_analyzer: SentimentAnalyzer, bot_detector: BotDetector,
+                 ci_half_width: float = 5.0, confidence: float = 0.95,
+                 min_sample: int = 200, batch_size: int = 50, seed: Optional[int] = None):
+        self.sentiment_analyzer = sentiment_analyzer
+        self.bot_detector = bot_detector
+        self.ci_half_width = ci_half_width  # percentage points
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.confidence = confidence
+        self.min_sample = min_sample
+        self.batch_size = batch_size
+        self.seed = seed
+
+    def analyze(self, replies: List[Dict],
+                signals: Optional[Dict[str, Dict[str, float]]] = None,
+                window_sizes: Optional[List[float]] = None) -> Dict:
+        """
+        Sample and score replies until the intervals are narrow enough.
+        window_sizes are the estimated reply counts of the fetch windows the
+        replies are tagged with; strata are weighted by them.
+        Returns the sampled replies (in thread order), their bot risk factors,
+        their VADER scores by text (for SentimentAnalyzer.analyze_thread), and
+        estimates with confidence intervals in percent.
+        """
+        rng = random.Random(self.seed)
+        groups = stratify(replies)
+        fetched: Dict[int, int] = {}
+        for (window, _), indices in groups.items():
+            fetched[window] = fetched.get(window, 0) + len(indices)
+        strata = [
+            _Stratum(indices, rng, len(indices) * window_sizes[window] / fetched[window] if window_sizes else None)
+            for (window, _), indices in groups.items()
+        ]
+        population = sum(stratum.population for stratum in strata)
+        signals = signals or {}
+        author_scores: Dict[str, Tuple[bool, Dict[str, float]]] = {}
+        sampled: List[int] = []
+        risk_factors: Dict[int, Dict[str, float]] = {}
+        scores: Dict[str, Dict[str, float]] = {}
+
+        estimates = self._estimates(strata, population)
+        while len(sampled) < len(replies):
+            for _ in range(self.batch_size):
+                stratum = self._next_stratum(strata)
+                if stratum is None:
+                    break
+                index = stratum.order[stratum.sampled]
+                stratum.sampled += 1
+                sampled.append(index)
+                risk_factors[index] = self._score(replies[index], stratum, author_scores, signals, scores)
+            estimates = self._estimates(strata, population)
+            if len(sampled) >= self.min_sample and all(
+                estimate["ci_high"] - estimate["ci_low"] <= 2 * self.ci_half_width
+                for estimate in estimates.values()
+            ):
+                break
+
+        sampled.sort()
+        return {
+            "replies": [replies[index] for index in sampled],
+            "bot_risk_factors": [risk_factors[index] for index in sampled],
+            "scores": scores,
+            "estimates": estimates,
+            "sample_size": len(sampled),
+            "population": round(population),
+            "strata": len(strata),
+            "confidence": self.confidence,
+            "stopped_early": len(sampled) < len(replies)
+        }
+
+    def _next_stratum(self, strata: List[_Stratum]) -> Optional[_Stratum]:
+        """
+        Proportional allocation: draw from the stratum furthest behind its
+        share of the sample.
+        """
+        open_strata = [stratum for stratum in strata if stratum.sampled < stratum.size]
+        if not open_strata:
+            return None
+        return min(open_strata, key=lambda stratum: stratum.sampled / stratum.population)
+
+    def _score(self, reply: Dict, stratum: _Stratum,
+               author_scores: Dict[str, Tuple[bool, Dict[str, float]]],
+               signals: Dict[str, Dict[str, float]],
+               scores: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+        text = reply["text"]
+        if text not in scores:
+            scores[text] = self.sentiment_analyzer.analyze_text(text)
+        category = self.sentiment_analyzer.get_sentiment_category(scores[text]["compound"])
+        if category in ("strongly_positive", "positive"):
+            stratum.counts["with"] += 1
+        elif category in ("strongly_negative", "negative"):
+            stratum.counts["against"] += 1
+        else:
+            stratum.counts["neutral"] += 1
+
+        author = reply["author"]
+        if author not in author_scores:
+            author_scores[author] = self.bot_detector.analyze_account(reply["user"], signals.get(author))
+        is_bot, factors = author_scores[author]
+        if is_bot:
+            stratum.counts["bot"] += 1
+        return factors
+
+    def _estimates(self, strata: List[_Stratum], population: float) -> Dict[str, Dict[str, float]]:
+        """
+        Stratified proportion estimates with normal-approximation intervals,
+        including the finite population correction.
+        """
+        estimates = {}
+        for name in ESTIMATES:
+            estimate, variance = 0.0, 0.0
+            for stratum in strata:
+                if not stratum.sampled:
+                    # Unsampled stratum: maximal uncertainty
+                    weight = stratum.population / population
+                    variance += weight ** 2 * 0.25
+                    continue
+                weight = stratum.population / population
+                p = stratum.counts[name] / stratum.sampled
+                estimate += weight * p
+                # Shrink toward 1/2 so tiny strata with 0 or all hits are not certain
+                p_var = (stratum.counts[name] + 0.5) / (stratum.sampled + 1)
+                fpc = 1 - stratum.sampled / stratum.population
+                variance += weight ** 2 * p_var * (1 - p_var) / stratum.sampled * fpc
+            sampled = sum(stratum.sampled for stratum in strata)
+            if sampled:
+                # Rescale for strata not yet sampled
+                covered = sum(stratum.population for stratum in strata if stratum.sampled) / population
+                estimate = estimate / covered if covered else 0.0
+            margin = self.z * math.sqrt(variance)
+            estimates[name] = {
+                "estimate": estimate * 100,
+                "ci_low": max(estimate - margin, 0.0) * 100,
+                "ci_high": min(estimate + margin, 1.0) * 100
+            }
+        return estimates
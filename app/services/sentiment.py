@@ -1,12 +1,20 @@
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import hashlib
 import json
 import re
 
+from app.services.progression import ProgressionAggregator
+
 
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, progression_points: int = 100, score_cache=None, score_cache_ttl: float = 86400):
         self.analyzer = SentimentIntensityAnalyzer()
+        # Upper bound on sentiment_progression buckets, however long the thread
+        self.progression_points = progression_points
+        # Optional SharedCache of VADER scores by text, shared across workers
+        self.score_cache = score_cache
+        self.score_cache_ttl = score_cache_ttl
         
     def analyze_text(self, text: str) -> Dict[str, float]:
         """
@@ -30,12 +38,59 @@ class SentimentAnalyzer:
         else:
             return "strongly_negative"
     
-    def analyze_thread(self, replies: List[Dict]) -> Dict:
+    def score_texts(self, texts: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Score a batch of texts, analyzing each distinct text only once and
+        reusing scores from the score cache when there is one.
+        Returns a mapping of text to VADER scores.
+        """
+        distinct = list(dict.fromkeys(texts))
+        if self.score_cache is None:
+            return {text: self.analyze_text(text) for text in distinct}
+
+        keys = {text: self._score_key(text) for text in distinct}
+        cached = self.score_cache.get_many(keys.values())
+        scores, missing = {}, {}
+        for text, key in keys.items():
+            if key in cached:
+                scores[text] = cached[key]
+            else:
+                scores[text] = missing[key] = self.analyze_text(text)
+        self.score_cache.set_many(missing, ttl=self.score_cache_ttl)
+        return scores
+
+    @staticmethod
+    def _score_key(text: str) -> str:
+        return "vader:" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def analyze_thread(self, replies: List[Dict], scores: Optional[Dict[str, Dict[str, float]]] = None) -> Dict:
         """
         Analyze sentiment patterns in a thread of replies.
+        Precomputed scores (see score_texts) are used when given.
         """
-        sentiment_stats = {
-            "total_replies": len(replies),
+        if scores is None and self.score_cache is not None:
+            scores = self.score_texts(reply["text"] for reply in replies)
+        sentiment_stats = self._new_thread_stats()
+        for reply in replies:
+            self._accumulate_reply(sentiment_stats, reply, scores)
+        return self._finalize_thread_stats(sentiment_stats)
+
+    def iter_thread(self, replies: List[Dict], chunk_size: int = 25) -> Iterator[Tuple[int, Dict]]:
+        """
+        Analyze a thread incrementally, yielding (processed, percentages) after
+        every chunk of replies. The final item carries the full thread stats
+        (as returned by analyze_thread) instead of bare percentages.
+        """
+        sentiment_stats = self._new_thread_stats()
+        for index, reply in enumerate(replies, start=1):
+            self._accumulate_reply(sentiment_stats, reply)
+            if index % chunk_size == 0 and index < len(replies):
+                yield index, self._percentages(sentiment_stats["sentiment_counts"], index)
+        yield len(replies), self._finalize_thread_stats(sentiment_stats)
+
+    def _new_thread_stats(self) -> Dict:
+        return {
+            "total_replies": 0,
             "sentiment_counts": {
                 "strongly_positive": 0,
                 "positive": 0,
@@ -44,44 +99,50 @@ class SentimentAnalyzer:
                 "strongly_negative": 0
             },
             "notable_quotes": [],
-            "sentiment_progression": [],
+            "sentiment_progression": ProgressionAggregator(self.progression_points),
             "keywords": {}
         }
-        
-        for reply in replies:
-            # Analyze sentiment
+
+    def _accumulate_reply(self, sentiment_stats: Dict, reply: Dict,
+                          precomputed: Optional[Dict[str, Dict[str, float]]] = None) -> None:
+        """
+        Fold a single reply into running thread stats.
+        """
+        sentiment_stats["total_replies"] += 1
+
+        # Analyze sentiment
+        scores = precomputed.get(reply["text"]) if precomputed else None
+        if scores is None:
             scores = self.analyze_text(reply["text"])
-            category = self.get_sentiment_category(scores["compound"])
-            sentiment_stats["sentiment_counts"][category] += 1
-            
-            # Track sentiment progression
-            sentiment_stats["sentiment_progression"].append({
-                "timestamp": reply["created_at"],
-                "compound_score": scores["compound"]
+        category = self.get_sentiment_category(scores["compound"])
+        sentiment_stats["sentiment_counts"][category] += 1
+        
+        # Keep the per-reply score on the reply; the progression is bucketed
+        reply["compound_score"] = scores["compound"]
+        sentiment_stats["sentiment_progression"].add(reply["created_at"], scores["compound"])
+        
+        # Extract notable quotes (high sentiment intensity)
+        if abs(scores["compound"]) > 0.5:
+            sentiment_stats["notable_quotes"].append({
+                "text": reply["text"],
+                "author": reply["author"],
+                "score": scores["compound"]
             })
-            
-            # Extract notable quotes (high sentiment intensity)
-            if abs(scores["compound"]) > 0.5:
-                sentiment_stats["notable_quotes"].append({
-                    "text": reply["text"],
-                    "author": reply["author"],
-                    "score": scores["compound"]
-                })
-            
-            # Extract and count significant keywords
-            keywords = self._extract_keywords(reply["text"])
-            for keyword in keywords:
-                sentiment_stats["keywords"][keyword] = sentiment_stats["keywords"].get(keyword, 0) + 1
+        
+        # Extract and count significant keywords
+        keywords = self._extract_keywords(reply["text"])
+        for keyword in keywords:
+            sentiment_stats["keywords"][keyword] = sentiment_stats["keywords"].get(keyword, 0) + 1
+
+    def _finalize_thread_stats(self, sentiment_stats: Dict) -> Dict:
+        # Time buckets with mean/count/min/max compound score
+        sentiment_stats["sentiment_progression"] = sentiment_stats["sentiment_progression"].points()
         
         # Calculate percentages
-        total = sentiment_stats["total_replies"]
-        sentiment_stats["percentages"] = {
-            "with": ((sentiment_stats["sentiment_counts"]["strongly_positive"] + 
-                     sentiment_stats["sentiment_counts"]["positive"]) / total * 100),
-            "against": ((sentiment_stats["sentiment_counts"]["strongly_negative"] + 
-                        sentiment_stats["sentiment_counts"]["negative"]) / total * 100),
-            "neutral": (sentiment_stats["sentiment_counts"]["neutral"] / total * 100)
-        }
+        sentiment_stats["percentages"] = self._percentages(
+            sentiment_stats["sentiment_counts"],
+            sentiment_stats["total_replies"]
+        )
         
         # Sort keywords by frequency
         sentiment_stats["keywords"] = dict(sorted(
@@ -91,6 +152,18 @@ class SentimentAnalyzer:
         )[:10])
         
         return sentiment_stats
+
+    def _percentages(self, counts: Dict[str, int], total: int) -> Dict[str, float]:
+        """
+        Convert category counts into with/against/neutral percentages.
+        """
+        if not total:
+            return {"with": 0.0, "against": 0.0, "neutral": 0.0}
+        return {
+            "with": ((counts["strongly_positive"] + counts["positive"]) / total * 100),
+            "against": ((counts["strongly_negative"] + counts["negative"]) / total * 100),
+            "neutral": (counts["neutral"] / total * 100)
+        }
     
     def _extract_keywords(self, text: str) -> List[str]:
         """
@@ -49,7 +49,7 @@ function exportToCSV(data, filename) {
 function initializeSentimentChart(ctx, data) {
     if (!ctx) return;
     
-    new Chart(ctx, {
+    return new Chart(ctx, {
         type: 'doughnut',
         data: {
             labels: ['Positive', 'Negative', 'Neutral'],
@@ -72,7 +72,7 @@ function initializeSentimentChart(ctx, data) {
 function initializeTimelineChart(ctx, data) {
     if (!ctx) return;
     
-    new Chart(ctx, {
+    return new Chart(ctx, {
         type: 'line',
         data: {
             labels: data.map(d => new Date(d.timestamp).toLocaleTimeString()),
@@ -102,4 +102,143 @@ function loadAnalysisDetails(analysisId) {
             Loading details for analysis #${analysisId}...
         </div>
     `);
-} 
\ No newline at end of file
+} 
+
+// Stream analysis results over Server-Sent Events
+function streamAnalysis(url, charts) {
+    const source = new EventSource(url);
+    const setText = function(id, value) {
+        const el = document.getElementById(id);
+        if (el) el.textContent = value;
+    };
+    const setStatus = function(message) {
+        setText('analysisStatus', message);
+    };
+
+    source.addEventListener('status', function(e) {
+        const data = JSON.parse(e.data);
+        setStatus(data.stage === 'insights' ? 'Waiting for Grok insights...' : 'Fetching thread...');
+    });
+
+    source.addEventListener('replies', function(e) {
+        const data = JSON.parse(e.data);
+        setText('originalText', data.original_text);
+        setText('totalReplies', data.total_replies);
+        setStatus('Analyzing ' + data.total_replies + ' replies...');
+    });
+
+    source.addEventListener('sentiment', function(e) {
+        const data = JSON.parse(e.data);
+        setText('positivePct', data.percentages.with.toFixed(1) + '%');
+        setText('negativePct', data.percentages.against.toFixed(1) + '%');
+        if (charts.sentimentChart) {
+            charts.sentimentChart.data.datasets[0].data = [
+                data.percentages.with,
+                data.percentages.against,
+                data.percentages.neutral
+            ];
+            charts.sentimentChart.update();
+        }
+    });
+
+    source.addEventListener('bots', function(e) {
+        const data = JSON.parse(e.data);
+        setText('botPct', data.bot_percentage.toFixed(1) + '%');
+    });
+
+    source.addEventListener('insights', function(e) {
+        const data = JSON.parse(e.data);
+        if (data.grok_insights && typeof data.grok_insights === 'object') {
+            renderInsights(data.grok_insights);
+        }
+        if (data.enhanced_response) {
+            setText('enhancedResponse', data.enhanced_response);
+            const card = document.getElementById('responseCard');
+            if (card) card.style.display = '';
+        }
+    });
+
+    source.addEventListener('complete', function(e) {
+        const data = JSON.parse(e.data);
+        setStatus('Analysis completed on ' + new Date(data.date).toLocaleString());
+        renderQuotes(data.notable_quotes || []);
+        renderKeywords(data.keywords || {});
+        if (charts.timelineChart) {
+            charts.timelineChart.data.labels = data.sentiment_progression.map(d => new Date(d.timestamp).toLocaleTimeString());
+            charts.timelineChart.data.datasets[0].data = data.sentiment_progression.map(d => d.compound_score);
+            charts.timelineChart.update();
+        }
+        source.close();
+    });
+
+    source.addEventListener('error', function(e) {
+        // Server-sent error events carry data; connection errors do not
+        if (e.data) {
+            const data = JSON.parse(e.data);
+            setStatus('Analysis failed: ' + data.detail);
+        } else {
+            setStatus('Connection lost.');
+        }
+        source.close();
+    });
+
+    return source;
+}
+
+// Build the result cards streamed in after the page was rendered; mirrors
+// the markup in results.html
+function showCard(id) {
+    const card = document.getElementById(id);
+    if (card) card.style.display = '';
+}
+
+function makeElement(tag, className, text) {
+    const el = document.createElement(tag);
+    if (className) el.className = className;
+    if (text !== undefined) el.textContent = text;
+    return el;
+}
+
+function renderQuotes(quotes) {
+    const container = document.getElementById('notableQuotes');
+    if (!container || !quotes.length) return;
+    container.replaceChildren(...quotes.map(function(quote) {
+        const card = makeElement('div', 'quote-card p-3 mb-3');
+        const header = makeElement('div', 'd-flex justify-content-between align-items-center mb-2');
+        header.appendChild(makeElement('strong', '', '@' + quote.author));
+        header.appendChild(makeElement('span', 'badge ' + (quote.score > 0 ? 'bg-success' : 'bg-danger'),
+            quote.score > 0 ? 'Positive' : 'Negative'));
+        card.appendChild(header);
+        card.appendChild(makeElement('p', 'mb-0', quote.text));
+        return card;
+    }));
+    showCard('quotesCard');
+}
+
+function renderKeywords(keywords) {
+    const container = document.getElementById('keywords');
+    const entries = Object.entries(keywords);
+    if (!container || !entries.length) return;
+    container.replaceChildren(...entries.map(function([keyword, count]) {
+        const badge = makeElement('span', 'badge bg-primary fs-6', '#' + keyword + ' ');
+        badge.appendChild(makeElement('span', 'badge bg-light text-dark ms-1', count));
+        return badge;
+    }));
+    showCard('keywordsCard');
+}
+
+function renderInsights(insights) {
+    const container = document.getElementById('grokInsights');
+    if (!container) return;
+    // Nested objects are metadata (e.g. payload stats); the page shows them neither
+    const entries = Object.entries(insights).filter(([, value]) => !value || typeof value !== 'object' || Array.isArray(value));
+    if (!entries.length) return;
+    container.replaceChildren(...entries.map(function([key, value]) {
+        const item = makeElement('div', 'insight-item mb-3');
+        const title = key.replace(/_/g, ' ');
+        item.appendChild(makeElement('strong', '', title.charAt(0).toUpperCase() + title.slice(1).toLowerCase()));
+        item.appendChild(makeElement('p', 'mb-0 text-muted', Array.isArray(value) ? value.join(', ') : value));
+        return item;
+    }));
+    showCard('insightsCard');
+}
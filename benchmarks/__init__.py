@@ -0,0 +1,5 @@
+"""
+Benchmark harness for the analysis pipeline.
+
+Run with ``python -m benchmarks.run --help``.
+"""
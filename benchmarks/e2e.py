@@ -0,0 +1,127 @@
+import asyncio
+import os
+import time
+from typing import Dict, List
+
+from benchmarks.report import summarize
+from benchmarks.stubs import StubGrokServer, StubXServer, make_stub_api
+from benchmarks.synthetic import ReplyGenerator
+
+BENCH_ENV = {
+    "X_API_KEY": "bench",
+    "X_API_SECRET": "bench",
+    "X_ACCESS_TOKEN": "bench",
+    "X_ACCESS_TOKEN_SECRET": "bench",
+    "X_BEARER_TOKEN": "bench",
+    "CLIENT_ID": "bench",
+    "CLIENT_SECRET": "bench",
+    "SECRET_KEY": "bench",
+    "XAI_API_KEY": "bench",
+    # Keeps app.main from starting the mention stream listener and puts the
+    # database in /tmp instead of the working tree
+    "VERCEL_ENV": "benchmark",
+    # run() raises this to the largest size so whole threads are analyzed
+    "THREAD_REPLY_LIMIT": "100",
+}
+
+
+async def _drive(app, tweet_ids: List[int], requests: int, concurrency: int, cached: bool) -> Dict:
+    import httpx
+
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                 timeout=None) as client:
+        async def one(index: int):
+            nonlocal errors
+            data = {"tweet_id": str(tweet_ids[index % len(tweet_ids)])}
+            if not cached:
+                data["force_refresh"] = "true"
+            async with slots:
+                start = time.perf_counter()
+                response = await client.post("/analyze", data=data)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        if cached:
+            # Prime the cache so the timed run measures hits only
+            for tweet_id in tweet_ids:
+                await client.post("/analyze", data={"tweet_id": str(tweet_id)})
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    stats = summarize(latencies)
+    stats["requests"] = requests
+    stats["concurrency"] = concurrency
+    stats["errors"] = errors
+    stats["requests_per_sec"] = requests / elapsed if elapsed else 0.0
+    return stats
+
+
+def _replies_processed(session_factory, tweet_ids: List[int]) -> int:
+    """
+    Fewest replies any of the threads' latest stored analyses covered.
+    """
+    from app.db.models import Analysis
+
+    db = session_factory()
+    try:
+        counts = []
+        for tweet_id in tweet_ids:
+            analysis = (
+                db.query(Analysis)
+                .filter(Analysis.tweet_id == str(tweet_id))
+                .order_by(Analysis.date.desc())
+                .first()
+            )
+            counts.append((analysis.engagement_replies or 0) if analysis else 0)
+        return min(counts) if counts else 0
+    finally:
+        db.close()
+
+
+def run(sizes: List[int], requests: int = 20, concurrency: int = 4, seed: int = 42,
+        distribution: str = "balanced", bot_share: float = 0.2, x_latency: float = 0.0,
+        grok_latency: float = 0.0, cached: bool = False) -> Dict[str, Dict]:
+    """
+    End-to-end /analyze runs against local X and Grok stand-ins.
+    """
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    # A reply limit below the thread size would benchmark truncated threads
+    reply_limit = max(int(os.environ["THREAD_REPLY_LIMIT"]), *sizes)
+    os.environ["THREAD_REPLY_LIMIT"] = str(reply_limit)
+
+    results = {}
+    with StubXServer(x_latency) as x_server, StubGrokServer(grok_latency) as grok_server:
+        os.environ["XAI_API_BASE_URL"] = f"{grok_server.base_url}/v1"
+        from app import main
+        from app.core.config import get_settings
+
+        if get_settings().THREAD_REPLY_LIMIT < reply_limit:
+            get_settings.cache_clear()  # Loaded before the limit was raised
+        main.get_api_client.api = make_stub_api(x_server)
+
+        for size in sizes:
+            generator = ReplyGenerator(seed, distribution, bot_share)
+            tweet_ids = []
+            for thread in range(max(1, min(requests, 8))):
+                tweet_id = 1_000_000_000 * (size + 1) + thread * 1_000_000
+                x_server.add_thread(tweet_id, f"author_{size}_{thread}", f"Benchmark thread {thread}",
+                                    generator.replies(size, tweet_id))
+                tweet_ids.append(tweet_id)
+
+            x_server.requests = grok_server.requests = 0
+            stats = asyncio.run(_drive(main.app, tweet_ids, requests, concurrency, cached))
+            stats["x_requests"] = x_server.requests
+            stats["grok_requests"] = grok_server.requests
+            stats["thread_size"] = size
+            stats["replies_processed"] = _replies_processed(main.SessionLocal, tweet_ids)
+            results[f"e2e./analyze{'[cached]' if cached else ''}[{size}]"] = stats
+
+    return results
@@ -0,0 +1,37 @@
+from typing import Dict, List
+
+from benchmarks.report import measure, summarize
+from benchmarks.synthetic import ReplyGenerator
+
+
+def run(sizes: List[int], repeat: int = 5, seed: int = 42, distribution: str = "balanced",
+        bot_share: float = 0.2) -> Dict[str, Dict]:
+    """
+    Microbenchmarks for the CPU-bound analysis services.
+    """
+    from app.services.bot_detection import BotDetector
+    from app.services.sentiment import SentimentAnalyzer
+
+    sentiment = SentimentAnalyzer()
+    detector = BotDetector()
+    results = {}
+
+    for size in sizes:
+        replies = ReplyGenerator(seed, distribution, bot_share).replies(size)
+        users = [reply["user"] for reply in replies]
+        texts = [reply["text"] for reply in replies]
+
+        results[f"sentiment.analyze_thread[{size}]"] = summarize(
+            measure(lambda: sentiment.analyze_thread(replies), repeat), size
+        )
+        results[f"sentiment._extract_keywords[{size}]"] = summarize(
+            measure(lambda: [sentiment._extract_keywords(text) for text in texts], repeat), size
+        )
+        results[f"bot.analyze_account[{size}]"] = summarize(
+            measure(lambda: [detector.analyze_account(user) for user in users], repeat), size
+        )
+        results[f"bot.analyze_tweet_pattern[{size}]"] = summarize(
+            measure(lambda: detector.analyze_tweet_pattern(replies), repeat), size
+        )
+
+    return results
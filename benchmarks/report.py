@@ -0,0 +1,89 @@
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+def measure(fn: Callable[[], object], repeat: int = 5, warmup: int = 1) -> List[float]:
+    """
+    Time repeated calls of fn, returning wall-clock seconds per call.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_samples) - 1))), len(sorted_samples) - 1)
+    return sorted_samples[index]
+
+
+def summarize(samples: List[float], items: Optional[int] = None) -> Dict[str, float]:
+    """
+    Reduce timing samples (seconds) to milliseconds stats. When items is
+    given, also report throughput in items per second.
+    """
+    ordered = sorted(samples)
+    mean = sum(ordered) / len(ordered)
+    stats = {
+        "runs": len(ordered),
+        "mean_ms": mean * 1000,
+        "min_ms": ordered[0] * 1000,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+    if items:
+        stats["items"] = items
+        stats["items_per_sec"] = items / mean if mean else 0.0
+    return stats
+
+
+def environment() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "commit": commit,
+    }
+
+
+def compare(baseline: Dict, current: Dict, metric: str = "p50_ms") -> List[str]:
+    """
+    Describe per-benchmark changes of a metric between two reports.
+    """
+    lines = []
+    for name, stats in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or metric not in before or not before[metric]:
+            lines.append(f"{name}: {stats[metric]:.3f} (new)")
+            continue
+        change = (stats[metric] - before[metric]) / before[metric] * 100
+        lines.append(f"{name}: {before[metric]:.3f} -> {stats[metric]:.3f} ({change:+.1f}%)")
+    return lines
+
+
+def load(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(report: Dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
@@ -0,0 +1,55 @@
+import argparse
+import sys
+
+from benchmarks import e2e, micro
+from benchmarks.report import compare, environment, load, save
+from benchmarks.synthetic import TEXT_DISTRIBUTIONS
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the thread analysis pipeline.")
+    parser.add_argument("--suite", choices=["micro", "e2e", "all"], default="micro")
+    parser.add_argument("--sizes", default="100,1000,10000",
+                        help="comma separated reply counts per thread")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per microbenchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--distribution", choices=sorted(TEXT_DISTRIBUTIONS), default="balanced")
+    parser.add_argument("--bot-share", type=float, default=0.2)
+    parser.add_argument("--requests", type=int, default=20, help="end-to-end requests per size")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--x-latency", type=float, default=0.0, help="seconds added per X stub call")
+    parser.add_argument("--grok-latency", type=float, default=0.0, help="seconds added per Grok stub call")
+    parser.add_argument("--cached", action="store_true", help="measure /analyze cache hits")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to diff against")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    report = {
+        "environment": environment(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": {},
+    }
+
+    if args.suite in ("micro", "all"):
+        report["results"].update(micro.run(sizes, args.repeat, args.seed, args.distribution, args.bot_share))
+    if args.suite in ("e2e", "all"):
+        report["results"].update(e2e.run(
+            sizes, args.requests, args.concurrency, args.seed, args.distribution, args.bot_share,
+            args.x_latency, args.grok_latency, args.cached
+        ))
+
+    for name, stats in report["results"].items():
+        print(f"{name:45s} p50 {stats['p50_ms']:10.3f} ms   p95 {stats['p95_ms']:10.3f} ms")
+
+    if args.output:
+        save(report, args.output)
+    if args.compare:
+        print("\nChange vs baseline (p50):")
+        for line in compare(load(args.compare), report):
+            print(f"  {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.synthetic import _twitter_time, to_status_json
+
+
+class _StubServer:
+    """
+    Minimal threaded HTTP server on a random local port.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: bytes):
+        raise NotImplementedError
+
+    def start(self) -> "_StubServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _dispatch(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                url = urlsplit(self.path)
+                stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                status, payload = stub.handle(method, url.path, parse_qs(url.query), body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubXServer(_StubServer):
+    """
+    Serves the two X API v1.1 endpoints fetch_thread uses:
+    statuses/show and search/tweets (max_id paginated, newest first).
+    """
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(latency)
+        self.statuses = {}
+        self.threads = {}  # screen_name -> reply statuses, newest first
+
+    def add_thread(self, tweet_id: int, screen_name: str, text: str, replies: List[Dict]) -> None:
+        author = {
+            "id": 1, "id_str": "1", "screen_name": screen_name, "name": screen_name,
+            "created_at": "Mon Jan 01 00:00:00 +0000 2018", "statuses_count": 1000,
+            "followers_count": 1000, "friends_count": 100, "default_profile": False,
+            "description": "",
+        }
+        created_at = min(reply["created_at"] for reply in replies) if replies else None
+        self.statuses[tweet_id] = {
+            "id": tweet_id, "id_str": str(tweet_id), "full_text": text,
+            "created_at": _twitter_time(created_at) if created_at else "Mon Jan 01 00:00:00 +0000 2024",
+            "entities": {"hashtags": [], "user_mentions": [], "urls": []},
+            "user": author,
+        }
+        statuses = [to_status_json(reply, tweet_id, screen_name) for reply in replies]
+        self.threads[screen_name] = sorted(statuses, key=lambda status: status["id"], reverse=True)
+
+    def handle(self, method, path, query, body):
+        if path == "/1.1/statuses/show.json":
+            status = self.statuses.get(int(query.get("id", ["0"])[0]))
+            if status is None:
+                return 404, {"errors": [{"code": 144, "message": "No status found with that ID."}]}
+            return 200, status
+
+        if path == "/1.1/search/tweets.json":
+            q = query.get("q", [""])[0]
+            screen_name = q[3:] if q.startswith("to:") else q
+            since_id = int(query.get("since_id", ["0"])[0])
+            max_id = int(query.get("max_id", [str(2 ** 63)])[0])
+            count = int(query.get("count", ["15"])[0])
+            matches = [
+                status for status in self.threads.get(screen_name, [])
+                if since_id < status["id"] <= max_id
+            ][:count]
+            return 200, {
+                "statuses": matches,
+                "search_metadata": {"count": count, "query": q, "completed_in": 0.0}
+            }
+
+        return 404, {"errors": [{"code": 34, "message": "Sorry, that page does not exist."}]}
+
+
+class StubGrokServer(_StubServer):
+    """
+    Stands in for the Grok endpoints GrokAI calls.
+    """
+
+    def handle(self, method, path, query, body):
+        payload = json.loads(body or b"{}")
+        if path.endswith("/analyze"):
+            replies = payload.get("replies", [])
+            return 200, {
+                "summary": f"Thread with {len(replies)} replies",
+                "themes": ["benchmark"],
+                "reply_count": len(replies),
+            }
+        if path.endswith("/enhance"):
+            return 200, {"response": f"Stub response in a {payload.get('tone', 'neutral')} tone"}
+        if path.endswith("/insights"):
+            return 200, {"insights": [{"title": "Stub", "description": "Synthetic insight"}]}
+        return 404, {"error": "not found"}
+
+
+def make_stub_api(x_server: StubXServer):
+    """
+    Build a real tweepy.API whose HTTPS traffic is routed to the local stub,
+    so Cursor pagination and model parsing run exactly as in production.
+    """
+    import tweepy
+    from requests.adapters import HTTPAdapter
+
+    class LocalRedirectAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            url = urlsplit(request.url)
+            request.url = f"{x_server.base_url}{url.path}" + (f"?{url.query}" if url.query else "")
+            return super().send(request, **kwargs)
+
+    auth = tweepy.OAuth1UserHandler("bench", "bench", "bench", "bench")
+    api = tweepy.API(auth, wait_on_rate_limit=True)
+    api.session.mount("https://", LocalRedirectAdapter())
+    return api
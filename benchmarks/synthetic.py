@@ -0,0 +1,156 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+POSITIVE = [
+    "This is amazing, love it", "Great point, totally agree", "Fantastic thread, thanks for sharing",
+    "Brilliant take and well explained", "So happy to see this", "Excellent work, really impressive",
+]
+NEGATIVE = [
+    "This is terrible and wrong", "Awful take, completely disagree", "Worst idea I have seen",
+    "Horrible, this makes me angry", "Disappointing and misleading", "Stupid argument, bad faith",
+]
+NEUTRAL = [
+    "Interesting, need to read more", "What does this mean for next year", "Posting this for later",
+    "Source for the numbers", "Replying to follow the discussion", "Which version was this",
+]
+FILLER = [
+    "market", "policy", "launch", "update", "community", "numbers", "project", "future",
+    "timeline", "feature", "release", "report", "budget", "network", "growth", "team",
+]
+SPAM = [
+    "Earn money fast with crypto investment, DM me", "Buy followers now, cheap and real",
+    "Work from home and make $500 daily", "Binary options signals, join my group",
+]
+SPAM_BIOS = [
+    "Crypto investment expert. Earn money fast!", "Work from home | make $300 daily",
+    "Binary options trader. Buy followers here", "",
+]
+BIOS = [
+    "Engineer. Opinions my own.", "Writer and reader", "Coffee, code and cats",
+    "Sports fan from Ohio", "Researcher in public policy", "Photographer",
+]
+
+TEXT_DISTRIBUTIONS = {
+    "balanced": (1, 1, 1),
+    "positive": (3, 1, 1),
+    "negative": (1, 3, 1),
+    "neutral": (1, 1, 3),
+}
+
+
+class ReplyGenerator:
+    """
+    Deterministic synthetic replies in the shape fetch_thread produces.
+    """
+
+    def __init__(self, seed: int = 42, distribution: str = "balanced", bot_share: float = 0.2,
+                 author_pool: Optional[int] = None):
+        if distribution not in TEXT_DISTRIBUTIONS:
+            raise ValueError(f"Unknown text distribution: {distribution}")
+        self.random = random.Random(seed)
+        self.weights = TEXT_DISTRIBUTIONS[distribution]
+        self.bot_share = bot_share
+        self.author_pool = author_pool
+        self.now = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+    def _text(self, is_bot: bool) -> str:
+        rnd = self.random
+        if is_bot and rnd.random() < 0.7:
+            # Bot farms reuse templates with small variations
+            return f"{rnd.choice(SPAM)} {rnd.choice(FILLER)} #{rnd.choice(FILLER)}"
+        pool = rnd.choices([POSITIVE, NEGATIVE, NEUTRAL], weights=self.weights)[0]
+        words = " ".join(rnd.choice(FILLER) for _ in range(rnd.randint(2, 12)))
+        extras = []
+        if rnd.random() < 0.3:
+            extras.append(f"@user{rnd.randint(1, 500)}")
+        if rnd.random() < 0.1:
+            extras.append(f"https://t.co/{rnd.getrandbits(32):x}")
+        return " ".join([rnd.choice(pool), words] + extras)
+
+    def _user(self, index: int, is_bot: bool) -> Dict:
+        rnd = self.random
+        if is_bot:
+            age = timedelta(days=rnd.randint(1, 60))
+            return {
+                "id": 10_000_000 + index,
+                "screen_name": f"bot_{index}",
+                "created_at": self.now - age,
+                "statuses_count": rnd.randint(5_000, 80_000),
+                "followers_count": rnd.randint(0, 20),
+                "friends_count": rnd.randint(500, 5_000),
+                "default_profile": True,
+                "description": rnd.choice(SPAM_BIOS),
+            }
+        age = timedelta(days=rnd.randint(200, 5_000))
+        return {
+            "id": 20_000_000 + index,
+            "screen_name": f"user_{index}",
+            "created_at": self.now - age,
+            "statuses_count": rnd.randint(100, 30_000),
+            "followers_count": rnd.randint(20, 50_000),
+            "friends_count": rnd.randint(20, 2_000),
+            "default_profile": rnd.random() < 0.1,
+            "description": rnd.choice(BIOS),
+        }
+
+    def replies(self, count: int, tweet_id: int = 1_000_000) -> List[Dict]:
+        """
+        Generate replies to a thread, newest first like the search API.
+        """
+        rnd = self.random
+        pool = self.author_pool or count
+        users = {}
+        replies = []
+        created = self.now
+        for index in range(count):
+            author = rnd.randrange(pool)
+            if author not in users:
+                users[author] = self._user(author, rnd.random() < self.bot_share)
+            user = users[author]
+            is_bot = user["screen_name"].startswith("bot_")
+            created = created - timedelta(seconds=rnd.expovariate(1 / (5 if is_bot else 60)))
+            replies.append({
+                "id": tweet_id + count - index,
+                "text": self._text(is_bot),
+                "author": user["screen_name"],
+                "created_at": created,
+                "source": "Twitter API Client" if is_bot and rnd.random() < 0.8 else "Twitter Web App",
+                "user": dict(user),
+            })
+        return replies
+
+
+def _twitter_time(value: datetime) -> str:
+    return value.strftime("%a %b %d %H:%M:%S +0000 %Y")
+
+
+def to_status_json(reply: Dict, in_reply_to: int, in_reply_to_screen_name: str) -> Dict:
+    """
+    Render a synthetic reply as an X API v1.1 status object.
+    """
+    user = reply["user"]
+    return {
+        "id": reply["id"],
+        "id_str": str(reply["id"]),
+        "full_text": reply["text"],
+        "created_at": _twitter_time(reply["created_at"]),
+        "source": reply.get("source", "Twitter Web App"),
+        "in_reply_to_status_id": in_reply_to,
+        "in_reply_to_screen_name": in_reply_to_screen_name,
+        "entities": {"hashtags": [], "user_mentions": [], "urls": []},
+        "favorite_count": 0,
+        "retweet_count": 0,
+        "user": {
+            "id": user["id"],
+            "id_str": str(user["id"]),
+            "screen_name": user["screen_name"],
+            "name": user["screen_name"],
+            "created_at": _twitter_time(user["created_at"]),
+            "statuses_count": user["statuses_count"],
+            "followers_count": user["followers_count"],
+            "friends_count": user["friends_count"],
+            "default_profile": user["default_profile"],
+            "description": user["description"],
+        },
+    }
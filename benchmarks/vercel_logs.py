@@ -0,0 +1,309 @@
+import argparse
+import csv
+import gzip
+import io
+import math
+import re
+import sys
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from benchmarks.report import save
+
+# Log lines printed while the function module is imported only show up on
+# cold starts (Vercel's own "Init Duration" report, or import-time warnings)
+DEFAULT_COLD_START_MARKERS = ("Init Duration", "SyntaxWarning")
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{16,}|[0-9a-f-]{36})$")
+
+# Multi-GB exports can have huge log messages in one field
+csv.field_size_limit(sys.maxsize)
+
+
+class LogHistogram:
+    """
+    Fixed-precision histogram over log-spaced buckets (about 4% relative
+    error); memory is bounded by the value range, not the sample count.
+    """
+
+    SUB_BUCKETS = 16  # Buckets per power of two
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        index = -1 if value <= 0 else int(math.floor(math.log2(value) * self.SUB_BUCKETS))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                if index < 0:
+                    return 0.0
+                # Geometric midpoint of the bucket, clamped to observed range
+                value = 2 ** ((index + 0.5) / self.SUB_BUCKETS)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class RouteStats:
+    def __init__(self):
+        self.duration = LogHistogram()
+        self.memory_used = LogHistogram()
+        self.memory_size = 0
+        self.cold_starts = 0
+        self.cache: Dict[str, int] = {}
+        self.statuses: Dict[str, int] = {}
+
+    def summary(self) -> Dict:
+        requests = self.duration.count
+        hits = self.cache.get("HIT", 0) + self.cache.get("STALE", 0)
+        memory = self.memory_used.summary()
+        return {
+            "requests": requests,
+            "duration_ms": self.duration.summary(),
+            "cold_starts": self.cold_starts,
+            "cold_start_rate": self.cold_starts / requests if requests else 0.0,
+            "memory_used_mb": memory,
+            "memory_size_mb": self.memory_size,
+            "memory_headroom_mb": self.memory_size - memory["max"] if memory["count"] else None,
+            "cache": dict(self.cache),
+            "cache_hit_ratio": hits / requests if requests else 0.0,
+            "statuses": dict(self.statuses),
+        }
+
+
+class LogReport:
+    """
+    Streaming aggregation of Vercel request log rows into fixed-size
+    histograms, so memory stays constant however large the export is.
+
+    Vercel exports one row per request with durationMs/maxMemoryUsed set, and
+    one row per line the function logged (durationMs -1) under the same
+    requestId; the latter are only used to spot cold starts.
+    """
+
+    def __init__(self, cold_start_markers: Iterable[str] = DEFAULT_COLD_START_MARKERS,
+                 max_routes: int = 500, request_window: int = 10000):
+        self.cold_start_markers = tuple(cold_start_markers)
+        self.max_routes = max_routes
+        self.routes: Dict[str, RouteStats] = {}
+        self.overall = RouteStats()
+        self.not_found: Dict[str, int] = {}
+        # Recent cold requestIds, so a request with several import-time log
+        # lines counts once
+        self._cold: "OrderedDict[str, None]" = OrderedDict()
+        self._request_window = request_window
+        self.rows = 0
+        self.first_ms = None
+        self.last_ms = None
+
+    def route(self, request_path: str) -> str:
+        """
+        Normalize 'host/path?query' to a route, collapsing ID-like segments.
+        """
+        path = request_path.split("?", 1)[0]
+        if not path.startswith("/"):
+            path = "/" + path.split("/", 1)[1] if "/" in path else "/"
+        segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+        return "/".join(segments) or "/"
+
+    def _route_stats(self, route: str) -> RouteStats:
+        stats = self.routes.get(route)
+        if stats is None:
+            if len(self.routes) >= self.max_routes:
+                route = "(other)"
+                stats = self.routes.get(route)
+            if stats is None:
+                stats = self.routes[route] = RouteStats()
+        return stats
+
+    def _remember(self, ids: "OrderedDict", key: str) -> None:
+        ids[key] = None
+        ids.move_to_end(key)
+        if len(ids) > self._request_window:
+            ids.popitem(last=False)
+
+    def add(self, row: Dict[str, str]) -> None:
+        self.rows += 1
+        timestamp = _int(row.get("timestampInMs"))
+        if timestamp is not None:
+            self.first_ms = timestamp if self.first_ms is None else min(self.first_ms, timestamp)
+            self.last_ms = timestamp if self.last_ms is None else max(self.last_ms, timestamp)
+
+        request_id = row.get("requestId", "")
+        route = self.route(row.get("requestPath", ""))
+        duration = _int(row.get("durationMs"))
+
+        message = row.get("message", "")
+        if message and request_id not in self._cold and any(m in message for m in self.cold_start_markers):
+            self._remember(self._cold, request_id)
+            self._route_stats(route).cold_starts += 1
+            self.overall.cold_starts += 1
+
+        if duration is None or duration < 0:
+            return  # A log line, not the request itself
+
+        status = row.get("responseStatusCode", "")
+        cache = row.get("vercelCache") or "NONE"
+        memory_used = _int(row.get("maxMemoryUsed"))
+        memory_size = _int(row.get("memorySize"))
+        for stats in (self._route_stats(route), self.overall):
+            stats.duration.add(duration)
+            stats.cache[cache] = stats.cache.get(cache, 0) + 1
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if memory_used is not None and memory_used >= 0:
+                stats.memory_used.add(memory_used)
+            if memory_size is not None and memory_size > 0:
+                stats.memory_size = max(stats.memory_size, memory_size)
+        if status == "404":
+            key = route if route in self.routes or len(self.not_found) < self.max_routes else "(other)"
+            self.not_found[key] = self.not_found.get(key, 0) + 1
+
+    def summary(self, top: int = 10) -> Dict:
+        routes = sorted(self.routes.items(), key=lambda item: item[1].duration.count, reverse=True)
+        return {
+            "rows": self.rows,
+            "window": {"first_ms": self.first_ms, "last_ms": self.last_ms},
+            "overall": self.overall.summary(),
+            "routes": {route: stats.summary() for route, stats in routes if stats.duration.count},
+            "not_found": dict(sorted(self.not_found.items(), key=lambda item: item[1], reverse=True)[:top]),
+        }
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def open_log(path: str) -> TextIO:
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, newline="")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+    return open(path, newline="")
+
+
+def read_rows(paths: Iterable[str]) -> Iterator[Dict[str, str]]:
+    for path in paths:
+        with open_log(path) as f:
+            yield from csv.DictReader(f)
+
+
+def format_report(summary: Dict, top: int = 10) -> List[str]:
+    overall = summary["overall"]
+    lines = [
+        f"{summary['rows']} rows, {overall['requests']} requests",
+        f"cold starts {overall['cold_starts']} ({overall['cold_start_rate']:.1%}), "
+        f"cache hit ratio {overall['cache_hit_ratio']:.1%} {overall['cache']}",
+    ]
+    if overall["memory_used_mb"]["count"]:
+        lines.append(
+            f"memory used p95 {overall['memory_used_mb']['p95']:.0f} MB, max {overall['memory_used_mb']['max']:.0f} MB "
+            f"of {overall['memory_size_mb']} MB (headroom {overall['memory_headroom_mb']:.0f} MB)"
+        )
+    lines.append("")
+    lines.append(f"{'route':40s} {'reqs':>7s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'cold':>6s} {'hit':>6s}")
+    for route, stats in list(summary["routes"].items())[:top]:
+        duration = stats["duration_ms"]
+        lines.append(
+            f"{route[:40]:40s} {stats['requests']:7d} {duration['p50']:9.1f} {duration['p95']:9.1f} "
+            f"{duration['p99']:9.1f} {stats['cold_start_rate']:6.1%} {stats['cache_hit_ratio']:6.1%}"
+        )
+    if summary["not_found"]:
+        lines.append("")
+        lines.append("404 hotspots:")
+        for route, count in summary["not_found"].items():
+            lines.append(f"  {count:7d}  {route}")
+    return lines
+
+
+def format_diff(before: Dict, after: Dict, top: int = 10) -> List[str]:
+    """
+    Compare two deployment summaries route by route.
+    """
+    def change(old: float, new: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "new"
+
+    lines = [
+        f"{'route':40s} {'reqs':>13s} {'p50 ms':>22s} {'p95 ms':>22s} {'cold':>15s}"
+    ]
+    routes = ["(all)"] + [route for route in after["routes"] if route in before["routes"]][:top]
+    for route in routes:
+        old = before["overall"] if route == "(all)" else before["routes"][route]
+        new = after["overall"] if route == "(all)" else after["routes"][route]
+        if not old["requests"] or not new["requests"]:
+            continue
+        lines.append(
+            f"{route[:40]:40s} {old['requests']:6d}>{new['requests']:<6d} "
+            f"{old['duration_ms']['p50']:7.1f}>{new['duration_ms']['p50']:<7.1f}{change(old['duration_ms']['p50'], new['duration_ms']['p50']):>7s} "
+            f"{old['duration_ms']['p95']:7.1f}>{new['duration_ms']['p95']:<7.1f}{change(old['duration_ms']['p95'], new['duration_ms']['p95']):>7s} "
+            f"{old['cold_start_rate']:6.1%}>{new['cold_start_rate']:<6.1%}"
+        )
+    return lines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize Vercel request log exports (CSV).")
+    parser.add_argument("paths", nargs="+", help="CSV exports (.csv, .csv.gz, or - for stdin)")
+    parser.add_argument("--diff", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="compare two deployments by deploymentId")
+    parser.add_argument("--top", type=int, default=10, help="routes and 404 paths to list")
+    parser.add_argument("--cold-start-marker", action="append",
+                        help="log text that only appears on cold starts (repeatable)")
+    parser.add_argument("--output", help="write the JSON summary here")
+    args = parser.parse_args(argv)
+
+    markers = args.cold_start_marker or DEFAULT_COLD_START_MARKERS
+    if args.diff:
+        reports = {deployment: LogReport(markers) for deployment in args.diff}
+        for row in read_rows(args.paths):
+            report = reports.get(row.get("deploymentId"))
+            if report is not None:
+                report.add(row)
+        summaries = {deployment: report.summary(args.top) for deployment, report in reports.items()}
+        for line in format_diff(summaries[args.diff[0]], summaries[args.diff[1]], args.top):
+            print(line)
+        result = {"diff": summaries}
+    else:
+        report = LogReport(markers)
+        for row in read_rows(args.paths):
+            report.add(row)
+        result = report.summary(args.top)
+        for line in format_report(result, args.top):
+            print(line)
+
+    if args.output:
+        save(result, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
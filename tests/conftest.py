@@ -0,0 +1,29 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.e2e import BENCH_ENV
+
+# Settings requires the API credentials; use the benchmark placeholders, which
+# also keep the app database in /tmp
+for key, value in BENCH_ENV.items():
+    os.environ.setdefault(key, value)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    from app.db.models import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
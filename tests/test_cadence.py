@@ -0,0 +1,67 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.services.cadence import NO_PARENT, cadence_features, reply_cadence_features, to_epoch_seconds
+
+
+def test_to_epoch_seconds_reads_naive_datetimes_as_utc():
+    naive = datetime(2024, 1, 1, 12, 0, 0)
+    aware = naive.replace(tzinfo=timezone.utc)
+    assert to_epoch_seconds([naive, aware, None]).tolist() == [1704110400, 1704110400, NO_PARENT]
+
+
+def test_perfectly_regular_account():
+    features = cadence_features(["bot"] * 5, np.arange(5) * 60)["bot"]
+    assert features["post_count"] == 5
+    assert features["interval_count"] == 4
+    assert features["interval_variance"] == 0
+    assert features["timing_regularity"] == 1
+    assert features["burstiness"] == -1
+    assert features["hour_entropy"] == 0
+
+
+def test_single_post_has_neutral_interval_features():
+    features = cadence_features(["once"], [1000])["once"]
+    assert features["interval_count"] == 0
+    assert features["timing_regularity"] == 0
+    assert features["burstiness"] == 0
+    assert math.isnan(features["mean_reply_latency"])
+
+
+def test_posts_spread_over_every_hour_have_full_entropy():
+    features = cadence_features(["a"] * 24, np.arange(24) * 3600)["a"]
+    assert features["hour_entropy"] == pytest.approx(1.0)
+
+
+def test_matches_per_account_reference():
+    rng = np.random.default_rng(3)
+    accounts = rng.choice(["a", "b", "c", "d"], size=200).tolist()
+    timestamps = rng.integers(0, 7 * 86400, size=200)
+    features = cadence_features(accounts, timestamps)
+    for account in set(accounts):
+        own = np.sort(timestamps[np.array(accounts) == account])
+        intervals = np.diff(own).astype(float)
+        assert features[account]["post_count"] == len(own)
+        assert features[account]["interval_variance"] == pytest.approx(intervals.var())
+        std, mean = intervals.std(), intervals.mean()
+        assert features[account]["burstiness"] == pytest.approx((std - mean) / (std + mean))
+
+
+def test_reply_latency_uses_known_parents_only():
+    start = datetime(2024, 1, 1)
+    replies = [
+        {"author": "fast", "created_at": start + timedelta(seconds=5), "parent_created_at": start},
+        {"author": "fast", "created_at": start + timedelta(seconds=30), "parent_created_at": start + timedelta(seconds=20)},
+        {"author": "fast", "created_at": start + timedelta(seconds=90)},
+    ]
+    features = reply_cadence_features(replies)["fast"]
+    assert features["reply_latency_count"] == 2
+    assert features["mean_reply_latency"] == 7.5
+    assert features["min_reply_latency"] == 5
+
+
+def test_empty_input():
+    assert cadence_features([], []) == {}
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from app.db.models import AuthorEdge, CoordinationThread
+from app.services.coordination import CoordinationGraph
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def replies(*authors_and_offsets):
+    return [{"author": author, "created_at": START + timedelta(seconds=offset)}
+            for author, offset in authors_and_offsets]
+
+
+def weights(db):
+    return {(edge.author_a, edge.author_b): edge.weight for edge in db.query(AuthorEdge)}
+
+
+def test_co_occurrences_keep_the_smallest_gap_within_the_window():
+    graph = CoordinationGraph(window_seconds=60)
+    pairs = graph.co_occurrences(replies(("x", 0), ("y", 50), ("x", 70), ("z", 200)))
+    assert pairs == {("x", "y"): 20}
+
+
+def test_reanalyzing_a_thread_adds_no_weight(db):
+    graph = CoordinationGraph(window_seconds=60)
+    thread = replies(("x", 0), ("y", 10))
+    assert graph.update(db, "t1", thread) == 1
+    assert graph.update(db, "t1", thread) == 0
+    assert graph.update(db, "t2", thread) == 1
+    assert weights(db) == {("x", "y"): 2}
+    assert db.query(CoordinationThread).count() == 2
+
+
+def test_thread_pairs_are_capped_to_the_closest(db):
+    graph = CoordinationGraph(window_seconds=60, max_thread_pairs=2)
+    assert graph.update(db, "t1", replies(("a", 0), ("b", 1), ("c", 30), ("d", 31))) == 2
+    assert set(weights(db)) == {("a", "b"), ("c", "d")}
+
+
+def test_prune_drops_old_edges_and_threads(db):
+    graph = CoordinationGraph(window_seconds=60, max_age_days=30)
+    graph.update(db, "t1", replies(("x", 0), ("y", 10)))
+    graph.update(db, "t2", replies(("p", 0), ("q", 10)))
+    old = datetime.now() - timedelta(days=31)
+    db.query(AuthorEdge).filter(AuthorEdge.author_a == "x").update({"last_seen": old})
+    db.query(CoordinationThread).filter(CoordinationThread.thread_id == "t1").update({"processed_at": old})
+    db.commit()
+
+    assert graph.prune(db) == 1
+    assert set(weights(db)) == {("p", "q")}
+    assert [t.thread_id for t in db.query(CoordinationThread)] == ["t2"]
+
+
+def test_authors_replying_together_across_threads_form_a_ring(db):
+    graph = CoordinationGraph(window_seconds=60, min_weight=2, min_ring_size=3, ring_saturation=3)
+    for thread in ("t1", "t2"):
+        graph.update(db, thread, replies(("a", 0), ("b", 5), ("c", 10), ("loner", 600)))
+    graph.update(db, "t3", replies(("a", 0), ("d", 5)))
+
+    signals, rings = graph.ring_signals(db, ["a", "b", "d"])
+    assert [ring["members"] for ring in rings] == [["a", "b", "c"]]
+    assert rings[0]["density"] == 1.0
+    assert signals == {"a": {"coordination_ring_risk": 1.0}, "b": {"coordination_ring_risk": 1.0}}
@@ -0,0 +1,74 @@
+import json
+
+from app.services.grok_payload import ReplyPayloadBuilder, merge_insights
+
+
+def reply(text, compound=0.0, likes=0, retweets=0):
+    return {"text": text, "compound_score": compound, "likes": likes, "retweets": retweets}
+
+
+def test_dedupe_counts_copies_and_engagement():
+    builder = ReplyPayloadBuilder()
+    entries = builder.dedupe([reply("Buy now!", likes=2), reply("buy   NOW!", retweets=3), reply("Other")])
+    assert [(e["text"], e["copies"], e["engagement"]) for e in entries] == [("Buy now!", 2, 5), ("Other", 1, 0)]
+
+
+def test_rank_prefers_intense_engaged_and_unique_replies():
+    builder = ReplyPayloadBuilder()
+    entries = builder.dedupe([
+        reply("same words here", compound=0.0),
+        reply("same words here again", compound=0.0),
+        reply("furious outrage unacceptable", compound=-0.9, likes=50),
+    ])
+    assert builder.rank(entries)[0]["text"] == "furious outrage unacceptable"
+
+
+def test_small_threads_fit_one_chunk_in_thread_order():
+    builder = ReplyPayloadBuilder()
+    payload = builder.build([reply("first", 0.1), reply("second", 0.9), reply("first"), reply("third", 0.5)])
+    assert payload["chunks"] == [["first", "second", "third"]]
+    assert payload["stats"]["replies_total"] == 4
+    assert payload["stats"]["unique_texts"] == 3
+    assert payload["stats"]["replies_sent"] == 3
+
+
+def test_large_threads_are_bounded_and_split():
+    builder = ReplyPayloadBuilder(max_chunk_bytes=1000, max_chunks=3)
+    replies = [reply(f"reply number {i} with some distinct words w{i}", compound=(i % 10) / 10) for i in range(500)]
+    payload = builder.build(replies)
+    chunks = payload["chunks"]
+    assert len(chunks) == 3
+    for chunk in chunks:
+        assert len(json.dumps(chunk)) <= 1000
+    sent = [text for chunk in chunks for text in chunk]
+    assert len(sent) == len(set(sent)) == payload["stats"]["replies_sent"] < 500
+    # Each chunk spans the thread rather than one slice of it
+    for chunk in chunks:
+        positions = [int(text.split()[2]) for text in chunk]
+        assert positions == sorted(positions)
+        assert positions[-1] - positions[0] > 250
+
+
+def test_oversized_replies_are_skipped():
+    builder = ReplyPayloadBuilder(max_chunk_bytes=50, max_chunks=1)
+    payload = builder.build([reply("x" * 100), reply("short")])
+    assert payload["chunks"] == [["short"]]
+    assert builder.build([])["chunks"] == [[]]
+
+
+def test_merge_insights():
+    merged = merge_insights(
+        [
+            {"themes": ["a", "b"], "score": 1.0, "reply_count": 10, "toxic": False, "summary": "One", "extra": None},
+            {"themes": ["b", "c"], "score": 4.0, "reply_count": 5, "toxic": True, "summary": "Two"},
+        ],
+        [1, 2]
+    )
+    assert merged == {
+        "themes": ["a", "b", "c"],
+        "score": 3.0,
+        "reply_count": 15,
+        "toxic": True,
+        "summary": "One\nTwo",
+        "extra": None,
+    }
@@ -0,0 +1,42 @@
+import pytest
+
+from app.services.near_duplicates import NearDuplicateDetector
+
+
+def test_rejects_bands_that_do_not_divide_permutations():
+    with pytest.raises(ValueError):
+        NearDuplicateDetector(num_perm=64, bands=10)
+
+
+def test_normalize_strips_mentions_hashes_links_and_case():
+    detector = NearDuplicateDetector()
+    assert detector.normalize("@bot Buy   #NOW https://x.co/a  ") == "buy now"
+
+
+def test_signatures_are_deterministic():
+    detector = NearDuplicateDetector()
+    texts = ["free crypto giveaway", "free crypto giveaway", "hi"]
+    signatures = detector.signatures(texts)
+    assert signatures.shape == (3, detector.num_perm)
+    assert (signatures[0] == signatures[1]).all()
+    assert not (signatures[0] == signatures[2]).all()
+
+
+def test_clusters_near_duplicates_and_leaves_distinct_texts_alone():
+    detector = NearDuplicateDetector()
+    texts = [
+        "Claim your free crypto giveaway now at my profile link!!",
+        "The committee meets on Thursday to review the budget.",
+        "claim your free crypto giveaway now at my profile link!",
+        "@someone Claim your free crypto giveaway now at my profile link!!",
+        "I completely disagree with this take, the data says otherwise.",
+        "The committee meets on Thursday to review the budget",
+    ]
+    clusters = detector.cluster(texts)
+    assert clusters == [[0, 2, 3], [1, 5]]
+
+
+def test_cluster_handles_empty_and_short_texts():
+    detector = NearDuplicateDetector()
+    assert detector.cluster([]) == []
+    assert detector.cluster(["ok", "ok", "no"]) == [[0, 1]]
@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+from tweepy import errors as tweepy_errors
+
+from app.db.models import PendingReply
+from app.services import outbox as outbox_module
+from app.services.outbox import FAILED, PENDING, SENDING, SENT, SUPERSEDED, ReplyOutbox, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(outbox_module, "time", clock)
+    return clock
+
+
+def api_error(error_class, status):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b"{}"
+    return error_class(response)
+
+
+def statuses(session_factory):
+    db = session_factory()
+    try:
+        return {reply.conversation_id: reply.status for reply in db.query(PendingReply)}
+    finally:
+        db.close()
+
+
+def test_bucket_spends_burst_then_refills(session_factory, clock):
+    bucket = TokenBucket(session_factory, rate=0.5, burst=2)
+    assert bucket.try_take() and bucket.try_take()
+    assert not bucket.try_take()
+    assert bucket.wait_time() == pytest.approx(2.0)
+    clock.now += 2
+    assert bucket.wait_time() == 0
+    assert bucket.try_take()
+    clock.now += 100
+    assert bucket.try_take() and bucket.try_take()
+    assert not bucket.try_take()
+
+
+def test_bucket_drain_pauses_sending(session_factory, clock):
+    bucket = TokenBucket(session_factory, rate=1.0, burst=5)
+    bucket.drain(60)
+    assert bucket.wait_time() == pytest.approx(61.0)
+    assert not bucket.try_take()
+
+
+def test_buckets_in_different_workers_share_the_budget(session_factory, clock):
+    first = TokenBucket(session_factory, rate=0.01, burst=2)
+    second = TokenBucket(session_factory, rate=0.01, burst=2)
+    assert first.try_take() and second.try_take()
+    assert not first.try_take() and not second.try_take()
+
+
+def test_enqueue_coalesces_unsent_replies_per_conversation(session_factory):
+    outbox = ReplyOutbox(session_factory, sender=lambda reply: None)
+    first = outbox.enqueue("c1", "t1", "old")
+    second = outbox.enqueue("c1", "t2", "new")
+    outbox.enqueue("c2", "t3", "other")
+    assert second.id == first.id
+    assert second.text == "new" and second.in_reply_to == "t2" and second.coalesced == 1
+
+
+def test_deliver_due_sends_within_the_budget(session_factory, clock):
+    sent = []
+    outbox = ReplyOutbox(session_factory, sender=lambda reply: sent.append(reply.text), rate_per_hour=3600, burst=2)
+    for conversation in ("c1", "c2", "c3"):
+        outbox.enqueue(conversation, conversation, f"reply {conversation}")
+    assert outbox.deliver_due() == 2
+    assert sent == ["reply c1", "reply c2"]
+    clock.now += 1
+    assert outbox.deliver_due() == 1
+    assert statuses(session_factory) == {"c1": SENT, "c2": SENT, "c3": SENT}
+
+
+def test_reply_queued_during_delivery_supersedes_a_failed_attempt(session_factory, clock):
+    def sender(reply):
+        outbox.enqueue(reply.conversation_id, reply.in_reply_to, "newer")
+        raise RuntimeError("network down")
+
+    outbox = ReplyOutbox(session_factory, sender=sender)
+    outbox.enqueue("c1", "t1", "first")
+    assert outbox.deliver_next()
+    db = session_factory()
+    assert sorted((r.text, r.status) for r in db.query(PendingReply)) == [("first", SUPERSEDED), ("newer", PENDING)]
+    db.close()
+
+
+def test_errors_retry_with_backoff_then_fail(session_factory, clock):
+    def sender(reply):
+        raise RuntimeError("boom")
+
+    outbox = ReplyOutbox(session_factory, sender=sender, max_attempts=2)
+    outbox.enqueue("c1", "t1", "text")
+    assert outbox.deliver_next()
+    db = session_factory()
+    reply = db.query(PendingReply).one()
+    assert (reply.status, reply.attempts) == (PENDING, 1)
+    assert reply.next_attempt_at > datetime.now() + timedelta(seconds=50)
+    reply.next_attempt_at = datetime.now()
+    db.commit()
+    db.close()
+
+    assert outbox.deliver_next()
+    assert statuses(session_factory) == {"c1": FAILED}
+
+
+def test_rate_limit_requeues_and_drains_the_budget(session_factory, clock):
+    def sender(reply):
+        raise api_error(tweepy_errors.TooManyRequests, 429)
+
+    outbox = ReplyOutbox(session_factory, sender=sender, rate_limit_pause=900)
+    outbox.enqueue("c1", "t1", "text")
+    assert outbox.deliver_next()
+    assert statuses(session_factory) == {"c1": PENDING}
+    assert outbox.bucket.wait_time() > 900
+
+
+def test_forbidden_fails_without_retrying(session_factory, clock):
+    def sender(reply):
+        raise api_error(tweepy_errors.Forbidden, 403)
+
+    outbox = ReplyOutbox(session_factory, sender=sender)
+    outbox.enqueue("c1", "t1", "text")
+    assert outbox.deliver_next()
+    assert statuses(session_factory) == {"c1": FAILED}
+
+
+def test_recover_returns_only_stale_claims(session_factory):
+    outbox = ReplyOutbox(session_factory, sender=lambda reply: None, claim_timeout=300)
+    for conversation in ("stale", "live"):
+        outbox.enqueue(conversation, conversation, "text")
+    db = session_factory()
+    claimed = {"stale": datetime.now() - timedelta(seconds=600), "live": datetime.now()}
+    for reply in db.query(PendingReply):
+        reply.status = SENDING
+        reply.claimed_at = claimed[reply.conversation_id]
+    db.commit()
+    db.close()
+
+    assert outbox.recover() == 1
+    assert statuses(session_factory) == {"stale": PENDING, "live": SENDING}
+    # A claimed reply is never delivered twice
+    assert outbox.deliver_next()
+    assert not outbox.deliver_next()
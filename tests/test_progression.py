@@ -0,0 +1,62 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.progression import ProgressionAggregator, lttb
+
+START = datetime(2024, 1, 1)
+
+
+def test_rejects_fewer_than_two_points():
+    with pytest.raises(ValueError):
+        ProgressionAggregator(max_points=1)
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_buckets_stay_bounded_and_preserve_totals(shuffle):
+    rng = random.Random(5)
+    samples = [(START + timedelta(seconds=rng.randrange(0, 86400)), rng.uniform(-1, 1)) for _ in range(5000)]
+    if not shuffle:
+        samples.sort()
+    aggregator = ProgressionAggregator(max_points=50)
+    for timestamp, value in samples:
+        aggregator.add(timestamp, value)
+
+    points = aggregator.points()
+    assert 1 < len(points) <= 50
+    assert [p["timestamp"] for p in points] == sorted(p["timestamp"] for p in points)
+    assert sum(p["count"] for p in points) == len(samples)
+    total = sum(p["compound_score"] * p["count"] for p in points)
+    assert total == pytest.approx(sum(value for _, value in samples))
+    assert min(p["min"] for p in points) == min(value for _, value in samples)
+    assert max(p["max"] for p in points) == max(value for _, value in samples)
+
+
+def test_values_before_the_first_timestamp_are_bucketed():
+    aggregator = ProgressionAggregator(max_points=10)
+    aggregator.add(START, 1.0)
+    aggregator.add(START - timedelta(seconds=30), -1.0)
+    points = aggregator.points()
+    assert [p["compound_score"] for p in points] == [-1.0, 1.0]
+    assert points[0]["timestamp"] <= START - timedelta(seconds=30)
+
+
+def series(n):
+    return [{"timestamp": START + timedelta(seconds=i), "compound_score": 0.0} for i in range(n)]
+
+
+def test_lttb_keeps_endpoints_and_spikes_within_threshold():
+    points = series(1000)
+    points[500]["compound_score"] = 1.0
+    sampled = lttb(points, 20)
+    assert len(sampled) == 20
+    assert sampled[0] is points[0] and sampled[-1] is points[-1]
+    assert points[500] in sampled
+    assert [p["timestamp"] for p in sampled] == sorted(p["timestamp"] for p in sampled)
+
+
+def test_lttb_leaves_short_series_alone():
+    points = series(10)
+    assert lttb(points, 10) is points
+    assert lttb(points, 2) is points
@@ -0,0 +1,83 @@
+import io
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.db.models import ReplySegment
+from app.db.reply_store import RISK_FACTORS, ReplyStore, decode_segment, encode_segment, thread_columns
+
+START = datetime(2024, 1, 1, 12, 0, 0)  # Naive, so UTC
+
+
+def thread(tweet_id, count, offset=0):
+    replies = [
+        {
+            "id": str(tweet_id * 1000 + i),
+            "user": {"id": str(500 + i % 7)},
+            "created_at": START + timedelta(minutes=offset + i),
+            "compound_score": (i % 21 - 10) / 10,
+        }
+        for i in range(count)
+    ]
+    risk = [{"spam_pattern_risk": (i % 5) / 4, "cadence_risk": 1.0} for i in range(count)]
+    return thread_columns(str(tweet_id), tweet_id, {"replies": replies, "bot_risk_factors": risk})
+
+
+def test_segment_round_trip():
+    columns = thread(42, 50)
+    decoded = decode_segment(encode_segment(columns))
+    for name in ("tweet_id", "analysis_id", "reply_id", "author_id", "created_at"):
+        assert decoded[name].tolist() == columns[name].tolist()
+    np.testing.assert_allclose(decoded["compound"], columns["compound"], atol=1e-4)
+    for factor in RISK_FACTORS:
+        np.testing.assert_allclose(decoded[factor], columns[factor], atol=1 / 255)
+
+
+def test_decode_rejects_other_data():
+    with pytest.raises(ValueError):
+        decode_segment(b"NOPE" + bytes(20))
+
+
+def test_scan_filters_by_tweet_id_and_time(db, tmp_path):
+    store = ReplyStore(str(tmp_path / "segments"))
+    assert store.append(db, thread(1, 0)) is None
+    store.append(db, thread(1, 10))
+    store.append(db, thread(2, 10, offset=60))
+    store.append(db, thread(3, 10, offset=120))
+    db.commit()
+
+    assert len(store.scan(db)["reply_id"]) == 30
+    assert set(store.scan(db, tweet_id_min=2, tweet_id_max=2)["tweet_id"].tolist()) == {2}
+    rows = store.scan(db, since=START + timedelta(minutes=65), until=START + timedelta(minutes=125))
+    assert rows["reply_id"].tolist() == [2005, 2006, 2007, 2008, 2009, 3000, 3001, 3002, 3003, 3004, 3005]
+    assert len(store.scan(db, tweet_id_min=9)["reply_id"]) == 0
+
+
+def test_compaction_merges_small_segments_without_changing_scans(db, tmp_path):
+    store = ReplyStore(str(tmp_path / "segments"), small_rows=100, target_rows=25, compact_every=4)
+    for tweet_id in range(1, 5):
+        store.append(db, thread(tweet_id, 10, offset=tweet_id * 60))
+    db.commit()
+    before = store.scan(db)
+
+    assert store.maybe_compact(db) == 2
+    segments = db.query(ReplySegment).all()
+    assert sorted(segment.rows for segment in segments) == [20, 20]
+    assert sorted(os.listdir(tmp_path / "segments")) == sorted(os.path.basename(s.path) for s in segments)
+    after = store.scan(db)
+    for name in before:
+        assert after[name].tolist() == before[name].tolist()
+    assert store.maybe_compact(db) == 0
+
+
+def test_export_parquet(db, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    store = ReplyStore(str(tmp_path / "segments"))
+    store.append(db, thread(7, 5))
+    db.commit()
+    table = pq.read_table(io.BytesIO(store.export(store.scan(db))))
+    assert table.num_rows == 5
+    assert table.column("reply_id").to_pylist() == [7000, 7001, 7002, 7003, 7004]
@@ -0,0 +1,89 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.bot_detection import BotDetector
+from app.services.sampling import ApproximateAnalyzer, stratify
+from app.services.sentiment import SentimentAnalyzer
+
+START = datetime(2024, 1, 1)
+POSITIVE = "I love this, what a great and wonderful idea"
+NEGATIVE = "This is terrible, awful and I hate it"
+NEUTRAL = "The meeting is on Tuesday"
+
+
+def user(followers=50):
+    return {
+        "created_at": datetime.now() - timedelta(days=1000),
+        "statuses_count": 500,
+        "followers_count": followers,
+        "friends_count": 100,
+        "default_profile": False,
+        "name": "someone",
+        "description": "Gardener and cyclist",
+        "location": "Somewhere",
+        "profile_image_url": "https://example.com/a.png",
+        "profile_banner_url": "https://example.com/b.png",
+    }
+
+
+def reply(index, text, followers=50, window=None):
+    reply = {
+        "author": f"user{index}",
+        "text": text,
+        "created_at": START + timedelta(seconds=index),
+        "user": user(followers),
+    }
+    if window is not None:
+        reply["window"] = window
+    return reply
+
+
+def analyzer(**kwargs):
+    return ApproximateAnalyzer(SentimentAnalyzer(), BotDetector(), seed=7, **kwargs)
+
+
+def test_stratify_by_time_bin_and_follower_tier():
+    replies = [reply(0, NEUTRAL, 10), reply(1, NEUTRAL, 500), reply(99, NEUTRAL, 20000), reply(100, NEUTRAL, 10)]
+    assert stratify(replies, time_bins=2) == {(0, 0): [0], (0, 1): [1], (1, 3): [2], (1, 0): [3]}
+
+
+def test_stratify_prefers_the_fetch_window():
+    replies = [reply(0, NEUTRAL, window=3), reply(100, NEUTRAL, window=3)]
+    assert stratify(replies) == {(3, 0): [0, 1]}
+
+
+def test_small_threads_are_scored_in_full():
+    replies = [reply(i, POSITIVE if i % 4 == 0 else NEUTRAL) for i in range(40)]
+    result = analyzer(min_sample=200).analyze(replies)
+    assert result["sample_size"] == 40
+    assert not result["stopped_early"]
+    assert result["estimates"]["with"]["estimate"] == pytest.approx(25.0)
+    assert result["estimates"]["with"]["ci_high"] - result["estimates"]["with"]["ci_low"] < 1
+
+
+def test_large_threads_stop_once_intervals_are_narrow():
+    rng = random.Random(1)
+    texts = [POSITIVE] * 3 + [NEGATIVE] * 2 + [NEUTRAL] * 5
+    replies = [reply(i, rng.choice(texts), followers=rng.choice([10, 500, 5000])) for i in range(20000)]
+    truth = sum(r["text"] == NEGATIVE for r in replies) / len(replies) * 100
+
+    result = analyzer(ci_half_width=5.0, min_sample=200).analyze(replies)
+    assert result["stopped_early"]
+    assert 200 <= result["sample_size"] < 2000
+    assert result["population"] == 20000
+    against = result["estimates"]["against"]
+    assert against["ci_high"] - against["ci_low"] <= 10
+    assert against["ci_low"] <= truth <= against["ci_high"]
+    assert len(result["replies"]) == len(result["bot_risk_factors"]) == result["sample_size"]
+
+
+def test_window_sizes_weight_partially_fetched_windows():
+    # Window 1 held nine times as many replies as were fetched from it
+    replies = [reply(i, POSITIVE, window=0) for i in range(100)]
+    replies += [reply(100 + i, NEGATIVE, window=1) for i in range(100)]
+    result = analyzer(min_sample=200).analyze(replies, window_sizes=[100, 900])
+    assert result["population"] == 1000
+    assert result["estimates"]["against"]["estimate"] == pytest.approx(90.0)
+    assert result["estimates"]["with"]["estimate"] == pytest.approx(10.0)
@@ -3,6 +3,10 @@
 # Install Python dependencies
 pip install -r requirements.txt
 
+# Fingerprint and precompress static assets (brotli is only needed at build time)
+pip install brotli
+python -m app.core.assets
+
 # Create necessary directories
 mkdir -p .vercel/output/static
 mkdir -p .vercel/output/functions/app
@@ -18,9 +22,20 @@ cat > .vercel/output/config.json << EOF
 {
     "version": 3,
     "routes": [
+        {
+            "src": "/static/dist/(.*)",
+            "dest": "/static/dist/\$1",
+            "headers": {"cache-control": "public, max-age=31536000, immutable"}
+        },
         {
             "src": "/static/(.*)",
-            "dest": "/static/$1"
+            "dest": "/static/\$1",
+            "headers": {"cache-control": "public, max-age=3600"}
+        },
+        {
+            "src": "/favicon\\\\.(ico|png)",
+            "dest": "/static/img/favicon.png",
+            "headers": {"cache-control": "public, max-age=86400"}
         },
         {
             "src": "/(.*)",
@@ -28,4 +43,4 @@ cat > .vercel/output/config.json << EOF
         }
     ]
 }
-EOF 
\ No newline at end of file
+EOF